@@ -0,0 +1,186 @@
+"""
+Limiteur de concurrence adaptatif (AIMD) pour les écritures vers Grocy
+
+Grocy écrit dans SQLite : au-delà de quelques écritures simultanées, les
+verrous de la base font grimper la latence sans gagner en débit. La limite
+d'écritures simultanées s'ajuste d'après les réponses :
+- augmentation additive (+1 par « fenêtre » de limit réponses) tant que la
+  latence reste proche de la latence de base
+- diminution multiplicative (× GROCY_WRITE_BACKOFF) sur 5xx, erreur réseau,
+  timeout ou pic de latence
+
+Utilisable depuis des threads (acquire) et depuis asyncio (acquire_async).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+
+INITIAL_LIMIT = float(os.getenv('GROCY_WRITE_LIMIT_INITIAL', '2'))
+MIN_LIMIT = float(os.getenv('GROCY_WRITE_LIMIT_MIN', '1'))
+MAX_LIMIT = float(os.getenv('GROCY_WRITE_LIMIT_MAX', '16'))
+
+# Latence au-delà de tolerance × latence de base = pic (saturation de Grocy)
+LATENCY_TOLERANCE = float(os.getenv('GROCY_WRITE_LATENCY_TOLERANCE', '2.0'))
+BACKOFF = float(os.getenv('GROCY_WRITE_BACKOFF', '0.5'))
+
+# Remontée de la latence de base, en fraction par seconde (permet de suivre
+# un Grocy devenu durablement plus lent sans s'habituer à la saturation)
+BASELINE_DRIFT_PER_SECOND = 0.01
+
+
+class AdaptiveLimiter:
+    """Nombre d'écritures simultanées ajusté en AIMD selon la latence observée"""
+
+    def __init__(self, name: str = '', initial: float = None, min_limit: float = None,
+                 max_limit: float = None, tolerance: float = None, backoff: float = None):
+        self.name = name
+        self.min_limit = MIN_LIMIT if min_limit is None else min_limit
+        self.max_limit = MAX_LIMIT if max_limit is None else max_limit
+        self.limit = min(self.max_limit, max(self.min_limit, INITIAL_LIMIT if initial is None else initial))
+        self.tolerance = LATENCY_TOLERANCE if tolerance is None else tolerance
+        self.backoff = BACKOFF if backoff is None else backoff
+
+        self.in_flight = 0
+        self.baseline = None
+        self.last_latency = None
+        self.samples = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+
+        self._last_decrease = 0.0
+        self._last_sample = time.monotonic()
+        self._sync_waiting = 0
+        self._async_waiters: deque = deque()
+        self._cond = threading.Condition()
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def acquire(self):
+        """Attend une place (threads)"""
+        with self._cond:
+            self._sync_waiting += 1
+            try:
+                while not self._has_capacity() or self._async_waiters:
+                    self._cond.wait()
+            finally:
+                self._sync_waiting -= 1
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """Attend une place sans bloquer la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._has_capacity() and not self._async_waiters:
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            self._async_waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._cond:
+                if future.done() and not future.cancelled():
+                    # La place venait d'être attribuée : la rendre
+                    self.in_flight -= 1
+                    self._wake()
+                else:
+                    try:
+                        self._async_waiters.remove((loop, future))
+                    except ValueError:
+                        pass
+            raise
+
+    def release(self, latency: float, failed: bool = False):
+        """
+        Libère une place et ajuste la limite
+
+        Args:
+            latency: Durée de la requête (secondes)
+            failed: 5xx, erreur réseau ou timeout
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._update(latency, failed)
+            self._wake()
+
+    def _update(self, latency: float, failed: bool):
+        now = time.monotonic()
+        elapsed, self._last_sample = now - self._last_sample, now
+        self.samples += 1
+        self.last_latency = latency
+        if not failed:
+            if self.baseline is None:
+                self.baseline = latency
+            else:
+                drifted = self.baseline * (1 + BASELINE_DRIFT_PER_SECOND * elapsed)
+                self.baseline = min(latency, drifted)
+
+        spike = self.baseline is not None and latency > self.baseline * self.tolerance
+        if failed or spike:
+            # Une seule diminution par aller-retour : les requêtes lancées avec
+            # l'ancienne limite ne doivent pas la diviser plusieurs fois
+            if now - self._last_decrease >= latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.decreases += 1
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.peak_limit = max(self.peak_limit, self.limit)
+
+    def _wake(self):
+        """Donne les places libres aux attentes asyncio, puis aux threads"""
+        while self._async_waiters and self._has_capacity():
+            loop, future = self._async_waiters.popleft()
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._resolve, future)
+        self._cond.notify_all()
+
+    def _resolve(self, future: asyncio.Future):
+        if future.cancelled():
+            # Annulée entre l'attribution et la reprise : rendre la place
+            with self._cond:
+                self.in_flight -= 1
+                self._wake()
+        elif not future.done():
+            future.set_result(None)
+
+    def snapshot(self) -> Dict:
+        """État courant (pour /api/worker et les benchmarks)"""
+        with self._cond:
+            return {
+                'limit': round(self.limit, 2),
+                'peak_limit': round(self.peak_limit, 2),
+                'in_flight': self.in_flight,
+                'queued': self._sync_waiting + len(self._async_waiters),
+                'baseline_ms': round(self.baseline * 1000, 1) if self.baseline is not None else None,
+                'last_latency_ms': round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+                'samples': self.samples,
+                'decreases': self.decreases,
+            }
+
+
+# Un limiteur d'écritures par instance Grocy, partagé par les clients du processus
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_write_limiter(base_url: str) -> AdaptiveLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(base_url)
+        if limiter is None:
+            limiter = _limiters[base_url] = AdaptiveLimiter(name=base_url)
+        return limiter
+
+
+def write_limiters_report() -> Dict[str, Dict]:
+    """État de tous les limiteurs du processus, par URL Grocy"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
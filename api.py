@@ -4,12 +4,25 @@ API Flask pour importer des recettes dans Grocy
 Exposée pour être appelée par l'extension navigateur
 """
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, g
 from flask_cors import CORS
-from recipe_extractor import RecipeExtractor
-from grocy_client import GrocyClient
+from grocy_http import GrocyUnavailable
+from import_pipeline import (
+    GrocyConnectionError, HtmlSource, ImportPipeline, InstagramSource, TTLCache, WebSource, make_executor
+)
+from log_config import correlation_id, new_correlation_id, setup_logging
+from metrics import render as render_metrics
+from singleflight import SingleFlight, canonical_url
+from source_index import import_lock
 import os
-import tempfile
+import hashlib
+import hmac
+import json
+import logging
+
+# Logs écrits par un thread dédié (LOG_LEVEL, LOG_FORMAT=json)
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Permet les requêtes cross-origin depuis l'extension
@@ -18,6 +31,139 @@ CORS(app)  # Permet les requêtes cross-origin depuis l'extension
 GROCY_URL = os.getenv('GROCY_URL', 'http://localhost:9283')
 GROCY_API_KEY = os.getenv('GROCY_API_KEY', '')
 
+# Active /debug/profile (désactivé si vide) : jeton attendu dans Authorization: Bearer
+PROFILER_TOKEN = os.getenv('PROFILER_TOKEN', '')
+
+# Imports en cours, partagés entre requêtes identiques (même Grocy, même contenu)
+_inflight_imports = SingleFlight()
+
+# Extractions récentes du worker : la prévisualisation puis l'import d'une
+# même page (extension navigateur) n'extraient qu'une fois
+_extract_cache = TTLCache(
+    maxsize=int(os.getenv('IMPORT_EXTRACT_CACHE_SIZE', '64')),
+    ttl=float(os.getenv('IMPORT_EXTRACT_CACHE_TTL', '600')),
+)
+
+# Exécuteur de l'extraction : inline (thread de la requête), thread ou process
+IMPORT_EXTRACT_EXECUTOR = os.getenv('IMPORT_EXTRACT_EXECUTOR', 'inline')
+IMPORT_EXTRACT_WORKERS = int(os.getenv('IMPORT_EXTRACT_WORKERS', '2'))
+_extract_executor = False
+
+@app.before_request
+def _start_correlation():
+    """Identifiant de la requête (X-Request-Id reçu ou nouveau), repris dans chaque log"""
+    g.request_id = request.headers.get('X-Request-Id') or new_correlation_id()
+    g.correlation_token = correlation_id.set(g.request_id)
+
+@app.after_request
+def _send_request_id(response):
+    response.headers['X-Request-Id'] = g.get('request_id', '')
+    return response
+
+@app.teardown_request
+def _end_correlation(exc):
+    token = g.pop('correlation_token', None)
+    if token is not None:
+        correlation_id.reset(token)
+
+def _coalesced(grocy_url, grocy_api_key, url, func, **options):
+    """
+    Exécute func une seule fois pour toutes les requêtes simultanées
+    qui importent la même URL canonique dans le même Grocy, avec la même
+    clé API et les mêmes options (reimport, force_transcription) : une
+    clé refusée ou une réimportation n'attend pas le résultat d'un autre
+    
+    Entre workers gunicorn (processus distincts), un verrou fichier sur
+    l'empreinte de la source sérialise les imports : celui qui attendait
+    retrouve la recette dans l'index des sources (lookup du pipeline, fait
+    sous le verrou) au lieu de l'importer une seconde fois.
+    
+    Returns:
+        Tuple (body, status) de func ; body['coalesced'] vaut True pour
+        les requêtes qui ont reçu le résultat d'un job déjà en cours
+    """
+    def locked():
+        with import_lock(grocy_url, url):
+            return func()
+    
+    key = (
+        grocy_url,
+        hashlib.sha256(grocy_api_key.encode('utf-8')).hexdigest(),
+        canonical_url(url),
+        tuple(sorted(options.items())),
+    )
+    (body, status), shared = _inflight_imports.do(key, locked)
+    if shared:
+        logger.info("♻️ Import déjà en cours pour %s, résultat partagé", url)
+        body = dict(body, coalesced=True)
+    return body, status
+
+def _get_extract_executor():
+    """Exécuteur de l'extraction (IMPORT_EXTRACT_EXECUTOR), créé au premier appel dans le worker"""
+    global _extract_executor
+    if _extract_executor is False:
+        _extract_executor = make_executor(IMPORT_EXTRACT_EXECUTOR, IMPORT_EXTRACT_WORKERS)
+    return _extract_executor
+
+def _pipeline(grocy_url, grocy_api_key):
+    """Pipeline d'import vers ce Grocy, avec le cache et l'exécuteur d'extraction du worker"""
+    executor = _get_extract_executor()
+    return ImportPipeline(
+        grocy_url, grocy_api_key,
+        executors={'extract': executor} if executor is not None else {},
+        caches={'extract': _extract_cache},
+    )
+
+def _run_pipeline(source, grocy_url, grocy_api_key, reimport, message, details_key=None):
+    """
+    Importe source dans Grocy (import mesuré et tracé, voir trace_view.py)
+    
+    Returns:
+        Tuple (body, status) de la réponse
+    """
+    pipeline = _pipeline(grocy_url, grocy_api_key)
+    try:
+        result = pipeline.run(source, reimport=reimport, request_id=correlation_id.get())
+    except GrocyConnectionError as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 500
+    
+    if result.already_imported:
+        return _already_imported_body(result.existing, grocy_url), 200
+    
+    recipe_data = result.recipe
+    logger.info("✅ Import terminé : recette %s (%s)", result.recipe_id,
+                ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.timings.items()))
+    body_data = {
+        'recipe_id': result.recipe_id,
+        'title': recipe_data['title'],
+        'ingredients_count': len(recipe_data['ingredients']),
+        'grocy_url': f"{grocy_url}/#recipe/{result.recipe_id}"
+    }
+    if details_key:
+        body_data[details_key] = result.details
+    
+    return {
+        'success': True,
+        'message': message.format(title=recipe_data['title']),
+        'data': body_data
+    }, 200
+
+def _already_imported_body(existing, grocy_url):
+    """Réponse pour une source déjà importée (même format qu'un import)"""
+    return {
+        'success': True,
+        'message': f"Recette '{existing['title']}' déjà importée",
+        'already_imported': True,
+        'data': {
+            'recipe_id': existing['recipe_id'],
+            'title': existing['title'],
+            'grocy_url': f"{grocy_url}/#recipe/{existing['recipe_id']}"
+        }
+    }
+
 @app.route('/')
 def index():
     """Page d'accueil avec interface web"""
@@ -28,6 +174,106 @@ def health():
     """Endpoint de santé pour vérifier que l'API fonctionne"""
     return jsonify({'status': 'ok', 'message': 'Recipe Importer API is running'})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Métriques au format Prometheus : durée de chaque étape de l'import,
+    requêtes Grocy par import, taux de succès des caches, facteur temps
+    réel de Whisper (tous workers si METRICS_DIR est défini)
+    """
+    return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/worker', methods=['GET'])
+def worker_info():
+    """
+    État du worker courant : mémoire (RSS, part partagée des poids mmap, PSS),
+    espace média, limite adaptative des écritures Grocy (limite courante,
+    écritures en cours et en attente) et état de santé de chaque Grocy
+    """
+    from shared_weights import memory_report
+    from adaptive_limiter import write_limiters_report
+    from grocy_health import health_report
+    return jsonify({
+        'status': 'ok',
+        'memory': memory_report(),
+        'media_workspace': _get_instagram_scraper().workspace.usage(),
+        'grocy_writes': write_limiters_report(),
+        'grocy_health': health_report(),
+    })
+
+@app.route('/debug/profile', methods=['POST'])
+def debug_profile_start():
+    """
+    Lance en arrière-plan un profil par échantillonnage du worker courant
+    pendant ?seconds=N (10 par défaut), à ?hz= échantillons par seconde
+
+    La réponse est immédiate (202) : le worker continue de traiter les
+    requêtes, qui apparaissent dans le profil. Le résultat se récupère
+    ensuite avec GET /debug/profile, depuis n'importe quel worker.
+
+    Nécessite PROFILER_TOKEN ; sans lui, la route n'existe pas.
+    """
+    from sampling_profiler import DEFAULT_HZ, ProfilerBusy, start
+
+    error = _check_profiler_token()
+    if error:
+        return error
+
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        hz = int(request.args.get('hz', DEFAULT_HZ))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'seconds et hz doivent être numériques'}), 400
+
+    logger.info("🔬 Profilage du worker %d pendant %.1fs (%d Hz)", os.getpid(), seconds, hz)
+    try:
+        state = start(seconds, hz=hz)
+    except ProfilerBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    return jsonify(dict(state, success=True)), 202
+
+@app.route('/debug/profile', methods=['GET'])
+def debug_profile():
+    """
+    Dernier profil lancé (tous workers confondus, ?pid= pour un worker) :
+    piles repliées (flamegraph) et fonctions au plus fort temps propre.
+    202 tant qu'il est en cours. ?format=collapsed renvoie uniquement les
+    piles, en texte.
+
+    Nécessite PROFILER_TOKEN ; sans lui, la route n'existe pas.
+    """
+    from sampling_profiler import latest
+
+    error = _check_profiler_token()
+    if error:
+        return error
+
+    try:
+        pid = int(request.args['pid']) if 'pid' in request.args else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'pid doit être numérique'}), 400
+
+    report = latest(pid)
+    if report is None:
+        return jsonify({'success': False, 'error': 'Aucun profil (POST /debug/profile pour en lancer un)'}), 404
+    if report['status'] == 'running':
+        return jsonify(dict(report, success=True)), 202
+    if report['status'] == 'failed':
+        return jsonify(dict(report, success=False)), 500
+
+    if request.args.get('format') == 'collapsed':
+        return Response(report['collapsed'], content_type='text/plain; charset=utf-8')
+    return jsonify(dict(report, success=True))
+
+def _check_profiler_token():
+    """Réponse d'erreur si le profilage est désactivé ou le jeton invalide, sinon None"""
+    if not PROFILER_TOKEN:
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {PROFILER_TOKEN}".encode()):
+        return jsonify({'success': False, 'error': 'Jeton de profilage invalide'}), 401
+    return None
+
 @app.route('/api/import', methods=['POST'])
 def import_recipe():
     """
@@ -37,6 +283,7 @@ def import_recipe():
     {
         "url": "https://www.marmiton.org/...",  // OU
         "html": "<html>...</html>",  // HTML de la recette
+        "reimport": false,  // optionnel, met à jour la recette si l'URL a déjà été importée
         "grocy_url": "http://localhost:9283",  // optionnel
         "grocy_api_key": "..."  // optionnel
     }
@@ -66,53 +313,34 @@ def import_recipe():
                 'error': 'Clé API Grocy manquante'
             }), 400
         
-        # Étape 1 : Extraction de la recette
-        extractor = RecipeExtractor()
-        
         if 'url' in data:
-            print(f"📥 Import depuis URL: {data['url']}")
-            recipe_data = extractor.extract(data['url'])
+            logger.info("📥 Import depuis URL: %s", data['url'])
+            source = WebSource(data['url'])
         else:
-            print(f"📥 Import depuis HTML ({len(data['html'])} caractères)")
-            # Créer un fichier temporaire avec le HTML
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                f.write(data['html'])
-                temp_file = f.name
-            
-            try:
-                recipe_data = extractor.extract(temp_file)
-            finally:
-                os.unlink(temp_file)
-        
-        print(f"✓ Recette extraite: {recipe_data['title']}")
+            source = HtmlSource(data['html'])
         
-        # Étape 2 : Connexion à Grocy
-        grocy = GrocyClient(grocy_url, grocy_api_key)
-        
-        if not grocy.test_connection():
-            return jsonify({
-                'success': False,
-                'error': 'Impossible de se connecter à Grocy'
-            }), 500
+        def run_import():
+            return _run_pipeline(source, grocy_url, grocy_api_key, bool(data.get('reimport')),
+                                 "Recette '{title}' importée avec succès")
         
-        # Étape 3 : Import dans Grocy
-        recipe_id = grocy.import_recipe(recipe_data)
+        if 'url' in data:
+            # Même URL déjà en cours d'import : on attend ce job au lieu de
+            # créer la recette une seconde fois
+            body, status = _coalesced(grocy_url, grocy_api_key, data['url'], run_import,
+                                      reimport=bool(data.get('reimport')))
+        else:
+            body, status = run_import()
         
-        print(f"✓ Recette importée: ID {recipe_id}")
+        return jsonify(body), status
         
+    except GrocyUnavailable as e:
+        logger.error("✗ Grocy indisponible: %s", e)
         return jsonify({
-            'success': True,
-            'message': f"Recette '{recipe_data['title']}' importée avec succès",
-            'data': {
-                'recipe_id': recipe_id,
-                'title': recipe_data['title'],
-                'ingredients_count': len(recipe_data['ingredients']),
-                'grocy_url': f"{grocy_url}/#recipe/{recipe_id}"
-            }
-        })
-        
+            'success': False,
+            'error': str(e)
+        }), 503
     except Exception as e:
-        print(f"✗ Erreur: {str(e)}")
+        logger.exception("✗ Erreur: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -121,7 +349,8 @@ def import_recipe():
 @app.route('/api/preview', methods=['POST'])
 def preview_recipe():
     """
-    Prévisualise une recette sans l'importer
+    Prévisualise une recette sans l'importer (l'extraction reste en cache
+    pour l'import qui suit souvent)
     
     Body JSON:
     {
@@ -144,21 +373,8 @@ def preview_recipe():
                 'error': 'URL ou HTML manquant'
             }), 400
         
-        # Extraction de la recette
-        extractor = RecipeExtractor()
-        
-        if 'url' in data:
-            recipe_data = extractor.extract(data['url'])
-        else:
-            # Créer un fichier temporaire avec le HTML
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                f.write(data['html'])
-                temp_file = f.name
-            
-            try:
-                recipe_data = extractor.extract(temp_file)
-            finally:
-                os.unlink(temp_file)
+        source = WebSource(data['url']) if 'url' in data else HtmlSource(data['html'])
+        recipe_data = _pipeline(GROCY_URL, GROCY_API_KEY).extract(source).recipe
         
         return jsonify({
             'success': True,
@@ -178,29 +394,134 @@ def preview_recipe():
             'error': str(e)
         }), 500
 
+def _find_instagram_cookies():
+    """Cherche le fichier cookies Instagram aux emplacements connus"""
+    possible_paths = [
+        '/app/cookies/instagram.txt',  # Dans Docker
+        './cookies/instagram.txt',      # En local
+        os.path.expanduser('~/cookies/instagram.txt'),
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            logger.info("ℹ️ Utilisation des cookies : %s", path)
+            return path
+    
+    logger.warning("⚠️ Aucun fichier cookies trouvé, tentative sans authentification "
+                   "(voir INSTAGRAM.md pour configurer les cookies)")
+    return None
+
+# Scraper partagé par les requêtes du worker : l'instance yt-dlp et son
+# cookie jar sont créés une seule fois
+_instagram_scraper = None
+
+def _get_instagram_scraper():
+    """Retourne le scraper Instagram du worker (créé au premier appel)"""
+    global _instagram_scraper
+    if _instagram_scraper is None:
+        from instagram_scraper import InstagramScraper
+        _instagram_scraper = InstagramScraper(cookies_file=_find_instagram_cookies())
+    return _instagram_scraper
+
+@app.route('/api/preview/instagram/stream', methods=['POST'])
+def preview_instagram_stream():
+    """
+    Prévisualise un Reel Instagram en streamant la progression
+    
+    Réponse en NDJSON (une ligne JSON par événement) :
+        {"event": "metadata", ...}   description et durée du Reel
+        {"event": "segment", ...}    segment transcrit + état courant de la recette
+        {"event": "done", ...}       recette finale
+        {"event": "error", ...}      en cas d'échec
+    
+    Body JSON:
+    {
+        "url": "https://www.instagram.com/reel/..."
+    }
+    """
+    from audio_transcriber import AudioTranscriber
+    from recipe_parser import RecipeParser, IncrementalRecipeParser
+    
+    data = request.get_json()
+    
+    if not data or 'url' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'URL Instagram manquante'
+        }), 400
+    
+    url = data['url']
+    
+    def events():
+        scraper = _get_instagram_scraper()
+        try:
+            # Métadonnées d'abord : la description arrive avant tout téléchargement
+            with scraper.fetch_metadata(url) as metadata:
+                yield json.dumps({
+                    'event': 'metadata',
+                    'description': metadata.description,
+                    'duration': metadata.duration,
+                    'thumbnail': metadata.thumbnail,
+                }) + "\n"
+                
+                parser = IncrementalRecipeParser(description=metadata.description)
+                transcribed = not RecipeParser().is_caption_sufficient(metadata.description)
+                
+                if transcribed:
+                    audio = metadata.fetch_audio()
+                    transcriber = AudioTranscriber(model_name="medium")
+                    for segment in transcriber.iter_segments(audio.path, language="fr"):
+                        parser.feed(segment['text'])
+                        recipe = parser.snapshot()
+                        yield json.dumps({
+                            'event': 'segment',
+                            'start': segment['start'],
+                            'end': segment['end'],
+                            'text': segment['text'],
+                            'ingredients_count': len(recipe['ingredients']),
+                            'yields': recipe['yields'],
+                            'total_time': recipe['total_time'],
+                            'complete': parser.is_complete(),
+                        }) + "\n"
+                        if parser.is_complete():
+                            break
+            
+            recipe = parser.snapshot()
+            yield json.dumps({
+                'event': 'done',
+                'title': recipe['title'],
+                'ingredients': recipe['ingredients'],
+                'yields': recipe['yields'],
+                'total_time': recipe['total_time'],
+                'has_instructions': bool(recipe['instructions']),
+                'transcribed': transcribed,
+            }) + "\n"
+        except Exception as e:
+            yield json.dumps({'event': 'error', 'error': str(e)}) + "\n"
+    
+    return Response(stream_with_context(events()), mimetype='application/x-ndjson')
+
 @app.route('/api/import/instagram', methods=['POST'])
 def import_instagram_reel():
     """
     Importe une recette depuis un Reel Instagram
     
     Process:
-    1. Télécharge le Reel et extrait la description
-    2. Transcrit l'audio
+    1. Récupère la description du Reel (sans télécharger la vidéo)
+    2. Si la description ne suffit pas : télécharge et transcrit l'audio
     3. Parse les ingrédients et instructions
     4. Importe dans Grocy
     
     Body JSON:
     {
         "url": "https://www.instagram.com/reel/...",
+        "force_transcription": false,  // optionnel, transcrit même si la description suffit
+        "reimport": false,  // optionnel, met à jour la recette si le Reel a déjà été importé
         "grocy_url": "http://localhost:9283",  // optionnel
         "grocy_api_key": "..."  // optionnel
     }
     """
     try:
-        from instagram_scraper import InstagramScraper
-        from audio_transcriber import AudioTranscriber
-        from recipe_parser import RecipeParser
-        
         data = request.get_json()
         
         if not data or 'url' not in data:
@@ -219,94 +540,28 @@ def import_instagram_reel():
                 'error': 'Clé API Grocy manquante'
             }), 400
         
-        print(f"\n{'='*60}")
-        print(f"🎬 Import Instagram Reel")
-        print(f"{'='*60}")
-        print(f"URL: {url}")
-        
-        # Étape 1 : Télécharger le Reel
-        print("\n[1/5] Téléchargement du Reel...")
-        
-        # Chercher le fichier cookies Instagram
-        cookies_file = None
-        possible_paths = [
-            '/app/cookies/instagram.txt',  # Dans Docker
-            './cookies/instagram.txt',      # En local
-            os.path.expanduser('~/cookies/instagram.txt'),
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                cookies_file = path
-                print(f"  ℹ️ Utilisation des cookies : {cookies_file}")
-                break
-        
-        if not cookies_file:
-            print("  ⚠️ Aucun fichier cookies trouvé, tentative sans authentification...")
-            print("  💡 Si ça échoue, voir INSTAGRAM.md pour configurer les cookies")
-        
-        scraper = InstagramScraper(cookies_file=cookies_file)
-        reel_data = scraper.download_reel(url)
-        
-        # Étape 2 : Transcrire l'audio
-        print("\n[2/5] Transcription audio...")
-        transcriber = AudioTranscriber(model_name="medium")  # Modèle medium pour meilleure qualité
-        transcription_result = transcriber.transcribe(reel_data['audio_path'], language="fr")
-        transcription_text = transcription_result['text']
-        
-        # Étape 3 : Parser la recette
-        print("\n[3/5] Parsing de la recette...")
-        parser = RecipeParser()
-        recipe_data = parser.parse_recipe(
-            description=reel_data['description'],
-            transcription=transcription_text
-        )
+        logger.info("🎬 Import Instagram Reel : %s", url)
         
-        # Ajouter les métadonnées Instagram
-        recipe_data['image_url'] = reel_data.get('thumbnail', '')
+        # Modèle medium pour meilleure qualité
+        source = InstagramSource(url, _get_instagram_scraper(),
+                                 force_transcription=bool(data.get('force_transcription')),
+                                 model_name="medium")
         
-        # Étape 4 : Connexion à Grocy
-        print("\n[4/5] Connexion à Grocy...")
-        grocy = GrocyClient(grocy_url, grocy_api_key)
-        
-        if not grocy.test_connection():
-            return jsonify({
-                'success': False,
-                'error': 'Impossible de se connecter à Grocy'
-            }), 500
-        
-        # Étape 5 : Import dans Grocy
-        print("\n[5/5] Import dans Grocy...")
-        recipe_id = grocy.import_recipe(recipe_data)
-        
-        # Nettoyage des fichiers temporaires
-        print("\n🧹 Nettoyage...")
-        scraper.cleanup_files(
-            video_path=reel_data.get('video_path'),
-            audio_path=reel_data.get('audio_path')
-        )
-        
-        print(f"\n✅ Import terminé!")
-        print(f"{'='*60}\n")
+        # Le même Reel partagé à plusieurs personnes ne s'importe qu'une fois
+        body, status = _coalesced(grocy_url, grocy_api_key, url, lambda: _run_pipeline(
+            source, grocy_url, grocy_api_key, bool(data.get('reimport')),
+            "Recette '{title}' importée depuis Instagram", details_key='instagram_data'
+        ), reimport=bool(data.get('reimport')), force_transcription=bool(data.get('force_transcription')))
+        return jsonify(body), status
         
+    except GrocyUnavailable as e:
+        logger.error("❌ Grocy indisponible: %s", e)
         return jsonify({
-            'success': True,
-            'message': f"Recette '{recipe_data['title']}' importée depuis Instagram",
-            'data': {
-                'recipe_id': recipe_id,
-                'title': recipe_data['title'],
-                'ingredients_count': len(recipe_data['ingredients']),
-                'grocy_url': f"{grocy_url}/#recipe/{recipe_id}",
-                'instagram_data': {
-                    'uploader': reel_data.get('uploader', ''),
-                    'duration': reel_data.get('duration', 0),
-                    'transcription_length': len(transcription_text)
-                }
-            }
-        })
-        
+            'success': False,
+            'error': str(e)
+        }), 503
     except Exception as e:
-        print(f"\n❌ Erreur: {str(e)}\n")
+        logger.exception("❌ Erreur: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
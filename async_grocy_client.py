@@ -0,0 +1,466 @@
+"""
+Client Grocy asynchrone, pour les pipelines asyncio (vues Flask async,
+import en lot dans une boucle d'événements)
+
+Même surface que GrocyClient (import_recipe, get_products,
+get_quantity_units, get_or_create_unit, get_or_create_product) :
+- Pool de connexions httpx partageable entre clients
+- Nombre de requêtes simultanées limité par hôte Grocy
+- Mêmes retries et même disjoncteur que le client synchrone
+- Ingrédients d'une recette ajoutés en parallèle
+
+Nécessite : pip install httpx
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from fuzzy_matcher import AUTO_LINK_THRESHOLD
+from grocy_client import UNIT_NAMES, UNIT_VARIANTS, GrocyClient, ProductResult
+from adaptive_limiter import get_write_limiter
+from grocy_health import get_health
+from metrics import observe_grocy_request
+from tracing import span
+from grocy_http import (
+    IDEMPOTENT_METHODS, MAX_RETRIES, RETRY_STATUS, WRITE_METHODS,
+    GrocyUnavailable, backoff_delay, get_breaker
+)
+from product_index import ProductNameIndex, normalize_name
+from source_index import FINGERPRINT_MARKER, source_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+# Requêtes simultanées maximum par hôte Grocy (PHP + SQLite : rester modeste)
+HOST_CONCURRENCY = int(os.getenv('GROCY_ASYNC_CONCURRENCY', '8'))
+
+# Sémaphores par boucle d'événements puis par hôte (un sémaphore asyncio
+# appartient à la boucle qui l'utilise)
+_host_limits: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]' = \
+    weakref.WeakKeyDictionary()
+
+
+def _host_limit(base_url: str, concurrency: int) -> asyncio.Semaphore:
+    limits = _host_limits.setdefault(asyncio.get_running_loop(), {})
+    host = urlsplit(base_url).netloc
+    if host not in limits:
+        limits[host] = asyncio.Semaphore(concurrency)
+    return limits[host]
+
+
+class AsyncGrocyClient:
+    """Client asynchrone pour l'API Grocy"""
+
+    def __init__(self, base_url: str, api_key: str, http_client=None,
+                 concurrency: int = None, source_index=None):
+        """
+        Args:
+            base_url: URL de base de Grocy
+            api_key: Clé API Grocy
+            http_client: httpx.AsyncClient partagé (None = un pool propre au client,
+                fermé par aclose())
+            concurrency: Requêtes simultanées max vers cet hôte (None = GROCY_ASYNC_CONCURRENCY)
+            source_index: Index des recettes déjà importées (None = index par défaut)
+        """
+        import httpx
+
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.headers = {
+            'GROCY-API-KEY': api_key,
+            'Content-Type': 'application/json'
+        }
+        self.concurrency = concurrency or HOST_CONCURRENCY
+        self.max_retries = MAX_RETRIES
+        self.breaker = get_breaker(self.base_url)
+        self.write_limiter = get_write_limiter(self.base_url)
+        self.health = get_health(self.base_url, self.headers)
+
+        self._owns_http = http_client is None
+        self.http = http_client or httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=self.concurrency,
+                                max_keepalive_connections=self.concurrency)
+        )
+        # Réseau, timeout, protocole et réponse illisible (DecodingError)
+        self._transport_errors = (httpx.RequestError,)
+        # Requêtes envoyées, tentatives comprises (métriques par import)
+        self.request_count = 0
+
+        # Analyse des ingrédients et mise en forme : code du client synchrone
+        # (sans E/S), pas d'appel HTTP via cet objet
+        self._helpers = GrocyClient(self.base_url, api_key, source_index=source_index, use_mirror=False)
+
+        self._index: Optional[ProductNameIndex] = None
+        self._units: Optional[List[Dict]] = None
+        self._catalog_lock = asyncio.Lock()
+        self._name_locks: Dict[str, asyncio.Lock] = {}
+
+    async def __aenter__(self) -> 'AsyncGrocyClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._owns_http:
+            await self.http.aclose()
+
+    @property
+    def source_index(self):
+        return self._helpers.source_index
+
+    async def _request(self, method: str, path: str, retry: bool = None, **kwargs):
+        """
+        Appelle Grocy (voir GrocyHttp.request : mêmes retries, même disjoncteur)
+
+        Raises:
+            GrocyUnavailable si Grocy ne répond pas (ou disjoncteur ouvert)
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.max_retries if retry else 0)
+        limit = _host_limit(self.base_url, self.concurrency)
+
+        for attempt in range(1, attempts + 1):
+            self.breaker.before_call()
+            try:
+                response = await self._send(method, path, kwargs, limit)
+            except self._transport_errors as e:
+                self.breaker.record_failure()
+                self.health.record_failure(str(e))
+                if attempt == attempts:
+                    raise GrocyUnavailable(f"Grocy injoignable ({method} {path}): {e}") from e
+            except BaseException:
+                # Annulation (CancelledError) ou erreur inattendue pendant un appel d'essai
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                self.health.record_response(response.status_code)
+                if response.status_code not in RETRY_STATUS or attempt == attempts:
+                    return response
+
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def _send(self, method: str, path: str, kwargs: Dict, limit: asyncio.Semaphore):
+        """
+        Un envoi, dans la limite de l'hôte ; les écritures attendent d'abord
+        une place du limiteur adaptatif (sans occuper de place de l'hôte)
+        """
+        if method not in WRITE_METHODS:
+            async with limit:
+                return await self._timed(method, path, kwargs)
+
+        await self.write_limiter.acquire_async()
+        start = time.perf_counter()
+        failed = True
+        try:
+            async with limit:
+                response = await self._timed(method, path, kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.write_limiter.release(time.perf_counter() - start, failed)
+
+    async def _timed(self, method: str, path: str, kwargs: Dict):
+        """Requête HTTP, comptée et chronométrée pour /metrics"""
+        self.request_count += 1
+        start = time.perf_counter()
+        status = None
+        with span(f"{method} {path}") as current:
+            try:
+                response = await self.http.request(method, f"{self.base_url}{path}", headers=self.headers, **kwargs)
+                status = response.status_code
+                if current is not None:
+                    current.set(status=status)
+                return response
+            finally:
+                observe_grocy_request(method, status, time.perf_counter() - start)
+
+    async def _fetch_objects(self, entity: str, query: List[str] = None) -> list:
+        """
+        Raises:
+            Exception si Grocy ne répond pas 200
+        """
+        response = await self._request(
+            'GET', f"/api/objects/{entity}",
+            params={'query[]': query} if query else None
+        )
+        if response.status_code != 200:
+            raise Exception(f"Erreur lecture {entity} (code {response.status_code}): {response.text}")
+        return response.json()
+
+    async def _create_object(self, entity: str, payload: Dict) -> Optional[int]:
+        response = await self._request('POST', f"/api/objects/{entity}", json=payload)
+        if response.status_code not in [200, 201]:
+            logger.warning("⚠️ Erreur création %s (code %s): %s", entity, response.status_code, response.text)
+            return None
+        return int(response.json()['created_object_id'])
+
+    def is_available(self) -> bool:
+        """État de santé en cache de ce Grocy (voir GrocyClient.is_available)"""
+        return self.health.is_healthy()
+
+    async def test_connection(self) -> bool:
+        try:
+            response = await self._request('GET', "/api/system/info", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def get_products(self) -> list:
+        return await self._fetch_objects('products')
+
+    async def get_quantity_units(self) -> list:
+        return await self._fetch_objects('quantity_units')
+
+    async def _ensure_catalog(self):
+        """Catalogue chargé une fois par client (produits et unités en parallèle)"""
+        async with self._catalog_lock:
+            if self._index is not None:
+                return
+            products, units = await asyncio.gather(self.get_products(), self.get_quantity_units())
+            index = ProductNameIndex()
+            index.rebuild(products)
+            self._index, self._units = index, units
+
+    def _name_lock(self, key: str) -> asyncio.Lock:
+        lock = self._name_locks.get(key)
+        if lock is None:
+            lock = self._name_locks[key] = asyncio.Lock()
+        return lock
+
+    async def get_or_create_unit(self, unit_name: str) -> int:
+        """
+        ID d'une unité, créée si elle n'existe pas (une seule création par
+        nom même si plusieurs ingrédients la demandent en même temps)
+        """
+        await self._ensure_catalog()
+        variants = UNIT_VARIANTS.get(unit_name.lower(), [unit_name.lower()])
+
+        unit = self._find_unit(variants)
+        if unit:
+            return unit['id']
+
+        async with self._name_lock(f"quantity_units:{unit_name.lower()}"):
+            unit = self._find_unit(variants)
+            if unit:
+                return unit['id']
+
+            singular, plural = UNIT_NAMES.get(
+                unit_name, (unit_name.capitalize(), unit_name.capitalize() + 's')
+            )
+            payload = {'name': singular, 'name_plural': plural, 'description': 'Créé automatiquement'}
+            unit_id = await self._create_object('quantity_units', payload)
+            if unit_id is None:
+                # Créée entre-temps par un autre processus : recharger
+                self._units = await self.get_quantity_units()
+                unit = self._find_unit(variants)
+                return unit['id'] if unit else self._default_unit_id()
+
+            logger.info("+ Unité '%s' créée", singular)
+            self._units.append(dict(payload, id=unit_id))
+            return unit_id
+
+    def _find_unit(self, variants: List[str]) -> Optional[Dict]:
+        for unit in self._units:
+            if unit['name'].lower() in variants or (unit.get('name_plural') or '').lower() in variants:
+                return unit
+        return None
+
+    def _default_unit_id(self) -> int:
+        for unit in self._units:
+            if unit.get('name', '').lower() in ['pièce', 'piece', 'unit', 'pc', 'pcs', 'stück', 'stk']:
+                return unit['id']
+        return self._units[0]['id'] if self._units else 1
+
+    async def get_or_create_product(self, product_name: str, unit_id: int) -> Optional[ProductResult]:
+        """
+        Produit correspondant au nom normalisé, créé s'il n'existe pas
+
+        Returns:
+            ProductResult, ou None si la création échoue
+        """
+        await self._ensure_catalog()
+        existing = self._index.get(product_name)
+        if existing is not None:
+            return ProductResult.from_row(existing, 'existing')
+
+        async with self._name_lock(f"products:{normalize_name(product_name)}"):
+            # Produits créés depuis le chargement du catalogue (autres clients)
+            for row in await self._fetch_objects('products', query=[f"id>{self._index.max_id}"]):
+                self._index.add(row)
+            existing = self._index.get(product_name)
+            if existing is not None:
+                return ProductResult.from_row(existing, 'created_elsewhere')
+
+            payload = {
+                'name': product_name,
+                'description': 'Créé automatiquement par recipe importer',
+                'location_id': 1,
+                'qu_id_purchase': unit_id,
+                'qu_id_stock': unit_id,
+                'min_stock_amount': 0,
+            }
+            product_id = await self._create_object('products', payload)
+            if product_id is None:
+                return None
+            row = dict(payload, id=product_id)
+            self._index.add(row)
+            return ProductResult.from_row(row, 'created')
+
+    async def find_recipe_by_source(self, source_url: str) -> Optional[Dict]:
+        """Recette déjà importée depuis la même source (voir GrocyClient.find_recipe_by_source)"""
+        if not self.source_index.is_bootstrapped(self.base_url):
+            for recipe in await self._fetch_objects('recipes'):
+                match = FINGERPRINT_MARKER.search(recipe.get('description') or '')
+                if match:
+                    self.source_index.store(self.base_url, match.group(1), recipe['id'], recipe.get('name'))
+            self.source_index.mark_bootstrapped(self.base_url)
+
+        fingerprint = source_fingerprint(source_url)
+        entry = self.source_index.lookup(self.base_url, fingerprint)
+        if entry is None:
+            return None
+
+        response = await self._request('GET', f"/api/objects/recipes/{entry['recipe_id']}")
+        if response.status_code != 200 or not response.content or response.json() is None:
+            self.source_index.forget(self.base_url, fingerprint)
+            return None
+        return entry
+
+    async def import_recipe(self, recipe_data: Dict[str, Any], update_existing: bool = False) -> int:
+        """
+        Importe une recette dans Grocy (voir GrocyClient.import_recipe)
+
+        Returns:
+            ID de la recette créée (ou existante)
+        """
+        source_url = recipe_data.get('source_url')
+        fingerprint = source_fingerprint(source_url) if source_url else None
+
+        if fingerprint:
+            existing = await self.find_recipe_by_source(source_url)
+            if existing:
+                if update_existing:
+                    await self._update_recipe(existing['recipe_id'], recipe_data, fingerprint)
+                return existing['recipe_id']
+
+        payload = self._helpers._recipe_payload(recipe_data, fingerprint)
+        response = await self._request('POST', "/api/objects/recipes", json=payload)
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Erreur lors de la création de la recette : {response.text}")
+        recipe_id = int(response.json()['created_object_id'])
+
+        if fingerprint:
+            self.source_index.store(self.base_url, fingerprint, recipe_id, recipe_data['title'], source_url)
+
+        if recipe_data['ingredients']:
+            await self._add_recipe_ingredients(recipe_id, recipe_data['ingredients'])
+
+        return recipe_id
+
+    async def _update_recipe(self, recipe_id: int, recipe_data: Dict[str, Any], fingerprint: str):
+        response = await self._request(
+            'PUT', f"/api/objects/recipes/{recipe_id}",
+            json=self._helpers._recipe_payload(recipe_data, fingerprint)
+        )
+        if response.status_code not in [200, 204]:
+            raise Exception(f"Erreur lors de la mise à jour de la recette : {response.text}")
+
+        positions = await self._fetch_objects('recipes_pos', query=[f"recipe_id={recipe_id}"])
+        responses = await asyncio.gather(*(
+            self._request('DELETE', f"/api/objects/recipes_pos/{position['id']}")
+            for position in positions
+        ))
+        for response in responses:
+            if response.status_code not in [200, 204]:
+                raise Exception(f"Erreur lors de la suppression d'un ingrédient : {response.text}")
+
+        if recipe_data['ingredients']:
+            await self._add_recipe_ingredients(recipe_id, recipe_data['ingredients'])
+
+        self.source_index.store(
+            self.base_url, fingerprint, recipe_id, recipe_data['title'], recipe_data.get('source_url')
+        )
+
+    async def _add_recipe_ingredients(self, recipe_id: int, ingredients: list) -> bool:
+        """Ajoute les ingrédients en parallèle (dans la limite de l'hôte)"""
+        await self._ensure_catalog()
+        parsed_ingredients = [self._helpers._parse_ingredient(i) for i in ingredients]
+
+        unknown = [p['product_name'] for p in parsed_ingredients if self._index.get(p['product_name']) is None]
+        candidates = self._index.fuzzy_match(unknown) if unknown else {}
+
+        async def add_one(parsed: Dict) -> bool:
+            unit_id = await self.get_or_create_unit(parsed['unit'])
+
+            best = (candidates.get(parsed['product_name']) or [None])[0]
+            if self._index.get(parsed['product_name']) is None and best and best['score'] >= AUTO_LINK_THRESHOLD:
+                product = ProductResult.from_row(best['product'], 'matched', best['score'])
+            else:
+                product = await self.get_or_create_product(parsed['product_name'], unit_id)
+            if product is None:
+                logger.warning("⚠️ Impossible de créer: %s", parsed['product_name'])
+                return False
+
+            position_id = await self._create_object('recipes_pos', {
+                'recipe_id': recipe_id,
+                'product_id': product.id,
+                'amount': parsed['amount'],
+                'qu_id': unit_id,
+                'note': parsed['original'],
+                'only_check_single_unit_in_stock': 0,
+                'ingredient_group': '',
+                'variable_amount': '',
+            })
+            return position_id is not None
+
+        results = await asyncio.gather(*(add_one(p) for p in parsed_ingredients), return_exceptions=True)
+
+        success_count = 0
+        for parsed, result in zip(parsed_ingredients, results):
+            if isinstance(result, GrocyUnavailable):
+                raise result
+            if isinstance(result, Exception):
+                logger.warning("⚠️ Exception %s: %s", parsed['original'], result)
+            elif result:
+                success_count += 1
+
+        logger.info("✓ %d/%d ingrédients ajoutés", success_count, len(ingredients))
+        return success_count > 0
+
+
+async def import_recipes(client: AsyncGrocyClient, recipes: List[Dict[str, Any]],
+                         concurrency: int = 4) -> List[Dict]:
+    """
+    Importe plusieurs recettes en parallèle dans une boucle asyncio
+
+    Args:
+        client: Client asynchrone (son catalogue est partagé par tous les imports)
+        recipes: Données de recettes (format RecipeExtractor / RecipeParser)
+        concurrency: Recettes importées simultanément
+
+    Returns:
+        Un dict par recette : title, recipe_id ou error
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(recipe: Dict[str, Any]) -> Dict:
+        async with semaphore:
+            try:
+                return {'title': recipe['title'], 'recipe_id': await client.import_recipe(recipe)}
+            except Exception as e:
+                return {'title': recipe['title'], 'error': str(e)}
+
+    return await asyncio.gather(*(run(recipe) for recipe in recipes))
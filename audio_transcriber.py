@@ -4,13 +4,20 @@ Module de transcription audio avec OpenAI Whisper
 Optimisé pour CPU (Xeon X3430)
 """
 
+import logging
 import os
-import whisper
-from typing import Dict, Optional
+import time
+from typing import Dict, Iterator, Optional
+
+from metrics import observe_transcription, stage
+from transcription_backends import SAMPLE_RATE, get_backend
+
+
+logger = logging.getLogger(__name__)
 
 
 class AudioTranscriber:
-    def __init__(self, model_name: str = "medium"):
+    def __init__(self, model_name: str = "medium", backend: Optional[str] = None):
         """
         Initialise le transcripteur Whisper
         
@@ -21,19 +28,24 @@ class AudioTranscriber:
                 - small: ~244M params, meilleure qualité
                 - medium: ~769M params, très précis (RECOMMANDÉ)
                 - large: ~1550M params, le meilleur, très lent
+            backend: Backend d'inférence (None = variable WHISPER_BACKEND)
+                - whisper: openai-whisper fp32 (défaut)
+                - whisper-int8: openai-whisper quantifié int8 dynamique
+                - faster-whisper: CTranslate2 int8 (pip install faster-whisper)
         """
         self.model_name = model_name
-        self.model = None
+        self.backend = get_backend(backend, model_name)
+        self._loaded = False
         
-        print(f"🎙️ Initialisation de Whisper (modèle: {model_name})...")
-        print("   (Le premier lancement téléchargera le modèle)")
+        logger.info("🎙️ Initialisation de Whisper (modèle: %s, backend: %s)", model_name, self.backend.name)
     
     def _load_model(self):
         """Charge le modèle Whisper (lazy loading)"""
-        if self.model is None:
-            print(f"📥 Chargement du modèle Whisper '{self.model_name}'...")
-            self.model = whisper.load_model(self.model_name)
-            print("✓ Modèle chargé")
+        if not self._loaded:
+            logger.info("📥 Chargement du modèle Whisper '%s' (téléchargé au premier lancement)...", self.model_name)
+            self.backend.load()
+            self._loaded = True
+            logger.info("✓ Modèle chargé")
     
     def transcribe(self, audio_path: str, language: str = "fr") -> Dict:
         """
@@ -55,36 +67,109 @@ class AudioTranscriber:
         # Charger le modèle si nécessaire
         self._load_model()
         
-        print(f"🎤 Transcription en cours...")
-        print(f"   Fichier : {audio_path}")
-        print(f"   Langue : {language}")
-        print(f"   (Cela peut prendre 30-60 secondes sur CPU...)")
+        logger.info("🎤 Transcription en cours de %s (langue : %s)...", audio_path, language)
         
         try:
-            # Transcription avec Whisper
-            result = self.model.transcribe(
-                audio_path,
-                language=language,
-                task="transcribe",
-                fp16=False,  # Pas de FP16 sur CPU
-                verbose=False
-            )
-            
-            text = result['text'].strip()
+            # Transcription avec le backend configuré
+            start = time.perf_counter()
+            with stage('transcribe', backend=self.backend.name, model=self.model_name):
+                result = self.backend.transcribe(audio_path, language=language)
+            segments = result.get('segments') or []
+            if segments:
+                observe_transcription(self.backend.name, self.model_name,
+                                      segments[-1].get('end', 0), time.perf_counter() - start)
             
-            print(f"✓ Transcription terminée")
-            print(f"  Texte : {text[:100]}...")
-            print(f"  Langue détectée : {result.get('language', 'N/A')}")
+            logger.info("✓ Transcription terminée (langue détectée : %s)", result.get('language', 'N/A'))
+            logger.debug("Texte : %s...", result['text'][:100])
             
-            return {
-                'text': text,
-                'segments': result.get('segments', []),
-                'language': result.get('language', language)
-            }
+            return result
             
         except Exception as e:
             raise Exception(f"Erreur lors de la transcription : {e}")
     
+    def iter_segments(self, audio_path: str, language: str = "fr",
+                      chunk_seconds: int = 30) -> Iterator[Dict]:
+        """
+        Transcrit un fichier audio fenêtre par fenêtre et produit les segments
+        au fur et à mesure de leur décodage
+        
+        Le consommateur peut interrompre la boucle (break) dès qu'il a ce qu'il
+        lui faut : les fenêtres restantes ne sont alors jamais décodées.
+        
+        Comme la boucle de Whisper, chaque fenêtre reprend là où la
+        précédente s'est arrêtée de façon fiable : le dernier segment d'une
+        fenêtre, peut-être coupé en plein mot ou en pleine quantité, n'est
+        pas produit et la fenêtre suivante commence à son début.
+        
+        Args:
+            audio_path: Chemin vers le fichier audio
+            language: Langue de la transcription (fr, en, etc.)
+            chunk_seconds: Durée d'une fenêtre (30s = fenêtre native de Whisper)
+            
+        Yields:
+            Dicts avec:
+                - start: Timestamp début (secondes, relatif au fichier)
+                - end: Timestamp fin (secondes, relatif au fichier)
+                - text: Texte du segment
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Fichier audio introuvable : {audio_path}")
+        
+        self._load_model()
+        
+        audio = self.backend.load_audio(audio_path)
+        chunk_size = int(chunk_seconds * SAMPLE_RATE)
+        
+        logger.info("🎤 Transcription progressive (%.0fs d'audio)...", len(audio) / SAMPLE_RATE)
+        
+        # Le texte précédent sert de contexte à la fenêtre suivante,
+        # comme le fait Whisper en interne avec condition_on_previous_text
+        previous_text = None
+        position = 0
+        
+        while position < len(audio):
+            chunk = audio[position:position + chunk_size]
+            offset = position / SAMPLE_RATE
+            
+            try:
+                start_time = time.perf_counter()
+                with stage('transcribe', backend=self.backend.name, model=self.model_name,
+                           offset=round(offset, 1), audio_seconds=round(len(chunk) / SAMPLE_RATE, 1)):
+                    result = self.backend.transcribe(
+                        chunk,
+                        language=language,
+                        initial_prompt=previous_text
+                    )
+            except Exception as e:
+                raise Exception(f"Erreur lors de la transcription : {e}")
+            observe_transcription(self.backend.name, self.model_name,
+                                  len(chunk) / SAMPLE_RATE, time.perf_counter() - start_time)
+            
+            segments = [seg for seg in result.get('segments', []) if seg.get('text', '').strip()]
+            next_position = position + chunk_size
+            
+            if next_position < len(audio) and segments:
+                if len(segments) > 1:
+                    # Dernier segment retranscrit en entier dans la fenêtre suivante
+                    held = segments.pop()
+                    next_position = position + int(held.get('start', 0) * SAMPLE_RATE)
+                else:
+                    next_position = position + int(segments[-1].get('end', 0) * SAMPLE_RATE)
+                # Toujours avancer, même sur des timestamps aberrants
+                if next_position <= position:
+                    next_position = position + chunk_size
+            
+            for seg in segments:
+                yield {
+                    'start': seg.get('start', 0) + offset,
+                    'end': seg.get('end', 0) + offset,
+                    'text': seg['text'].strip()
+                }
+            
+            if segments:
+                previous_text = " ".join(seg['text'].strip() for seg in segments)[-200:]
+            position = next_position
+    
     def transcribe_segments(self, audio_path: str, language: str = "fr") -> list:
         """
         Transcrit et retourne les segments avec timestamps
@@ -112,9 +197,12 @@ class AudioTranscriber:
 # Test du module
 if __name__ == '__main__':
     import sys
+    from log_config import setup_logging
+    
+    setup_logging()
     
     if len(sys.argv) < 2:
-        print("Usage: python audio_transcriber.py <AUDIO_FILE>")
+        print("Usage: python audio_transcriber.py <AUDIO_FILE> [MODEL] [BACKEND]")
         print("\nModèles disponibles:")
         print("  tiny  - Le plus rapide, moins précis (~1GB RAM)")
         print("  base  - Bon compromis (recommandé) (~1GB RAM)")
@@ -123,8 +211,9 @@ if __name__ == '__main__':
     
     audio_path = sys.argv[1]
     model = sys.argv[2] if len(sys.argv) > 2 else "base"
+    backend = sys.argv[3] if len(sys.argv) > 3 else None
     
-    transcriber = AudioTranscriber(model_name=model)
+    transcriber = AudioTranscriber(model_name=model, backend=backend)
     
     try:
         result = transcriber.transcribe(audio_path)
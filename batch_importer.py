@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Import en lot de Reels Instagram, en pipeline
+
+Les trois étapes se recouvrent : pendant que le Reel N est transcrit,
+le Reel N+1 se télécharge et le Reel N-1 s'écrit dans Grocy.
+Chaque étape a sa propre file bornée et son propre nombre de workers.
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from audio_transcriber import AudioTranscriber
+from grocy_client import GrocyClient
+from instagram_scraper import InstagramScraper
+from log_config import correlation, new_correlation_id, setup_logging
+from media_workspace import MediaWorkspace
+from recipe_parser import RecipeParser, IncrementalRecipeParser
+from source_index import import_lock
+
+
+# Marqueur de fin de file (un par worker de l'étape)
+_STOP = object()
+
+
+class _Stage:
+    """Une étape du pipeline : N threads qui consomment une file bornée"""
+
+    def __init__(self, name: str, func: Callable[[Dict], None], workers: int,
+                 inbox: queue.Queue, outbox: queue.Queue):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Attend la fin de l'étape une fois sa file entièrement consommée"""
+        for _ in self._threads:
+            self.inbox.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            job = self.inbox.get()
+            if job is _STOP:
+                return
+
+            # Un job en erreur ou déjà importé traverse les étapes suivantes sans traitement
+            if not job.get('error') and not job.get('skip'):
+                start = time.perf_counter()
+                try:
+                    # Même identifiant pour un Reel dans toutes les étapes
+                    with correlation(job['id']):
+                        self.func(job)
+                except Exception as e:
+                    job['error'] = f"{self.name} : {e}"
+                elapsed = time.perf_counter() - start
+
+                with self._lock:
+                    self.busy_seconds += elapsed
+                    self.processed += 1
+                    if job.get('error'):
+                        self.failed += 1
+
+            self.outbox.put(job)
+
+
+class BatchReelImporter:
+    """Importe une liste de Reels en recouvrant téléchargement, transcription et écriture"""
+
+    def __init__(self, grocy_url: str, grocy_api_key: str, cookies_file: str = None,
+                 download_workers: int = 2, transcribe_workers: int = 1,
+                 write_workers: int = 1, queue_size: int = 2,
+                 model_name: str = "medium"):
+        """
+        Args:
+            grocy_url: URL de Grocy
+            grocy_api_key: Clé API Grocy
+            cookies_file: Fichier cookies Instagram (optionnel)
+            download_workers: Téléchargements simultanés
+            transcribe_workers: Transcriptions simultanées (1 par cœur CPU au plus)
+            write_workers: Imports Grocy simultanés
+            queue_size: Taille de chaque file entre deux étapes (limite l'avance
+                prise par le téléchargement, donc l'espace disque utilisé)
+            model_name: Modèle Whisper
+        """
+        self.grocy_url = grocy_url
+        self.grocy_api_key = grocy_api_key
+        self.cookies_file = cookies_file
+        self.model_name = model_name
+        self.queue_size = queue_size
+        self.workers = {
+            'download': download_workers,
+            'transcribe': transcribe_workers,
+            'write': write_workers,
+        }
+
+        # Un espace média commun, un scraper (et donc une instance yt-dlp) par thread
+        self._workspace = MediaWorkspace()
+        self._local = threading.local()
+        self._caption_parser = RecipeParser()
+
+        self.stages: List[_Stage] = []
+        self.elapsed = 0.0
+
+    def run(self, urls: List[str]) -> List[Dict]:
+        """
+        Importe tous les Reels
+
+        Returns:
+            Un dict par URL : url, title, recipe_id ou error
+        """
+        inbox = queue.Queue()
+        to_transcribe = queue.Queue(maxsize=self.queue_size)
+        to_write = queue.Queue(maxsize=self.queue_size)
+        done = queue.Queue()
+
+        self.stages = [
+            _Stage('download', self._download, self.workers['download'], inbox, to_transcribe),
+            _Stage('transcribe', self._transcribe, self.workers['transcribe'], to_transcribe, to_write),
+            _Stage('write', self._write, self.workers['write'], to_write, done),
+        ]
+
+        start = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+
+        for url in urls:
+            inbox.put({'url': url, 'id': new_correlation_id()})
+
+        # Arrêt en cascade : une étape s'arrête quand la précédente a tout produit
+        for stage in self.stages:
+            stage.stop()
+
+        self.elapsed = time.perf_counter() - start
+
+        results = []
+        while not done.empty():
+            job = done.get()
+            results.append({
+                'url': job['url'],
+                'title': job.get('recipe', {}).get('title'),
+                'recipe_id': job.get('recipe_id'),
+                'error': job.get('error'),
+            })
+
+        # Même ordre que les URLs fournies
+        order = {url: i for i, url in enumerate(urls)}
+        results.sort(key=lambda r: order[r['url']])
+        return results
+
+    def report(self) -> Dict[str, Dict]:
+        """Utilisation de chaque étape : temps occupé / (durée totale × workers)"""
+        report = {}
+        for stage in self.stages:
+            capacity = self.elapsed * stage.workers
+            report[stage.name] = {
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'failed': stage.failed,
+                'busy_seconds': stage.busy_seconds,
+                'utilization': stage.busy_seconds / capacity if capacity else 0.0,
+            }
+        return report
+
+    def _thread_resource(self, name: str, factory: Callable):
+        """Ressource propre au thread courant (scraper, transcripteur, client)"""
+        resource = getattr(self._local, name, None)
+        if resource is None:
+            resource = factory()
+            setattr(self._local, name, resource)
+        return resource
+
+    def _download(self, job: Dict):
+        """Étape 1 : métadonnées, puis média seulement si la description ne suffit pas"""
+        grocy = self._thread_resource('grocy', lambda: GrocyClient(self.grocy_url, self.grocy_api_key))
+        existing = grocy.find_recipe_by_source(job['url'])
+        if existing:
+            job['recipe'] = {'title': existing['title']}
+            job['recipe_id'] = existing['recipe_id']
+            job['skip'] = True
+            return
+
+        scraper = self._thread_resource('scraper', lambda: InstagramScraper(
+            cookies_file=self.cookies_file, workspace=self._workspace
+        ))
+        metadata = scraper.fetch_metadata(job['url'])
+        job['metadata'] = metadata
+
+        if not self._caption_parser.is_caption_sufficient(metadata.description):
+            # Lecture du chemin = téléchargement + extraction audio
+            metadata.fetch_audio().path
+
+    def _transcribe(self, job: Dict):
+        """Étape 2 : transcription (si média) et parsing ; libère les médias"""
+        metadata = job['metadata']
+        transcription = ""
+
+        with metadata:
+            audio = metadata.fetch_audio()
+            if audio.downloaded:
+                transcriber = self._thread_resource(
+                    'transcriber', lambda: AudioTranscriber(model_name=self.model_name)
+                )
+                incremental = IncrementalRecipeParser(description=metadata.description)
+                for segment in transcriber.iter_segments(audio.path, language="fr"):
+                    incremental.feed(segment['text'])
+                    if incremental.is_complete():
+                        break
+                transcription = incremental.transcription
+
+        recipe = self._caption_parser.parse_recipe(metadata.description, transcription)
+        recipe['image_url'] = metadata.thumbnail
+        recipe['source_url'] = job['url']
+        job['recipe'] = recipe
+
+    def _write(self, job: Dict):
+        """Étape 3 : import dans Grocy"""
+        grocy = self._thread_resource('grocy', lambda: GrocyClient(self.grocy_url, self.grocy_api_key))
+        # Recherche refaite sous le verrou : le même Reel a pu être importé
+        # depuis le téléchargement (doublon dans le lot, import par l'API)
+        with import_lock(grocy.base_url, job['url']):
+            job['recipe_id'] = grocy.import_recipe(job['recipe'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en lot de Reels Instagram vers Grocy")
+    parser.add_argument('file', help="Fichier texte avec une URL de Reel par ligne")
+    parser.add_argument('--grocy-url', default=os.getenv('GROCY_URL', 'http://localhost:9283'))
+    parser.add_argument('--api-key', default=os.getenv('GROCY_API_KEY', ''))
+    parser.add_argument('--cookies', default=None, help="Fichier cookies Instagram")
+    parser.add_argument('--download-workers', type=int, default=2)
+    parser.add_argument('--transcribe-workers', type=int, default=1)
+    parser.add_argument('--write-workers', type=int, default=1)
+    parser.add_argument('--queue-size', type=int, default=2)
+    parser.add_argument('--model', default='medium', help="Modèle Whisper")
+    args = parser.parse_args()
+    setup_logging()
+
+    if not args.api_key:
+        print("❌ Clé API Grocy manquante (--api-key ou GROCY_API_KEY)")
+        sys.exit(1)
+
+    with open(args.file, encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    importer = BatchReelImporter(
+        args.grocy_url, args.api_key,
+        cookies_file=args.cookies,
+        download_workers=args.download_workers,
+        transcribe_workers=args.transcribe_workers,
+        write_workers=args.write_workers,
+        queue_size=args.queue_size,
+        model_name=args.model,
+    )
+
+    print(f"🎬 Import de {len(urls)} Reel(s)...")
+    results = importer.run(urls)
+
+    print("\n" + "=" * 60)
+    print("📊 Résultats")
+    print("=" * 60)
+    for r in results:
+        if r['error']:
+            print(f"❌ {r['url']}\n   {r['error']}")
+        else:
+            print(f"✅ {r['title']} → {args.grocy_url}/#recipe/{r['recipe_id']}")
+
+    print("\n" + "=" * 60)
+    print(f"⏱️ Utilisation des étapes ({importer.elapsed:.1f}s au total)")
+    print("=" * 60)
+    for name, stats in importer.report().items():
+        print(f"  {name:12} {stats['workers']} worker(s)  {stats['processed']:3} traité(s)  "
+              f"{stats['busy_seconds']:7.1f}s occupé  {stats['utilization']:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark de GrocyClient.import_recipe sur un faux Grocy local
+
+Pour chaque taille de catalogue, mesure :
+- le premier import (chargement du catalogue, index de noms, matcher)
+- les imports suivants : recettes/s et requêtes HTTP par import
+
+Usage:
+    python bench_grocy.py
+    python bench_grocy.py --sizes 100,50000 --recipes 50 --latency 0.005 --error-rate 0.01
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+# Miroir et verrous dans un dossier jetable : ne pas toucher au cache de l'utilisateur
+# (lu à l'import de grocy_mirror / file_lock)
+BENCH_DIR = tempfile.mkdtemp(prefix='grocy-bench-')
+os.environ['GROCY_MIRROR_DIR'] = BENCH_DIR
+
+from fake_grocy import FakeGrocy, make_recipes  # noqa: E402
+from grocy_client import GrocyClient  # noqa: E402
+from source_index import SourceIndex  # noqa: E402
+
+
+DEFAULT_SIZES = '100,1000,10000,50000'
+
+
+def bench_catalog(size: int, recipes, latency: float, error_rate: float, use_mirror: bool) -> dict:
+    """
+    Importe les recettes dans un faux Grocy de size produits
+
+    Returns:
+        Mesures : durée du premier import, recettes/s et requêtes par
+        import ensuite, échecs et requêtes les plus fréquentes
+    """
+    mode = 'mirror' if use_mirror else 'direct'
+    with FakeGrocy(latency=latency, error_rate=error_rate, catalog_size=size) as grocy:
+        client = GrocyClient(
+            grocy.url, 'fake', use_mirror=use_mirror,
+            source_index=SourceIndex(os.path.join(BENCH_DIR, f"sources-{size}-{mode}.sqlite3"))
+        )
+        failures = 0
+
+        def run(batch):
+            nonlocal failures
+            for recipe in batch:
+                try:
+                    if not client.import_recipe(recipe):
+                        failures += 1
+                except Exception:
+                    # Erreurs simulées (--error-rate) : POST non rejoué, GrocyUnavailable...
+                    failures += 1
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(recipes[:1])
+            first = time.perf_counter() - start
+            first_requests = grocy.stats['total']
+
+            grocy.reset_stats()
+            start = time.perf_counter()
+            run(recipes[1:])
+            elapsed = time.perf_counter() - start
+
+        count = max(1, len(recipes) - 1)
+        stats = dict(grocy.stats)
+        total = stats.pop('total', 0)
+        return {
+            'size': size,
+            'mode': mode,
+            'first_seconds': first,
+            'first_requests': first_requests,
+            'imports_per_second': count / elapsed if elapsed else float('inf'),
+            'requests_per_import': total / count,
+            'failures': failures,
+            'top_requests': sorted(stats.items(), key=lambda item: -item[1])[:4],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'import de recettes sur un faux Grocy")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Tailles de catalogue (produits), séparées par des virgules")
+    parser.add_argument('--recipes', type=int, default=20, help="Recettes importées par taille")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence ajoutée par requête (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Proportion de réponses 500")
+    parser.add_argument('--mirror', choices=['on', 'off', 'both'], default='both',
+                        help="Avec ou sans miroir SQLite local")
+    parser.add_argument('--verbose', action='store_true', help="Détail des requêtes les plus fréquentes")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    modes = {'on': [True], 'off': [False], 'both': [True, False]}[args.mirror]
+    recipes = make_recipes(max(2, args.recipes))
+
+    print(f"📊 {len(recipes)} recettes par catalogue, latence {args.latency * 1000:.0f} ms, "
+          f"erreurs {args.error_rate:.0%}")
+    print(f"  {'produits':>8}  {'mode':<6}  {'1er import':>10}  {'req.':>5}  "
+          f"{'imports/s':>9}  {'req./import':>11}  {'échecs':>6}")
+    try:
+        for size in sizes:
+            for use_mirror in modes:
+                r = bench_catalog(size, recipes, args.latency, args.error_rate, use_mirror)
+                print(f"  {r['size']:>8}  {r['mode']:<6}  {r['first_seconds']:>9.2f}s  {r['first_requests']:>5}  "
+                      f"{r['imports_per_second']:>9.1f}  {r['requests_per_import']:>11.1f}  {r['failures']:>6}")
+                if args.verbose:
+                    print("            " + ", ".join(f"{key}: {n}" for key, n in r['top_requests']))
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare GrocyClient (synchrone) et AsyncGrocyClient sur un faux Grocy local
+
+Usage:
+    python bench_grocy_async.py --recipes 20 --latency 0.02 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+# Miroir, verrous et index dans un dossier jetable : ne pas toucher au cache
+# de l'utilisateur ni réutiliser l'état d'un lancement précédent
+# (lu à l'import de grocy_mirror / file_lock)
+BENCH_DIR = tempfile.mkdtemp(prefix='grocy-bench-async-')
+os.environ['GROCY_MIRROR_DIR'] = BENCH_DIR
+
+from async_grocy_client import AsyncGrocyClient, import_recipes  # noqa: E402
+from fake_grocy import FakeGrocy, make_recipes  # noqa: E402
+from grocy_client import GrocyClient  # noqa: E402
+from source_index import SourceIndex  # noqa: E402
+
+
+def bench_sync(recipes, latency: float) -> float:
+    with FakeGrocy(latency=latency) as grocy:
+        client = GrocyClient(grocy.url, 'fake', use_mirror=False,
+                             source_index=SourceIndex(os.path.join(BENCH_DIR, 'sync.sqlite3')))
+        start = time.perf_counter()
+        for recipe in recipes:
+            client.import_recipe(recipe)
+        return time.perf_counter() - start
+
+
+async def bench_async(recipes, latency: float, concurrency: int) -> float:
+    with FakeGrocy(latency=latency) as grocy:
+        async with AsyncGrocyClient(grocy.url, 'fake',
+                                    source_index=SourceIndex(os.path.join(BENCH_DIR, 'async.sqlite3'))) as client:
+            start = time.perf_counter()
+            results = await import_recipes(client, recipes, concurrency=concurrency)
+            elapsed = time.perf_counter() - start
+        errors = [r for r in results if 'error' in r]
+        if errors:
+            print(f"⚠️ {len(errors)} erreur(s), ex: {errors[0]['error']}")
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark client Grocy synchrone vs asynchrone")
+    parser.add_argument('--recipes', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.02, help="Latence ajoutée par requête (s)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Recettes simultanées (async)")
+    args = parser.parse_args()
+
+    recipes = make_recipes(args.recipes)
+    try:
+        sync_seconds = bench_sync(recipes, args.latency)
+        async_seconds = asyncio.run(bench_async(recipes, args.latency, args.concurrency))
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+    print(f"📊 {args.recipes} recettes, latence {args.latency * 1000:.0f} ms/requête")
+    print(f"  sync   {sync_seconds:6.2f}s  {args.recipes / sync_seconds:6.1f} recettes/s")
+    print(f"  async  {async_seconds:6.2f}s  {args.recipes / async_seconds:6.1f} recettes/s  "
+          f"(x{sync_seconds / async_seconds:.1f}, {args.concurrency} recettes simultanées)")
+
+
+if __name__ == '__main__':
+    main()
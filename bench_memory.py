@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire de l'import d'un Reel sur une fixture fixe
+
+Rejoue N fois le chemin d'un import Instagram (transcription, parsing,
+écriture dans un faux Grocy local) avec tracemalloc actif, et affiche :
+- le pic de mémoire Python de chaque étape et de l'import complet
+- le RSS du processus avant, après le premier import et à la fin
+- la croissance de la mémoire tracée par import une fois le régime
+  établi : une valeur qui ne revient pas vers 0 signale une fuite
+
+Sans --audio, la transcription de la fixture intégrée est utilisée telle
+quelle (pas de Whisper) : seuls parsing et écriture Grocy sont mesurés.
+
+Usage:
+    python bench_memory.py --imports 200
+    python bench_memory.py --audio fixtures/audio/gateau.mp3 --model base --imports 5
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+
+# Miroir, verrous et traces dans un dossier jetable (lus à l'import des modules)
+BENCH_DIR = tempfile.mkdtemp(prefix='memory-bench-')
+os.environ['GROCY_MIRROR_DIR'] = BENCH_DIR
+os.environ['TRACING'] = '0'
+
+import memory_tracking  # noqa: E402
+
+memory_tracking.enable()
+
+from fake_grocy import FakeGrocy  # noqa: E402
+from grocy_client import GrocyClient  # noqa: E402
+from metrics import stage, track_import  # noqa: E402
+from recipe_parser import IncrementalRecipeParser, RecipeParser  # noqa: E402
+from shared_weights import memory_report  # noqa: E402
+from source_index import SourceIndex  # noqa: E402
+
+
+# Reel type : description courte, recette dictée dans la vidéo
+FIXTURE_DESCRIPTION = """Le gratin dauphinois de ma grand-mère 🥔
+Recette en vidéo, à tester ce week-end ! #gratin #recette"""
+
+FIXTURE_TRANSCRIPTION = """Aujourd'hui je vous montre mon gratin dauphinois.
+Pour 6 personnes il vous faut 1 kg de pommes de terre, 50 cl de lait,
+20 cl de crème fraîche, 2 gousses d'ail, 30 g de beurre, du sel, du poivre
+et un peu de muscade.
+On épluche les pommes de terre et on les coupe en fines rondelles.
+On fait chauffer le lait avec la crème, l'ail écrasé et la muscade.
+On beurre le plat, on dispose les pommes de terre et on verse le mélange.
+On enfourne 1 heure à 160 degrés, jusqu'à ce que le dessus soit bien doré."""
+
+
+def _serve_fake_grocy(catalog_size: int, conn):
+    """Faux Grocy dans un processus à part : ses lignes stockées ne comptent pas dans la mesure"""
+    with FakeGrocy(catalog_size=catalog_size) as grocy:
+        conn.send(grocy.url)
+        conn.recv()
+
+
+def _mb(size: float) -> str:
+    return f"{size / (1024 * 1024):8.1f} MB"
+
+
+def bench(imports: int, audio: str, model: str, backend: str, catalog_size: int) -> dict:
+    transcriber = None
+    if audio:
+        from audio_transcriber import AudioTranscriber
+        transcriber = AudioTranscriber(model_name=model, backend=backend)
+
+    stage_peaks = {}
+    import_peaks = []
+    traced_after = []
+    rss_before = memory_report()['rss_mb']
+    rss_first = None
+
+    conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve_fake_grocy, args=(catalog_size, child_conn), daemon=True)
+    server.start()
+    try:
+        client = GrocyClient(conn.recv(), 'fake',
+                             source_index=SourceIndex(os.path.join(BENCH_DIR, 'sources.sqlite3')))
+        parser = RecipeParser()
+
+        for i in range(imports):
+            with track_import('instagram') as tracker:
+                tracker.grocy = client
+                if transcriber is not None:
+                    incremental = IncrementalRecipeParser(description=FIXTURE_DESCRIPTION)
+                    for segment in transcriber.iter_segments(audio, language="fr"):
+                        incremental.feed(segment['text'])
+                        if incremental.is_complete():
+                            break
+                    transcription = incremental.transcription
+                else:
+                    transcription = FIXTURE_TRANSCRIPTION
+
+                with stage('parse'):
+                    recipe = parser.parse_recipe(FIXTURE_DESCRIPTION, transcription)
+                recipe['source_url'] = f"https://www.instagram.com/reel/fixture{i}/"
+                client.import_recipe(recipe)
+
+            for name, peak in tracker.stage_peaks.items():
+                stage_peaks.setdefault(name, []).append(peak)
+            import_peaks.append(tracker.peak_bytes)
+
+            gc.collect()
+            traced_after.append(memory_tracking.traced_bytes())
+            if rss_first is None:
+                rss_first = memory_report()['rss_mb']
+    finally:
+        conn.send('stop')
+        server.join(timeout=5)
+
+    # Croissance par import sur la seconde moitié (caches chauds, index construits)
+    half = len(traced_after) // 2
+    steady = traced_after[half:]
+    growth = (steady[-1] - steady[0]) / (len(steady) - 1) if len(steady) > 1 else 0.0
+
+    return {
+        'stage_peaks': stage_peaks,
+        'import_peaks': import_peaks,
+        'rss_before_mb': rss_before,
+        'rss_first_mb': rss_first,
+        'rss_end_mb': memory_report()['rss_mb'],
+        'traced_first': traced_after[0],
+        'traced_end': traced_after[-1],
+        'growth_per_import': growth,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic mémoire et fuites de l'import d'un Reel")
+    parser.add_argument('--imports', type=int, default=50, help="Nombre d'imports de la fixture")
+    parser.add_argument('--audio', default=None, help="Fichier audio à transcrire (défaut : transcription intégrée)")
+    parser.add_argument('--model', default='base', help="Modèle Whisper (avec --audio)")
+    parser.add_argument('--backend', default=None, help="Backend de transcription (avec --audio)")
+    parser.add_argument('--catalog-size', type=int, default=1000, help="Produits du faux Grocy")
+    args = parser.parse_args()
+
+    print(f"🧠 {args.imports} import(s) de la fixture, catalogue de {args.catalog_size} produits"
+          + (f", audio {args.audio}" if args.audio else ", sans transcription"))
+    try:
+        r = bench(max(1, args.imports), args.audio, args.model, args.backend, args.catalog_size)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+    print(f"\n  {'étape':<20} {'pic médian':>11} {'pic max':>11}")
+    for name, peaks in sorted(r['stage_peaks'].items(), key=lambda item: -max(item[1])):
+        print(f"  {name:<20} {_mb(statistics.median(peaks))} {_mb(max(peaks))}")
+    print(f"  {'import complet':<20} {_mb(statistics.median(r['import_peaks']))} {_mb(max(r['import_peaks']))}")
+
+    print(f"\n  RSS avant            {_mb(r['rss_before_mb'] * 1024 * 1024)}")
+    print(f"  RSS après 1 import   {_mb(r['rss_first_mb'] * 1024 * 1024)}")
+    print(f"  RSS à la fin         {_mb(r['rss_end_mb'] * 1024 * 1024)}")
+    print(f"  Mémoire tracée       {_mb(r['traced_first'])} → {_mb(r['traced_end'])}")
+    print(f"  Croissance / import  {r['growth_per_import'] / 1024:8.1f} KB (seconde moitié)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark des backends de transcription
+Mesure le facteur temps réel (RTF) et le taux d'erreur mots (WER)
+
+Jeu de fixtures : un dossier contenant des fichiers audio et, pour chacun,
+un fichier .txt de même nom avec la transcription de référence.
+
+    fixtures/audio/
+        gateau.mp3
+        gateau.txt
+        ...
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from transcription_backends import BACKENDS, SAMPLE_RATE, get_backend
+
+
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.ogg', '.flac']
+
+
+def normalize_words(text: str) -> List[str]:
+    """Met en minuscules et retire la ponctuation avant comparaison"""
+    text = re.sub(r"[^\w\s']", ' ', text.lower())
+    return text.split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """WER = distance d'édition en mots / nombre de mots de référence"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Distance de Levenshtein sur les mots, une ligne à la fois
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,  # Suppression
+                current[j - 1] + 1,  # Insertion
+                previous[j - 1] + (ref_word != hyp_word)  # Substitution
+            ))
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def find_fixtures(fixtures_dir: Path) -> list:
+    """Retourne les couples (audio, texte de référence)"""
+    fixtures = []
+    for audio_path in sorted(fixtures_dir.iterdir()):
+        if audio_path.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference_path = audio_path.with_suffix('.txt')
+        if not reference_path.exists():
+            print(f"  ⚠️ Pas de référence pour {audio_path.name}, ignoré")
+            continue
+        fixtures.append((audio_path, reference_path.read_text(encoding='utf-8')))
+    return fixtures
+
+
+def bench_backend(backend_name: str, model_name: str, fixtures: list, language: str) -> dict:
+    """Transcrit toutes les fixtures avec un backend et agrège RTF et WER"""
+    backend = get_backend(backend_name, model_name)
+
+    start = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - start
+
+    total_audio = 0.0
+    total_compute = 0.0
+    total_errors = 0.0
+    total_words = 0
+
+    for audio_path, reference in fixtures:
+        audio = backend.load_audio(str(audio_path))
+        duration = len(audio) / SAMPLE_RATE
+
+        start = time.perf_counter()
+        result = backend.transcribe(audio, language=language)
+        elapsed = time.perf_counter() - start
+
+        wer = word_error_rate(reference, result['text'])
+        words = len(normalize_words(reference))
+
+        print(f"  {audio_path.name:30} {duration:6.1f}s  RTF {elapsed / duration:5.2f}  WER {wer:6.1%}")
+
+        total_audio += duration
+        total_compute += elapsed
+        total_errors += wer * words
+        total_words += words
+
+    return {
+        'backend': backend_name,
+        'load_time': load_time,
+        'rtf': total_compute / total_audio if total_audio else 0.0,
+        'wer': total_errors / total_words if total_words else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RTF/WER des backends de transcription")
+    parser.add_argument('--fixtures', default='fixtures/audio', help="Dossier audio + .txt de référence")
+    parser.add_argument('--model', default='base', help="Modèle Whisper (tiny, base, small, medium...)")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), help="Backends à comparer")
+    parser.add_argument('--language', default='fr')
+    args = parser.parse_args()
+
+    fixtures_dir = Path(args.fixtures)
+    if not fixtures_dir.is_dir():
+        print(f"❌ Dossier de fixtures introuvable : {fixtures_dir}")
+        sys.exit(1)
+
+    fixtures = find_fixtures(fixtures_dir)
+    if not fixtures:
+        print(f"❌ Aucune fixture audio avec référence dans {fixtures_dir}")
+        sys.exit(1)
+
+    results = []
+    for backend_name in args.backends:
+        print(f"\n🎙️ Backend {backend_name} (modèle {args.model})")
+        try:
+            results.append(bench_backend(backend_name, args.model, fixtures, args.language))
+        except ImportError as e:
+            print(f"  ⏭️ Backend indisponible : {e}")
+
+    print("\n" + "=" * 60)
+    print(f"{'Backend':20} {'Chargement':>12} {'RTF':>8} {'WER':>8}")
+    print("=" * 60)
+    for r in results:
+        print(f"{r['backend']:20} {r['load_time']:11.1f}s {r['rtf']:8.2f} {r['wer']:8.1%}")
+
+
+if __name__ == '__main__':
+    main()
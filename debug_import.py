@@ -3,11 +3,11 @@
 Script de debug pour comprendre pourquoi l'import ne fonctionne pas
 """
 
+import os
 import sys
 import json
-import requests
-from recipe_extractor import RecipeExtractor
-from grocy_client import GrocyClient
+from import_pipeline import ImportPipeline, ImportResult, WebSource
+from log_config import setup_logging
 
 def main():
     if len(sys.argv) < 4:
@@ -15,6 +15,9 @@ def main():
         print("Example: python3 debug_import.py exemple-recette.html http://localhost:9283 ta_clé")
         sys.exit(1)
     
+    # Détail de chaque ingrédient (niveau DEBUG) sauf si LOG_LEVEL est défini
+    setup_logging(os.getenv('LOG_LEVEL', 'DEBUG'))
+
     source = sys.argv[1]
     grocy_url = sys.argv[2]
     api_key = sys.argv[3]
@@ -27,14 +30,17 @@ def main():
     print(f"API Key: {api_key[:10]}...{api_key[-4:]}")
     print()
     
+    pipeline = ImportPipeline(grocy_url, api_key)
+    result = ImportResult(WebSource(source))
+    
     # Test 1 : Extraction
     print("=" * 60)
     print("Test 1 : Extraction de la recette")
     print("=" * 60)
     try:
-        extractor = RecipeExtractor()
-        recipe_data = extractor.extract(source)
-        print(f"✅ Extraction réussie")
+        pipeline.extract(result, use_cache=False)
+        recipe_data = result.recipe
+        print(f"✅ Extraction réussie ({result.timings['extract']:.2f}s)")
         print(f"   Titre: {recipe_data['title']}")
         print(f"   Ingrédients: {len(recipe_data['ingredients'])}")
         print(f"   Instructions: {len(recipe_data['instructions'])} caractères")
@@ -48,11 +54,7 @@ def main():
     print("Test 2 : Connexion à Grocy")
     print("=" * 60)
     try:
-        response = requests.get(
-            f"{grocy_url}/api/system/info",
-            headers={'GROCY-API-KEY': api_key},
-            timeout=5
-        )
+        response = pipeline.grocy.http.get("/api/system/info", timeout=5)
         print(f"Status code: {response.status_code}")
         if response.status_code == 200:
             info = response.json()
@@ -72,48 +74,23 @@ def main():
     print("Test 3 : Création de la recette dans Grocy")
     print("=" * 60)
     
-    # Préparer le payload
-    from grocy_client import GrocyClient
-    client = GrocyClient(grocy_url, api_key)
-    
-    recipe_payload = {
-        'name': recipe_data['title'],
-        'description': client._format_description(recipe_data),
-        'base_servings': client._extract_servings_number(recipe_data['yields']),
-        'desired_servings': client._extract_servings_number(recipe_data['yields']),
-        'not_check_shoppinglist': 0
-    }
+    client = pipeline.grocy
+    recipe_payload = client._recipe_payload(recipe_data)
     
     print("Payload à envoyer:")
     print(json.dumps(recipe_payload, indent=2, ensure_ascii=False)[:500] + "...")
     print()
     
     try:
-        response = requests.post(
-            f"{grocy_url}/api/objects/recipes",
-            headers={
-                'GROCY-API-KEY': api_key,
-                'Content-Type': 'application/json'
-            },
-            json=recipe_payload,
-            timeout=10
-        )
-        
-        print(f"Status code: {response.status_code}")
-        print(f"Response: {response.text}")
-        print()
-        
-        if response.status_code in [200, 201]:
-            result = response.json()
-            recipe_id = result.get('created_object_id')
-            print(f"✅ Recette créée avec succès!")
-            print(f"   ID: {recipe_id}")
-            print(f"   Lien: {grocy_url}/#recipe/{recipe_id}")
-        else:
-            print(f"❌ Erreur lors de la création")
-            print(f"   Code: {response.status_code}")
-            print(f"   Message: {response.text}")
-            
+        existing = pipeline.lookup(result)
+        if existing:
+            print(f"♻️ Source déjà importée : recette {existing['recipe_id']}, mise à jour")
+        pipeline.write(result, reimport=bool(existing))
+        recipe_id = result.recipe_id
+        print(f"✅ Recette {'mise à jour' if existing else 'créée'} avec succès!")
+        print(f"   ID: {recipe_id}")
+        print(f"   Lien: {grocy_url}/#recipe/{recipe_id}")
+        print("   Durées: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.timings.items()))
     except Exception as e:
         print(f"❌ Exception: {e}")
         import traceback
@@ -126,11 +103,7 @@ def main():
     print("Test 4 : Vérification dans Grocy")
     print("=" * 60)
     try:
-        response = requests.get(
-            f"{grocy_url}/api/objects/recipes",
-            headers={'GROCY-API-KEY': api_key},
-            timeout=5
-        )
+        response = client.http.get("/api/objects/recipes", timeout=5)
         if response.status_code == 200:
             recipes = response.json()
             print(f"✅ {len(recipes)} recette(s) totale(s) dans Grocy:")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Faux serveur Grocy en mémoire, pour mesurer l'import sans vraie instance
+
+Implémente les points d'API utilisés par GrocyClient :
+- /api/objects/{entité} (GET avec query[], POST)
+- /api/objects/{entité}/{id} (GET, PUT, DELETE)
+- /api/system/info et /api/system/db-changed-time
+
+Latence par requête, taux d'erreurs 500 et taille du catalogue de
+produits sont configurables ; chaque requête est comptée (stats).
+
+Usage :
+    with FakeGrocy(latency=0.01, catalog_size=1000) as grocy:
+        client = GrocyClient(grocy.url, 'fake')
+        ...
+        print(grocy.stats)
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+
+ENTITIES = ('products', 'quantity_units', 'recipes', 'recipes_pos', 'locations')
+
+# Base du catalogue généré : les premiers noms correspondent aux
+# ingrédients courants, les suivants sont des variantes
+CATALOG_FOODS = [
+    'Farine', 'Sucre', 'Oeuf', 'Beurre', 'Lait', 'Sel', "Huile d'olive", 'Ail',
+    'Tomate', 'Oignon', 'Lardons', 'Crème fraîche', 'Poivre', 'Riz', 'Pâtes',
+    'Poulet', 'Carotte', 'Pomme de terre', 'Citron', 'Chocolat noir',
+]
+CATALOG_QUALIFIERS = ['bio', 'surgelé', 'en conserve', 'premier prix', 'fermier', 'allégé', 'entier', 'râpé']
+
+DEFAULT_UNITS = [('Gramme', 'Grammes'), ('Piece', 'Pieces'), ('Millilitre', 'Millilitres')]
+
+# Ingrédients des recettes synthétiques (make_recipes)
+RECIPE_INGREDIENTS = [
+    "200g de farine", "100g de sucre", "3 oeufs", "50g de beurre", "20cl de lait",
+    "1 pincée de sel", "2 cuillères à soupe d'huile d'olive", "1 gousse d'ail",
+    "400g de tomates", "1 oignon", "150g de lardons", "10cl de crème fraîche",
+]
+
+# Filtres Grocy : champ, opérateur, valeur (ex: "id>12", "recipe_id=3")
+QUERY_FILTER = re.compile(r'^(\w+)(>=|<=|!=|=|>|<)(.*)$')
+
+
+class FakeGrocy:
+    """Serveur HTTP local (thread) avec une base Grocy en mémoire"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0,
+                 catalog_size: int = 0, port: int = 0, seed: int = 0):
+        """
+        Args:
+            latency: Délai ajouté à chaque requête (secondes)
+            error_rate: Proportion de requêtes qui répondent 500 (0 à 1)
+            catalog_size: Nombre de produits créés au démarrage
+            port: Port d'écoute (0 = port libre choisi par le système)
+            seed: Graine des erreurs aléatoires (reproductibilité)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tables: Dict[str, List[Dict]] = {entity: [] for entity in ENTITIES}
+        self.changed_time = _now()
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        if catalog_size:
+            self.seed_catalog(catalog_size)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeGrocy':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakeGrocy':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def seed_catalog(self, size: int):
+        """Crée les unités de base et size produits aux noms réalistes"""
+        for name, plural in DEFAULT_UNITS:
+            self.insert('quantity_units', {'name': name, 'name_plural': plural})
+        self.insert('locations', {'name': 'Cuisine'})
+
+        names = list(CATALOG_FOODS)
+        names += [f"{food} {qualifier}" for qualifier in CATALOG_QUALIFIERS for food in CATALOG_FOODS]
+        for i in range(size):
+            name = names[i] if i < len(names) else f"{names[i % len(names)]} {i // len(names)}"
+            self.insert('products', {
+                'name': name,
+                'location_id': 1,
+                'qu_id_purchase': 1,
+                'qu_id_stock': 1,
+                'min_stock_amount': 0,
+            })
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _count(self, method: str, path: str) -> bool:
+        """
+        Compte la requête et tire au sort une erreur
+
+        Returns:
+            True si la requête doit échouer (500)
+        """
+        # "GET /api/objects/products/12" -> "GET products/:id"
+        segments = path.strip('/').split('/')
+        if segments[:2] == ['api', 'objects'] and len(segments) > 2:
+            key = f"{method} {segments[2]}" + ('/:id' if len(segments) > 3 else '')
+        else:
+            key = f"{method} {path}"
+        with self._lock:
+            self.stats[key] += 1
+            self.stats['total'] += 1
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def insert(self, entity: str, row: Dict) -> int:
+        """Ajoute une ligne (comme un POST) et retourne son id"""
+        with self._lock:
+            table = self.tables[entity]
+            row = dict(row, id=(table[-1]['id'] + 1 if table else 1),
+                       row_created_timestamp=_now())
+            table.append(row)
+            self.changed_time = _now()
+            return row['id']
+
+    def select(self, entity: str, filters: List[str]) -> List[Dict]:
+        with self._lock:
+            rows = list(self.tables[entity])
+        for expression in filters:
+            match = QUERY_FILTER.match(expression)
+            if match:
+                field, op, value = match.groups()
+                rows = [row for row in rows if _compare(row.get(field), op, value)]
+        return rows
+
+    def get(self, entity: str, object_id: int):
+        with self._lock:
+            return next((row for row in self.tables[entity] if row['id'] == object_id), None)
+
+    def update(self, entity: str, object_id: int, values: Dict) -> bool:
+        with self._lock:
+            for row in self.tables[entity]:
+                if row['id'] == object_id:
+                    row.update(values)
+                    self.changed_time = _now()
+                    return True
+            return False
+
+    def delete(self, entity: str, object_id: int) -> bool:
+        with self._lock:
+            table = self.tables[entity]
+            for i, row in enumerate(table):
+                if row['id'] == object_id:
+                    del table[i]
+                    self.changed_time = _now()
+                    return True
+            return False
+
+
+def make_recipes(count: int) -> List[Dict]:
+    """Recettes synthétiques pour les benchmarks : noms d'ingrédients en partie communs"""
+    recipes = []
+    for i in range(count):
+        ingredients = RECIPE_INGREDIENTS[i % 4:] + [f"{i % 7 + 1}00g de produit {i}"]
+        recipes.append({
+            'title': f"Recette {i}",
+            'ingredients': ingredients,
+            'instructions': "Mélanger.",
+            'yields': "4 portions",
+        })
+    return recipes
+
+
+def _now() -> str:
+    # Précision à la microseconde : deux écritures rapprochées changent db-changed-time
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def _compare(field_value, op: str, value: str) -> bool:
+    if field_value is None:
+        return op == '!='
+    try:
+        left, right = float(field_value), float(value)
+    except (TypeError, ValueError):
+        left, right = str(field_value), value
+    return {
+        '=': left == right, '!=': left != right,
+        '>': left > right, '>=': left >= right,
+        '<': left < right, '<=': left <= right,
+    }[op]
+
+
+def _make_handler(grocy: FakeGrocy):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 : connexions keep-alive, comme un vrai serveur web
+        protocol_version = 'HTTP/1.1'
+        # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, l'ACK
+        # retardé du client ajoute ~40 ms par réponse
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body=None):
+            data = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self) -> Dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def _route(self):
+            """(entité, id, filtres) depuis le chemin, ou None"""
+            parts = urlsplit(self.path)
+            segments = parts.path.strip('/').split('/')
+            if len(segments) < 3 or segments[:2] != ['api', 'objects'] or segments[2] not in ENTITIES:
+                return None
+            object_id = int(segments[3]) if len(segments) > 3 else None
+            filters = parse_qs(parts.query).get('query[]', [])
+            return segments[2], object_id, filters
+
+        def _handle(self, method: str):
+            if grocy.latency:
+                time.sleep(grocy.latency)
+
+            path = urlsplit(self.path).path
+            if grocy._count(method, path):
+                # Lire le corps pour garder la connexion keep-alive utilisable
+                self._read_json()
+                return self._send(500, {'error_message': 'Erreur simulée'})
+
+            if path == '/api/system/info':
+                return self._send(200, {'grocy_version': {'Version': 'fake'}})
+            if path == '/api/system/db-changed-time':
+                return self._send(200, {'changed_time': grocy.changed_time})
+
+            route = self._route()
+            if route is None:
+                return self._send(404, {'error_message': f"Not found: {path}"})
+            entity, object_id, filters = route
+
+            if object_id is None:
+                if method == 'GET':
+                    return self._send(200, grocy.select(entity, filters))
+                if method == 'POST':
+                    return self._send(200, {'created_object_id': grocy.insert(entity, self._read_json())})
+            else:
+                if method == 'GET':
+                    return self._send(200, grocy.get(entity, object_id))
+                if method == 'PUT':
+                    found = grocy.update(entity, object_id, self._read_json())
+                    return self._send(204 if found else 400)
+                if method == 'DELETE':
+                    found = grocy.delete(entity, object_id)
+                    return self._send(204 if found else 400)
+
+            self._send(405, {'error_message': f"{method} non supporté"})
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def do_PUT(self):
+            self._handle('PUT')
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+    return Handler
@@ -0,0 +1,53 @@
+"""
+Verrou nommé entre processus (workers gunicorn, CLI) via un fichier
+
+Utilisé autour des « chercher ou créer » dans Grocy, pour que deux imports
+simultanés ne créent pas deux fois la même unité ou le même produit.
+"""
+
+import hashlib
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows : pas de verrou entre processus, seulement entre threads (SingleFlight)
+    fcntl = None
+
+
+DEFAULT_DIR = os.path.join(
+    os.getenv(
+        'GROCY_MIRROR_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'grocy-recipe-importer')
+    ),
+    'locks'
+)
+
+
+@contextmanager
+def file_lock(name: str, lock_dir: str = None):
+    """
+    Verrou exclusif bloquant associé à un nom
+
+    Args:
+        name: Nom du verrou (ex: "http://grocy:products:beurre")
+        lock_dir: Dossier des fichiers verrous (None = sous GROCY_MIRROR_DIR)
+    """
+    if fcntl is None:
+        yield
+        return
+
+    lock_dir = lock_dir or DEFAULT_DIR
+    os.makedirs(lock_dir, exist_ok=True)
+    # Les fichiers ne sont pas supprimés : supprimer un fichier verrouillé
+    # laisserait un autre processus verrouiller un fichier orphelin
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(lock_dir, f"{digest}.lock")
+
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,209 @@
+"""
+Rapprochement approximatif des ingrédients avec le catalogue Grocy
+
+Chaque nom de produit est représenté par ses n-grammes de caractères
+(pondérés TF-IDF, normés). Les ingrédients d'une recette sont comparés à
+tout le catalogue en une seule opération (similarité cosinus), au lieu
+d'une distance d'édition par couple ingrédient × produit.
+
+Le matcher est construit une fois par état du catalogue ; les produits
+créés ensuite y sont ajoutés (add) sans tout recalculer. Leurs poids
+utilisent l'IDF de la construction, figé jusqu'à la prochaine.
+
+NumPy est utilisé s'il est installé (il l'est avec openai-whisper),
+sinon un calcul équivalent en Python pur prend le relais.
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from product_index import normalize_name
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Score au-dessus duquel un ingrédient est associé sans confirmation
+AUTO_LINK_THRESHOLD = float(os.getenv('FUZZY_AUTO_LINK_THRESHOLD', '0.8'))
+
+
+def char_ngrams(name: str, n: int = 3) -> Counter:
+    """N-grammes de caractères du nom normalisé, bordé d'espaces"""
+    text = f" {normalize_name(name)} "
+    if len(text) <= n:
+        return Counter([text])
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+class NgramMatcher:
+    """Index inversé n-gramme → produits, interrogé par lot"""
+
+    def __init__(self, products: Iterable[Dict], n: int = 3):
+        """
+        Args:
+            products: Catalogue Grocy (dicts avec 'name')
+            n: Taille des n-grammes
+        """
+        self.n = n
+        self.products = list(products)
+
+        self._vocab: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for i, product in enumerate(self.products):
+            for gram, count in char_ngrams(product['name'], n).items():
+                rows.append(i)
+                cols.append(self._vocab.setdefault(gram, len(self._vocab)))
+                counts.append(count)
+
+        # IDF : un n-gramme présent partout (" de") pèse peu
+        total = len(self.products)
+        self._unknown_idf = math.log(1 + total) + 1
+        # N-gramme apparu avec un produit ajouté : IDF d'un n-gramme vu une fois
+        self._new_gram_idf = math.log((1 + total) / 2) + 1
+
+        # Produits ajoutés après la construction : postings et IDF des
+        # nouveaux n-grammes, à côté des tableaux construits
+        self._built_vocab = len(self._vocab)
+        self._extra_postings: Dict[int, List[Tuple[int, float]]] = {}
+        self._extra_idf: Dict[int, float] = {}
+
+        if np is not None:
+            self._build_numpy(rows, cols, counts)
+        else:
+            self._build_python(rows, cols, counts)
+
+    def _build_numpy(self, rows: List[int], cols: List[int], counts: List[int]):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        vocab_size = len(self._vocab)
+
+        df = np.bincount(cols, minlength=vocab_size)
+        self._idf = np.log((1 + len(self.products)) / (1 + df)) + 1
+        weights = np.asarray(counts, dtype=np.float64) * self._idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(self.products)))
+        weights /= norms[rows]
+
+        # Stockage par colonne (CSC) : postings[j] = rows[ptr[j]:ptr[j + 1]]
+        order = np.argsort(cols, kind='stable')
+        self._post_rows = rows[order]
+        self._post_weights = weights[order].astype(np.float32)
+        self._post_ptr = np.concatenate(([0], np.cumsum(df)))
+
+    def _build_python(self, rows: List[int], cols: List[int], counts: List[int]):
+        df = Counter(cols)
+        total = len(self.products)
+        self._idf = [math.log((1 + total) / (1 + df[j])) + 1 for j in range(len(self._vocab))]
+
+        weights = [c * self._idf[j] for j, c in zip(cols, counts)]
+        norms = [0.0] * total
+        for i, w in zip(rows, weights):
+            norms[i] += w * w
+        weights = [w / math.sqrt(norms[i]) for i, w in zip(rows, weights)]
+
+        self._postings = [[] for _ in self._vocab]
+        for i, j, w in zip(rows, cols, weights):
+            self._postings[j].append((i, w))
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def add(self, products: Iterable[Dict]):
+        """Ajoute des produits au matcher, sans le reconstruire"""
+        for product in products:
+            i = len(self.products)
+            weighted = []
+            for gram, count in char_ngrams(product['name'], self.n).items():
+                j = self._vocab.get(gram)
+                if j is None:
+                    j = self._vocab[gram] = len(self._vocab)
+                    self._extra_idf[j] = self._new_gram_idf
+                weighted.append((j, count * self._gram_idf(j)))
+
+            norm = math.sqrt(sum(w * w for _, w in weighted)) or 1.0
+            for j, w in weighted:
+                self._extra_postings.setdefault(j, []).append((i, w / norm))
+            self.products.append(product)
+
+    def _gram_idf(self, j: int) -> float:
+        return float(self._idf[j]) if j < self._built_vocab else self._extra_idf[j]
+
+    def _query_weights(self, name: str) -> List[tuple]:
+        """(colonne, poids normé) des n-grammes connus d'un nom"""
+        grams = char_ngrams(name, self.n)
+        weighted = []
+        norm = 0.0
+        for gram, count in grams.items():
+            j = self._vocab.get(gram)
+            w = count * (self._gram_idf(j) if j is not None else self._unknown_idf)
+            # Les n-grammes inconnus du catalogue comptent dans la norme
+            norm += w * w
+            if j is not None:
+                weighted.append((j, w))
+        norm = math.sqrt(norm) or 1.0
+        return [(j, w / norm) for j, w in weighted]
+
+    def match_many(self, names: List[str], k: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Meilleurs candidats du catalogue pour chaque nom
+
+        Args:
+            names: Noms d'ingrédients (ceux d'une recette)
+            k: Nombre de candidats par nom
+
+        Returns:
+            Dict nom -> liste de {'product', 'score'} par score décroissant
+        """
+        if not names or not self.products:
+            return {name: [] for name in names}
+
+        if np is not None:
+            return self._match_numpy(names, k)
+        return self._match_python(names, k)
+
+    def _match_numpy(self, names: List[str], k: int) -> Dict[str, List[Dict]]:
+        q_idx, p_idx, values = [], [], []
+        for q, name in enumerate(names):
+            for j, w in self._query_weights(name):
+                if j < self._built_vocab:
+                    start, end = self._post_ptr[j], self._post_ptr[j + 1]
+                    q_idx.append(np.full(end - start, q, dtype=np.int64))
+                    p_idx.append(self._post_rows[start:end])
+                    values.append(self._post_weights[start:end] * w)
+                extra = self._extra_postings.get(j)
+                if extra:
+                    q_idx.append(np.full(len(extra), q, dtype=np.int64))
+                    p_idx.append(np.fromiter((i for i, _ in extra), dtype=np.int64, count=len(extra)))
+                    values.append(np.fromiter((pw * w for _, pw in extra), dtype=np.float32, count=len(extra)))
+
+        # Produit matrice creuse (requêtes) × matrice creuse (catalogue)ᵀ
+        scores = np.zeros((len(names), len(self.products)), dtype=np.float32)
+        if values:
+            np.add.at(scores, (np.concatenate(q_idx), np.concatenate(p_idx)), np.concatenate(values))
+
+        k = min(k, len(self.products))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = {}
+        for q, name in enumerate(names):
+            best = sorted(top[q], key=lambda i: -scores[q, i])
+            results[name] = [
+                {'product': self.products[i], 'score': float(scores[q, i])}
+                for i in best if scores[q, i] > 0
+            ]
+        return results
+
+    def _match_python(self, names: List[str], k: int) -> Dict[str, List[Dict]]:
+        results = {}
+        for name in names:
+            scores: Dict[int, float] = {}
+            for j, w in self._query_weights(name):
+                postings = self._postings[j] if j < self._built_vocab else []
+                for i, pw in postings + self._extra_postings.get(j, []):
+                    scores[i] = scores.get(i, 0.0) + pw * w
+            best = sorted(scores.items(), key=lambda item: -item[1])[:k]
+            results[name] = [{'product': self.products[i], 'score': s} for i, s in best]
+        return results
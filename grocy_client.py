@@ -3,21 +3,100 @@ Client pour l'API Grocy
 Gère l'import de recettes et la communication avec Grocy
 """
 
+import logging
+import os
 import requests
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from urllib.parse import urljoin
 
+from file_lock import file_lock
+from grocy_http import GrocyHttp, GrocyUnavailable
+from fuzzy_matcher import AUTO_LINK_THRESHOLD
+from grocy_mirror import GrocyMirror
+from metrics import cache_access, stage
+from product_index import ProductNameIndex, get_product_index, normalize_name
+from singleflight import SingleFlight
+from source_index import SourceIndex, FINGERPRINT_MARKER, fingerprint_marker, source_fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+# Créations d'unités et de produits en cours dans ce processus : les
+# threads qui demandent le même nom attendent la création déjà lancée
+_creations = SingleFlight()
+
+# Map des noms courts vers les noms complets possibles
+UNIT_VARIANTS = {
+    'g': ['gramme', 'grammes', 'g'],
+    'kg': ['kilogramme', 'kilogrammes', 'kg'],
+    'mg': ['milligramme', 'milligrammes', 'mg'],
+    'ml': ['millilitre', 'millilitres', 'ml'],
+    'cl': ['centilitre', 'centilitres', 'cl'],
+    'dl': ['décilitre', 'décilitres', 'dl'],
+    'l': ['litre', 'litres', 'l'],
+    'cuillère à soupe': ['cuillère à soupe', 'cuillères à soupe', 'cuillere a soupe'],
+    'cuillère à café': ['cuillère à café', 'cuillères à café', 'cuillere a cafe'],
+    'tasse': ['tasse', 'tasses'],
+    'piece': ['piece', 'pieces', 'pièce', 'pièces'],
+}
+
+# Noms (singulier, pluriel) des unités créées automatiquement
+UNIT_NAMES = {
+    'g': ('Gramme', 'Grammes'),
+    'kg': ('Kilogramme', 'Kilogrammes'),
+    'mg': ('Milligramme', 'Milligrammes'),
+    'ml': ('Millilitre', 'Millilitres'),
+    'cl': ('Centilitre', 'Centilitres'),
+    'dl': ('Décilitre', 'Décilitres'),
+    'l': ('Litre', 'Litres'),
+    'cuillère à soupe': ('Cuillère à soupe', 'Cuillères à soupe'),
+    'cuillère à café': ('Cuillère à café', 'Cuillères à café'),
+    'tasse': ('Tasse', 'Tasses'),
+    'piece': ('Piece', 'Pieces'),
+}
+
+
+@dataclass
+class ProductResult:
+    """Produit Grocy associé à un ingrédient"""
+    
+    id: int
+    name: str
+    qu_id_stock: Optional[int]
+    # 'existing', 'matched' (rapprochement approché), 'created' ou 'created_elsewhere'
+    status: str
+    score: Optional[float] = None
+    
+    @classmethod
+    def from_row(cls, row: Dict, status: str, score: float = None) -> 'ProductResult':
+        return cls(
+            id=int(row['id']),
+            name=row['name'],
+            qu_id_stock=row.get('qu_id_stock'),
+            status=status,
+            score=score,
+        )
+
+
+# import_recipe : recette existante pas encore recherchée par l'appelant
+_NOT_LOOKED_UP = object()
+
 
 class GrocyClient:
     """Client pour interagir avec l'API Grocy"""
     
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, source_index: SourceIndex = None,
+                 use_mirror: bool = None):
         """
         Initialise le client Grocy
         
         Args:
             base_url: URL de base de Grocy (ex: http://localhost:9283)
             api_key: Clé API Grocy
+            source_index: Index des recettes déjà importées (None = index par défaut)
+            use_mirror: Servir produits/unités depuis le miroir SQLite local
+                (None = variable GROCY_MIRROR, activé par défaut)
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
@@ -25,69 +104,279 @@ class GrocyClient:
             'GROCY-API-KEY': api_key,
             'Content-Type': 'application/json'
         }
+        self.http = GrocyHttp(self.base_url, self.headers)
+        self._source_index = source_index
+        
+        if use_mirror is None:
+            use_mirror = os.getenv('GROCY_MIRROR', '1') != '0'
+        self.use_mirror = use_mirror
+        self._mirror = None
+    
+    @property
+    def mirror(self) -> GrocyMirror:
+        """Miroir local des produits, unités et recettes (ouvert au premier usage)"""
+        if self._mirror is None:
+            self._mirror = GrocyMirror(self)
+        return self._mirror
+    
+    def _synced_mirror(self) -> Optional[GrocyMirror]:
+        """Miroir à jour, ou None s'il est désactivé ou si la synchronisation échoue"""
+        if not self.use_mirror:
+            return None
+        try:
+            self.mirror.sync()
+            return self.mirror
+        except Exception as e:
+            logger.warning("⚠️ Miroir Grocy indisponible, appel direct : %s", e)
+            return None
+    
+    def get_db_changed_time(self) -> Optional[str]:
+        """
+        Horodatage de la dernière modification de la base Grocy
+        
+        Returns:
+            L'horodatage, ou None si Grocy ne fournit pas ce point d'API
+            
+        Raises:
+            GrocyUnavailable si Grocy ne répond pas
+        """
+        response = self.http.get(
+            "/api/system/db-changed-time",
+            timeout=5
+        )
+        if response.status_code == 200:
+            return response.json().get('changed_time')
+        return None
+    
+    def _fetch_objects(self, entity: str, query: List[str] = None) -> list:
+        """
+        Récupère les lignes d'une entité Grocy
+        
+        Args:
+            entity: Nom de l'entité (products, quantity_units, recipes...)
+            query: Filtres Grocy (ex: ["row_created_timestamp>=2024-01-01 00:00:00"])
+            
+        Raises:
+            Exception si Grocy ne répond pas 200
+        """
+        response = self.http.get(
+            f"/api/objects/{entity}",
+            params={'query[]': query} if query else None,
+            timeout=30
+        )
+        if response.status_code != 200:
+            raise Exception(f"Erreur lecture {entity} (code {response.status_code}): {response.text}")
+        return response.json()
+    
+    @property
+    def source_index(self) -> SourceIndex:
+        """Index local empreinte → recette (ouvert au premier usage)"""
+        if self._source_index is None:
+            self._source_index = SourceIndex()
+        return self._source_index
+    
+    def find_recipe_by_source(self, source_url: str) -> Optional[Dict]:
+        """
+        Cherche une recette déjà importée depuis la même source
+        
+        Args:
+            source_url: URL de la recette ou du Reel
+            
+        Returns:
+            Dict {recipe_id, title, source_url} ou None
+        """
+        if not self.source_index.is_bootstrapped(self.base_url):
+            self._bootstrap_source_index()
+        
+        fingerprint = source_fingerprint(source_url)
+        entry = self.source_index.lookup(self.base_url, fingerprint)
+        if entry is None:
+            return None
+        
+        # La recette a pu être supprimée dans Grocy depuis
+        try:
+            response = self.http.get(
+                f"/api/objects/recipes/{entry['recipe_id']}",
+                timeout=5
+            )
+        except GrocyUnavailable:
+            # Grocy injoignable : l'import échouera de toute façon plus loin
+            return entry
+        
+        if response.status_code != 200 or not response.content or response.json() is None:
+            self.source_index.forget(self.base_url, fingerprint)
+            return None
+        
+        return entry
+    
+    def _bootstrap_source_index(self):
+        """
+        Remplit l'index depuis les marqueurs des recettes existantes
+        (une seule fois par instance Grocy, ex: nouvelle machine ou cache effacé)
+        """
+        try:
+            mirror = self._synced_mirror()
+            recipes = mirror.all('recipes') if mirror else self._fetch_objects('recipes')
+            for recipe in recipes:
+                match = FINGERPRINT_MARKER.search(recipe.get('description') or '')
+                if match:
+                    self.source_index.store(
+                        self.base_url, match.group(1), recipe['id'], recipe.get('name')
+                    )
+            self.source_index.mark_bootstrapped(self.base_url)
+        except Exception as e:
+            logger.warning("⚠️ Impossible de reconstruire l'index des recettes: %s", e)
+    
+    def is_available(self) -> bool:
+        """
+        Grocy joignable d'après l'état de santé en cache (voir grocy_health) :
+        pas d'appel réseau, une sonde part en arrière-plan si l'état est périmé
+        """
+        return self.http.health.is_healthy()
     
     def test_connection(self) -> bool:
         """
-        Teste la connexion à Grocy
+        Teste la connexion à Grocy (appel synchrone ; pour un import, préférer is_available)
         
         Returns:
             True si la connexion est OK, False sinon
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/api/system/info",
-                headers=self.headers,
+            response = self.http.get(
+                "/api/system/info",
                 timeout=5
             )
             return response.status_code == 200
         except Exception:
             return False
     
-    def import_recipe(self, recipe_data: Dict[str, Any]) -> int:
+    def import_recipe(self, recipe_data: Dict[str, Any], update_existing: bool = False,
+                      existing: Optional[Dict] = _NOT_LOOKED_UP) -> int:
         """
         Importe une recette dans Grocy
         
+        Si recipe_data contient 'source_url' et que cette source a déjà été
+        importée, la recette existante est retournée (ou mise à jour si
+        update_existing) au lieu d'en créer un doublon.
+        
         Args:
             recipe_data: Données de la recette à importer
+            update_existing: Remplacer le contenu d'une recette déjà importée
+            existing: Résultat de find_recipe_by_source déjà obtenu par
+                l'appelant (None = pas encore importée), pour éviter une
+                seconde recherche ; omis, la recherche est faite ici
             
         Returns:
-            ID de la recette créée dans Grocy
+            ID de la recette créée (ou existante) dans Grocy
         """
+        source_url = recipe_data.get('source_url')
+        fingerprint = source_fingerprint(source_url) if source_url else None
+        
+        if fingerprint:
+            if existing is _NOT_LOOKED_UP:
+                existing = self.find_recipe_by_source(source_url)
+            if existing:
+                if not update_existing:
+                    logger.info("♻️ Déjà importée : recette %s", existing['recipe_id'])
+                    return existing['recipe_id']
+                self._update_recipe(existing['recipe_id'], recipe_data, fingerprint)
+                return existing['recipe_id']
+        
         # Étape 1 : Créer la recette de base
-        recipe_payload = {
-            'name': recipe_data['title'],
-            'description': self._format_description(recipe_data),
-            'base_servings': self._extract_servings_number(recipe_data['yields']),
-            'desired_servings': self._extract_servings_number(recipe_data['yields']),
-            'not_check_shoppinglist': 0
-        }
+        recipe_payload = self._recipe_payload(recipe_data, fingerprint)
         
         # Note: Les champs de temps (prep_time_minutes, cook_time_minutes) ne sont pas 
         # supportés dans toutes les versions de Grocy. Ils sont inclus dans la description.
         
         # Créer la recette via l'API
-        response = requests.post(
-            f"{self.base_url}/api/objects/recipes",
-            headers=self.headers,
-            json=recipe_payload,
-            timeout=10
-        )
+        with stage('grocy_write'):
+            response = self.http.post(
+                "/api/objects/recipes",
+                json=recipe_payload,
+                timeout=10
+            )
         
         if response.status_code not in [200, 201]:
             raise Exception(f"Erreur lors de la création de la recette : {response.text}")
         
         recipe_id = response.json()['created_object_id']
         
-        # Étape 2 : Ajouter les ingrédients comme recipe positions
-        if recipe_data['ingredients']:
-            self._add_recipe_ingredients(recipe_id, recipe_data['ingredients'])
+        try:
+            # Étape 2 : Ajouter les ingrédients comme recipe positions
+            if recipe_data['ingredients']:
+                self._add_recipe_ingredients(recipe_id, recipe_data['ingredients'])
+            
+            # Étape 3 : Ajouter l'image si disponible
+            if recipe_data.get('image_url'):
+                self._add_recipe_image(recipe_id, recipe_data['image_url'])
+        except Exception:
+            # Recette à moitié créée : son marqueur d'empreinte la ferait
+            # passer pour importée, elle est supprimée pour être recréée
+            self._delete_recipe(recipe_id)
+            raise
         
-        # Étape 3 : Ajouter l'image si disponible
-        if recipe_data.get('image_url'):
-            self._add_recipe_image(recipe_id, recipe_data['image_url'])
+        # Indexée seulement une fois complète
+        if fingerprint:
+            self.source_index.store(
+                self.base_url, fingerprint, recipe_id, recipe_data['title'], source_url
+            )
         
         return recipe_id
     
+    def _delete_recipe(self, recipe_id: int):
+        """Supprime une recette (ses ingrédients suivent, côté Grocy), sans lever d'erreur"""
+        try:
+            response = self.http.delete(f"/api/objects/recipes/{recipe_id}", timeout=10)
+        except GrocyUnavailable as e:
+            logger.warning("⚠️ Recette incomplète %s non supprimée: %s", recipe_id, e)
+            return
+        if response.status_code not in [200, 204]:
+            logger.warning("⚠️ Recette incomplète %s non supprimée (code %s)", recipe_id, response.status_code)
+    
+    def _recipe_payload(self, recipe_data: Dict[str, Any], fingerprint: str = None) -> Dict[str, Any]:
+        """Champs de la recette elle-même (sans les ingrédients)"""
+        description = self._format_description(recipe_data)
+        if fingerprint:
+            description += "\n" + fingerprint_marker(fingerprint)
+        
+        return {
+            'name': recipe_data['title'],
+            'description': description,
+            'base_servings': self._extract_servings_number(recipe_data['yields']),
+            'desired_servings': self._extract_servings_number(recipe_data['yields']),
+            'not_check_shoppinglist': 0
+        }
+    
+    def _update_recipe(self, recipe_id: int, recipe_data: Dict[str, Any], fingerprint: str):
+        """Remplace le contenu et les ingrédients d'une recette existante"""
+        logger.info("🔄 Mise à jour de la recette %s", recipe_id)
+        
+        with stage('grocy_write'):
+            response = self.http.put(
+                f"/api/objects/recipes/{recipe_id}",
+                json=self._recipe_payload(recipe_data, fingerprint),
+                timeout=10
+            )
+            if response.status_code not in [200, 204]:
+                raise Exception(f"Erreur lors de la mise à jour de la recette : {response.text}")
+            
+            # Supprimer les anciens ingrédients avant de rajouter les nouveaux
+            # (une erreur de lecture ne doit pas laisser les anciens en double)
+            for position in self._fetch_objects('recipes_pos', query=[f"recipe_id={recipe_id}"]):
+                response = self.http.delete(
+                    f"/api/objects/recipes_pos/{position['id']}",
+                    timeout=10
+                )
+                if response.status_code not in [200, 204]:
+                    raise Exception(f"Erreur lors de la suppression d'un ingrédient : {response.text}")
+        
+        if recipe_data['ingredients']:
+            self._add_recipe_ingredients(recipe_id, recipe_data['ingredients'])
+        
+        self.source_index.store(
+            self.base_url, fingerprint, recipe_id, recipe_data['title'], recipe_data.get('source_url')
+        )
+    
     def _add_recipe_ingredients(self, recipe_id: int, ingredients: list) -> bool:
         """
         Ajoute les ingrédients à une recette en créant les produits nécessaires
@@ -101,94 +390,181 @@ class GrocyClient:
         """
         success_count = 0
         
-        # Récupérer tous les produits existants
-        existing_products = self.get_products()
-        product_dict = {p['name'].lower(): p for p in existing_products}
+        # Produits existants : index par nom normalisé (accents, pluriels, articles)
+        with stage('master_data'):
+            index = self._product_index()
+        
+        # Parser les ingrédients pour extraire quantité, unité et nom
+        parsed_ingredients = [self._parse_ingredient(ingredient) for ingredient in ingredients]
+        
+        # Rapprochement approché, en un seul calcul pour tous les noms inconnus
+        with stage('product_resolution'):
+            unknown = [p['product_name'] for p in parsed_ingredients if index.get(p['product_name']) is None]
+            candidates = index.fuzzy_match(unknown) if unknown else {}
         
-        for ingredient in ingredients:
-            # Parser l'ingrédient pour extraire quantité, unité et nom
-            parsed = self._parse_ingredient(ingredient)
+        for parsed in parsed_ingredients:
             product_name = parsed['product_name']
             amount = parsed['amount']
             unit_name = parsed['unit']
             
-            print(f"  📊 {parsed['original']}")
-            print(f"     → {amount} {unit_name} de {product_name}")
+            logger.debug("📊 %s → %s %s de %s", parsed['original'], amount, unit_name, product_name)
             
-            # Obtenir ou créer l'unité
-            unit_id = self._get_or_create_unit(unit_name)
-            
-            # Vérifier si le produit existe déjà
-            product = None
-            if product_name.lower() in product_dict:
-                product = product_dict[product_name.lower()]
-                print(f"     ✓ Produit existant: {product_name}")
-            else:
-                # Créer le produit avec la bonne unité
-                new_product_id = self._create_product(product_name, unit_id)
-                if new_product_id:
-                    print(f"     + Produit créé: {product_name}")
-                    # Récupérer les infos du produit qu'on vient de créer
-                    product = self._get_product_by_id(new_product_id)
-                    if product:
-                        product_dict[product_name.lower()] = product
+            with stage('product_resolution'):
+                # Obtenir ou créer l'unité
+                unit_id = self._get_or_create_unit(unit_name)
+                
+                # Vérifier si le produit existe déjà
+                existing = self._find_product(product_name)
+                best = (candidates.get(product_name) or [None])[0]
+                if existing is not None:
+                    product = ProductResult.from_row(existing, 'existing')
+                    logger.debug("✓ Produit existant: %s", product.name)
+                elif best and best['score'] >= AUTO_LINK_THRESHOLD:
+                    product = ProductResult.from_row(best['product'], 'matched', best['score'])
+                    logger.debug("≈ Produit rapproché: %s (%.0f%%)", product.name, product.score * 100)
                 else:
-                    print(f"     ⚠️ Impossible de créer: {product_name}")
-                    continue
+                    if best:
+                        logger.debug("? Le plus proche: %s (%.0f%%)", best['product']['name'], best['score'] * 100)
+                    # Créer le produit avec la bonne unité
+                    product = self._get_or_create_product(product_name, unit_id)
+            if product is None:
+                logger.warning("⚠️ Impossible de créer: %s", product_name)
+                continue
             
             # Ajouter l'ingrédient à la recette via recipes_pos
-            if product:
-                ingredient_payload = {
-                    'recipe_id': recipe_id,
-                    'product_id': product['id'],
-                    'amount': amount,
-                    'qu_id': unit_id,
-                    'note': parsed['original'],
-                    'only_check_single_unit_in_stock': 0,
-                    'ingredient_group': '',
-                    'variable_amount': '',
-                }
-                
-                try:
-                    response = requests.post(
-                        f"{self.base_url}/api/objects/recipes_pos",
-                        headers=self.headers,
+            ingredient_payload = {
+                'recipe_id': recipe_id,
+                'product_id': product.id,
+                'amount': amount,
+                'qu_id': unit_id,
+                'note': parsed['original'],
+                'only_check_single_unit_in_stock': 0,
+                'ingredient_group': '',
+                'variable_amount': '',
+            }
+            
+            try:
+                with stage('grocy_write'):
+                    response = self.http.post(
+                        "/api/objects/recipes_pos",
                         json=ingredient_payload,
                         timeout=10
                     )
-                    
-                    if response.status_code in [200, 201]:
-                        success_count += 1
-                        print(f"     ✅ Ajouté à la recette")
-                    else:
-                        print(f"     ⚠️ Erreur liaison (code {response.status_code}): {response.text}")
-                except Exception as e:
-                    print(f"     ⚠️ Exception liaison: {e}")
-        
-        print(f"\n✓ {success_count}/{len(ingredients)} ingrédients ajoutés")
+                
+                if response.status_code in [200, 201]:
+                    success_count += 1
+                    logger.debug("✅ Ajouté à la recette")
+                else:
+                    logger.warning("⚠️ Erreur liaison (code %s): %s", response.status_code, response.text)
+            except GrocyUnavailable:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ Exception liaison: %s", e)
+        
+        logger.info("✓ %d/%d ingrédients ajoutés", success_count, len(ingredients))
         return success_count > 0
     
-    def _get_product_by_id(self, product_id: int) -> Optional[Dict]:
+    def _product_index(self) -> ProductNameIndex:
         """
-        Récupère les informations complètes d'un produit par son ID
+        Index des produits par nom normalisé, reconstruit quand le catalogue change
+        
+        Avec le miroir, l'index est partagé par les clients du processus et
+        suit l'état de la table des produits (pas le db-changed-time global,
+        modifié par chaque écriture de recette) : les produits ajoutés depuis
+        sont rattrapés sans reconstruction, l'index n'est reconstruit qu'après
+        une resynchronisation complète. Sans miroir, le catalogue est
+        téléchargé à chaque import comme avant, mais l'index n'est
+        reconstruit que si son contenu a changé.
+        """
+        index = get_product_index(self.base_url)
+        
+        mirror = self._synced_mirror()
+        if mirror:
+            snapshot = mirror.snapshot('products')
+            if not index.is_current(snapshot):
+                previous = index.snapshot
+                if previous is not None and snapshot is not None and previous[0] == snapshot[0]:
+                    # Même synchronisation complète : seuls des produits ont été ajoutés
+                    index.extend(mirror.newer_than('products', index.max_id), snapshot)
+                if not index.is_current(snapshot) or index.product_count != snapshot[1]:
+                    index.rebuild(mirror.all('products'), snapshot)
+        else:
+            index.refresh(self.get_products())
+        
+        return index
+    
+    def _find_product(self, product_name: str) -> Optional[Dict]:
+        """
+        Cherche un produit par nom normalisé, sans appel à Grocy
+        
+        L'index est à jour depuis le début de l'import (_product_index). Sur un
+        nom absent, seuls les produits déjà écrits dans le miroir par les autres
+        processus sont rattrapés (lecture SQLite) ; le nom est alors mis en
+        cache comme absent. Un produit créé dans Grocy entre-temps est retrouvé
+        sous le verrou de création (_create_product_once).
+        """
+        index = get_product_index(self.base_url)
+        product = index.get(product_name)
+        if product is not None or index.is_recent_miss(product_name):
+            cache_access('product_index', True)
+            return product
+        
+        cache_access('product_index', False)
+        if self.use_mirror:
+            self._catch_up_products(index)
+            product = index.get(product_name)
+        if product is None:
+            index.remember_miss(product_name)
+        return product
+    
+    def _get_or_create_product(self, product_name: str, unit_id: int) -> Optional[ProductResult]:
+        """
+        Crée un produit absent de l'index, une seule fois même si plusieurs
+        imports le demandent en même temps (threads et processus)
         
-        Args:
-            product_id: ID du produit
-            
         Returns:
-            Dict avec les infos du produit ou None si erreur
+            Le produit (créé ou créé entre-temps par un autre import), None si échec
+        """
+        key = f"{self.base_url}:products:{normalize_name(product_name)}"
+        product, _ = _creations.do(key, lambda: self._create_product_once(key, product_name, unit_id))
+        return product
+    
+    def _create_product_once(self, key: str, product_name: str, unit_id: int) -> Optional[ProductResult]:
+        with file_lock(key):
+            # Un autre processus a pu créer le produit pendant l'attente du verrou
+            index = get_product_index(self.base_url)
+            self._catch_up_products(index)
+            existing = index.get(product_name)
+            if existing is not None:
+                logger.info("✓ Produit créé entre-temps: %s", existing['name'])
+                return ProductResult.from_row(existing, 'created_elsewhere')
+            
+            row = self._create_product(product_name, unit_id)
+            if row is None:
+                return None
+            logger.info("+ Produit créé: %s", product_name)
+            
+            index.add(row)
+            return ProductResult.from_row(row, 'created')
+    
+    def _catch_up_products(self, index: ProductNameIndex):
+        """
+        Ajoute à l'index les produits plus récents que ceux qu'il connaît
+        
+        Avec le miroir, les produits créés par les autres processus y sont déjà
+        (upsert avant la libération du verrou) : aucun appel HTTP. Sans miroir,
+        seuls les produits d'id supérieur sont demandés à Grocy.
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/api/objects/products/{product_id}",
-                headers=self.headers,
-                timeout=5
-            )
-            if response.status_code == 200:
-                return response.json()
-            return None
-        except Exception:
-            return None
+            if self.use_mirror:
+                rows = self.mirror.newer_than('products', index.max_id)
+            else:
+                rows = self._fetch_objects('products', query=[f"id>{index.max_id}"])
+        except Exception as e:
+            logger.warning("⚠️ Impossible de vérifier les nouveaux produits: %s", e)
+            return
+        for row in rows:
+            index.add(row)
     
     def _parse_ingredient(self, ingredient: str) -> Dict[str, Any]:
         """
@@ -335,51 +711,55 @@ class GrocyClient:
         Returns:
             ID de l'unité
         """
-        units = self.get_quantity_units()
         
-        # Map des noms courts vers les noms complets possibles
-        unit_variants = {
-            'g': ['gramme', 'grammes', 'g'],
-            'kg': ['kilogramme', 'kilogrammes', 'kg'],
-            'mg': ['milligramme', 'milligrammes', 'mg'],
-            'ml': ['millilitre', 'millilitres', 'ml'],
-            'cl': ['centilitre', 'centilitres', 'cl'],
-            'dl': ['décilitre', 'décilitres', 'dl'],
-            'l': ['litre', 'litres', 'l'],
-            'cuillère à soupe': ['cuillère à soupe', 'cuillères à soupe', 'cuillere a soupe'],
-            'cuillère à café': ['cuillère à café', 'cuillères à café', 'cuillere a cafe'],
-            'tasse': ['tasse', 'tasses'],
-            'piece': ['piece', 'pieces', 'pièce', 'pièces'],
-        }
-        
-        # Obtenir les variantes possibles pour cette unité
-        variants = unit_variants.get(unit_name.lower(), [unit_name.lower()])
+        # Obtenir les variantes possibles pour cette unité (noms courts -> noms complets)
+        variants = UNIT_VARIANTS.get(unit_name.lower(), [unit_name.lower()])
         
         # Chercher si l'unité existe déjà (insensible à la casse et avec variantes)
-        for unit in units:
+        unit = self._find_unit(variants)
+        if unit:
+            return unit['id']
+        
+        # Une seule création par nom, même avec plusieurs imports en parallèle
+        key = f"{self.base_url}:quantity_units:{unit_name.lower()}"
+        unit_id, _ = _creations.do(key, lambda: self._create_unit_once(key, unit_name, variants))
+        return unit_id
+    
+    def _find_unit(self, variants: List[str]) -> Optional[Dict]:
+        """Unité dont le nom ou le pluriel (insensible à la casse) est dans variants"""
+        mirror = self._synced_mirror()
+        if mirror:
+            return mirror.find_by_name('quantity_units', variants)
+        
+        for unit in self.get_quantity_units():
             unit_name_lower = unit['name'].lower()
-            unit_plural_lower = unit.get('name_plural', '').lower()
+            unit_plural_lower = (unit.get('name_plural') or '').lower()
             
             if unit_name_lower in variants or unit_plural_lower in variants:
+                return unit
+        return None
+    
+    def _create_unit_once(self, key: str, unit_name: str, variants: List[str]) -> int:
+        """Crée l'unité sous verrou, sauf si un autre processus vient de la créer"""
+        with file_lock(key):
+            # Avec le miroir, l'unité créée par un autre processus y est déjà
+            # (upsert avant la libération du verrou) : simple lecture SQLite
+            unit = self._find_unit(variants)
+            if unit:
+                logger.info("✓ Unité '%s' créée entre-temps", unit['name'])
                 return unit['id']
+            return self._create_unit(unit_name, variants)
+    
+    def _create_unit(self, unit_name: str, variants: List[str]) -> int:
+        """
+        Crée une unité dans Grocy
         
+        Returns:
+            ID de l'unité créée (ou d'une unité de repli si la création échoue)
+        """
         # L'unité n'existe pas, la créer
-        unit_names = {
-            'g': ('Gramme', 'Grammes'),
-            'kg': ('Kilogramme', 'Kilogrammes'),
-            'mg': ('Milligramme', 'Milligrammes'),
-            'ml': ('Millilitre', 'Millilitres'),
-            'cl': ('Centilitre', 'Centilitres'),
-            'dl': ('Décilitre', 'Décilitres'),
-            'l': ('Litre', 'Litres'),
-            'cuillère à soupe': ('Cuillère à soupe', 'Cuillères à soupe'),
-            'cuillère à café': ('Cuillère à café', 'Cuillères à café'),
-            'tasse': ('Tasse', 'Tasses'),
-            'piece': ('Piece', 'Pieces'),
-        }
-        
-        if unit_name in unit_names:
-            singular, plural = unit_names[unit_name]
+        if unit_name in UNIT_NAMES:
+            singular, plural = UNIT_NAMES[unit_name]
         else:
             singular = unit_name.capitalize()
             plural = unit_name.capitalize() + 's'
@@ -391,30 +771,35 @@ class GrocyClient:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/objects/quantity_units",
-                headers=self.headers,
+            response = self.http.post(
+                "/api/objects/quantity_units",
                 json=unit_payload,
                 timeout=10
             )
             
             if response.status_code in [200, 201]:
                 new_unit_id = response.json()['created_object_id']
-                print(f"    + Unité '{singular}' créée")
+                logger.info("+ Unité '%s' créée", singular)
+                if self.use_mirror:
+                    self.mirror.upsert('quantity_units', dict(unit_payload, id=new_unit_id))
                 return new_unit_id
             else:
-                print(f"    ⚠️ Impossible de créer l'unité '{singular}': {response.text}")
+                logger.warning("⚠️ Impossible de créer l'unité '%s': %s", singular, response.text)
                 # L'unité existe probablement déjà, recharger et chercher à nouveau
+                if self.use_mirror:
+                    self.mirror.sync(force=True)
                 units = self.get_quantity_units()
                 for unit in units:
                     unit_name_lower = unit['name'].lower()
                     if unit_name_lower in variants:
-                        print(f"    ✓ Unité '{unit['name']}' trouvée après rechargement")
+                        logger.info("✓ Unité '%s' trouvée après rechargement", unit['name'])
                         return unit['id']
                 # Fallback sur la première unité disponible
                 return self._get_default_quantity_unit()
+        except GrocyUnavailable:
+            raise
         except Exception as e:
-            print(f"    ⚠️ Exception création unité: {e}")
+            logger.warning("⚠️ Exception création unité: %s", e)
             return self._get_default_quantity_unit()
     
     def _clean_ingredient_name(self, ingredient: str) -> str:
@@ -471,7 +856,7 @@ class GrocyClient:
         
         return final
     
-    def _create_product(self, product_name: str, unit_id: int = None) -> Optional[int]:
+    def _create_product(self, product_name: str, unit_id: int = None) -> Optional[Dict]:
         """
         Crée un nouveau produit dans Grocy
         
@@ -480,7 +865,8 @@ class GrocyClient:
             unit_id: ID de l'unité à utiliser (optionnel, sinon utilise unité par défaut)
             
         Returns:
-            ID du produit créé ou None si échec
+            Le produit tel qu'envoyé à Grocy, avec son ID (pas de relecture
+            nécessaire), ou None si échec
         """
         # Si pas d'unité spécifiée, récupérer l'unité par défaut
         if unit_id is None:
@@ -497,21 +883,24 @@ class GrocyClient:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/objects/products",
-                headers=self.headers,
+            response = self.http.post(
+                "/api/objects/products",
                 json=product_payload,
                 timeout=10
             )
             
             if response.status_code in [200, 201]:
-                product_id = response.json()['created_object_id']
-                return product_id
+                product = dict(product_payload, id=int(response.json()['created_object_id']))
+                if self.use_mirror:
+                    self.mirror.upsert('products', product)
+                return product
             else:
-                print(f"        ❌ ERREUR création produit (code {response.status_code}): {response.text}")
+                logger.error("❌ Erreur création produit (code %s): %s", response.status_code, response.text)
                 return None
+        except GrocyUnavailable:
+            raise
         except Exception as e:
-            print(f"        ❌ EXCEPTION création produit: {e}")
+            logger.error("❌ Exception création produit: %s", e)
             return None
     
     def _format_description(self, recipe_data: Dict[str, Any]) -> str:
@@ -591,18 +980,16 @@ class GrocyClient:
         
         Returns:
             Liste des unités
+            
+        Raises:
+            Exception si Grocy ne répond pas (GrocyUnavailable) ou répond une erreur
         """
-        try:
-            response = requests.get(
-                f"{self.base_url}/api/objects/quantity_units",
-                headers=self.headers,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            return []
-        except Exception:
-            return []
+        mirror = self._synced_mirror()
+        if mirror:
+            return mirror.all('quantity_units')
+        
+        # Une erreur n'est pas un catalogue vide : elle remonte à l'appelant
+        return self._fetch_objects('quantity_units')
     
     def _get_default_quantity_unit(self) -> int:
         """
@@ -629,15 +1016,13 @@ class GrocyClient:
         """
         Récupère la liste des produits Grocy
         Utile pour mapper les ingrédients aux produits existants
+        
+        Raises:
+            Exception si Grocy ne répond pas (GrocyUnavailable) ou répond une erreur
         """
-        try:
-            response = requests.get(
-                f"{self.base_url}/api/objects/products",
-                headers=self.headers,
-                timeout=10
-            )
-            if response.status_code == 200:
-                return response.json()
-            return []
-        except Exception:
-            return []
+        mirror = self._synced_mirror()
+        if mirror:
+            return mirror.all('products')
+        
+        # Une erreur n'est pas un catalogue vide : elle remonte à l'appelant
+        return self._fetch_objects('products')
@@ -0,0 +1,181 @@
+"""
+État de santé de chaque instance Grocy, partagé par les clients du processus
+
+Les imports consultent cet état au lieu d'un GET /api/system/info
+synchrone avant chaque import :
+- mis à jour passivement par les vrais appels (réponse reçue : joignable ;
+  erreur réseau, timeout, 502/503/504 : injoignable ; 401/403 : clé API
+  refusée, donc inutilisable)
+- un état par instance et par clé API : une clé invalide ne bloque pas
+  les imports faits avec la bonne
+- rafraîchi en arrière-plan (thread dédié, jamais dans la requête) quand
+  il date de plus de GROCY_HEALTH_TTL secondes, GROCY_HEALTH_RETRY s'il
+  est mauvais
+- inconnu au démarrage : considéré joignable, le premier appel tranche
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TTL = float(os.getenv('GROCY_HEALTH_TTL', '30'))
+UNHEALTHY_TTL = float(os.getenv('GROCY_HEALTH_RETRY', '5'))
+PROBE_TIMEOUT = 5
+
+# Passerelle ou Grocy hors service ; une 500 isolée est une erreur applicative
+DOWN_STATUS = {502, 503, 504}
+
+# Clé API refusée : Grocy répond, mais aucun import ne peut aboutir
+AUTH_STATUS = {401, 403}
+
+
+class GrocyHealth:
+    """Dernier état connu d'une instance Grocy pour une clé API, avec sonde en arrière-plan"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str] = None,
+                 ttl: float = None, unhealthy_ttl: float = None):
+        """
+        Args:
+            base_url: URL de base de Grocy
+            headers: En-têtes de la sonde (clé API)
+        """
+        self.base_url = base_url
+        self.headers: Dict[str, str] = dict(headers or {})
+        self.key_id = _key_id(self.headers)
+        self.ttl = HEALTH_TTL if ttl is None else ttl
+        self.unhealthy_ttl = UNHEALTHY_TTL if unhealthy_ttl is None else unhealthy_ttl
+
+        # None tant qu'aucun appel n'a abouti ou échoué
+        self.healthy: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.probes = 0
+
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            if self.healthy is False:
+                logger.info("🩺 Grocy %s de nouveau joignable", self.base_url)
+            self.healthy = True
+            self.checked_at = time.monotonic()
+            self.last_error = None
+
+    def record_failure(self, error: str):
+        with self._lock:
+            if self.healthy is not False:
+                logger.warning("🩺 Grocy %s inutilisable : %s", self.base_url, error)
+            self.healthy = False
+            self.checked_at = time.monotonic()
+            self.last_error = error
+
+    def record_response(self, status: int):
+        """
+        Issue d'un vrai appel : les réponses de passerelle et les refus de
+        la clé API comptent comme panne, une 500 isolée ne change rien
+        """
+        if status in DOWN_STATUS:
+            self.record_failure(f"HTTP {status}")
+        elif status in AUTH_STATUS:
+            self.record_failure(f"HTTP {status} (clé API refusée)")
+        elif status < 500:
+            self.record_success()
+
+    def is_healthy(self) -> bool:
+        """
+        Dernier état connu, sans appel réseau ; s'il est périmé, une sonde
+        part en arrière-plan pour le prochain import
+        """
+        with self._lock:
+            healthy = self.healthy
+            ttl = self.unhealthy_ttl if healthy is False else self.ttl
+            stale = self.checked_at is None or time.monotonic() - self.checked_at > ttl
+            probe = stale and not self._probing and bool(self.headers)
+            if probe:
+                self._probing = True
+
+        if probe:
+            threading.Thread(target=self._probe, name=f"grocy-health {self.base_url}", daemon=True).start()
+        return healthy is not False
+
+    def _probe(self):
+        try:
+            response = requests.get(f"{self.base_url}/api/system/info", headers=self.headers, timeout=PROBE_TIMEOUT)
+        except requests.RequestException as e:
+            self.record_failure(str(e))
+        else:
+            if response.status_code in AUTH_STATUS:
+                self.record_failure(f"HTTP {response.status_code} (clé API refusée)")
+            elif response.status_code < 500:
+                self.record_success()
+            else:
+                self.record_failure(f"HTTP {response.status_code}")
+        finally:
+            with self._lock:
+                self._probing = False
+                self.probes += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'base_url': self.base_url,
+                'healthy': self.healthy,
+                'age_seconds': round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+                'last_error': self.last_error,
+                'probes': self.probes,
+            }
+
+
+def _key_id(headers: Dict[str, str]) -> str:
+    """Empreinte courte de la clé API (la clé elle-même n'est jamais exposée)"""
+    key = headers.get('GROCY-API-KEY', '')
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:8] if key else ''
+
+
+# Un état par instance Grocy et par clé API, partagé par tous les clients du processus
+_health: Dict[tuple, GrocyHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_health(base_url: str, headers: Dict[str, str] = None) -> GrocyHealth:
+    """
+    Args:
+        headers: En-têtes des appels (clé API), repris par la sonde
+    """
+    headers = headers or {}
+    key = (base_url, _key_id(headers))
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            health = _health[key] = GrocyHealth(base_url, headers)
+        return health
+
+
+def health_report() -> Dict[str, Dict]:
+    """État de toutes les instances Grocy (et clés API) connues du processus"""
+    with _health_lock:
+        states = list(_health.values())
+    return {
+        f"{health.base_url} [clé {health.key_id}]" if health.key_id else health.base_url: health.snapshot()
+        for health in states
+    }
+
+
+def _reset_after_fork():
+    # Une sonde en cours dans le parent n'existe pas dans l'enfant
+    global _health_lock
+    _health_lock = threading.Lock()
+    _health.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
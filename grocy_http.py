@@ -0,0 +1,235 @@
+"""
+Couche d'appel HTTP commune à tous les appels Grocy
+
+- Nouvelles tentatives avec backoff exponentiel et jitter pour les
+  requêtes idempotentes (GET, PUT, DELETE) sur erreur réseau, 429 et 5xx
+- Disjoncteur par instance Grocy : après plusieurs échecs consécutifs,
+  les appels échouent immédiatement (GrocyUnavailable) pendant un délai,
+  puis un appel d'essai décide de la réouverture
+- Chaque réponse (ou erreur réseau) met à jour l'état de santé partagé de
+  l'instance (voir grocy_health)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict
+
+import requests
+
+from adaptive_limiter import get_write_limiter
+from grocy_health import get_health
+from metrics import observe_grocy_request
+from tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = int(os.getenv('GROCY_RETRIES', '3'))
+BACKOFF_BASE = float(os.getenv('GROCY_BACKOFF_BASE', '0.2'))
+BACKOFF_MAX = float(os.getenv('GROCY_BACKOFF_MAX', '5'))
+
+# Échecs consécutifs avant ouverture du disjoncteur, et durée d'ouverture (secondes)
+BREAKER_THRESHOLD = int(os.getenv('GROCY_BREAKER_THRESHOLD', '5'))
+BREAKER_RESET = float(os.getenv('GROCY_BREAKER_RESET', '30'))
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+# Écritures : passent par le limiteur de concurrence adaptatif
+WRITE_METHODS = {'POST', 'PUT', 'DELETE'}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class GrocyUnavailable(Exception):
+    """Grocy injoignable : erreurs réseau répétées ou disjoncteur ouvert"""
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / semi-ouvert"""
+
+    def __init__(self, threshold: int = None, reset_timeout: float = None):
+        self.threshold = BREAKER_THRESHOLD if threshold is None else threshold
+        self.reset_timeout = BREAKER_RESET if reset_timeout is None else reset_timeout
+
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.time() - self.opened_at < self.reset_timeout:
+                return 'open'
+            return 'half-open'
+
+    def before_call(self):
+        """
+        Raises:
+            GrocyUnavailable si le disjoncteur est ouvert (ou si un appel
+            d'essai est déjà en cours en semi-ouvert)
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.time() - self.opened_at)
+            if remaining > 0:
+                raise GrocyUnavailable(
+                    f"Grocy indisponible ({self.failures} échecs), nouvel essai dans {remaining:.0f}s"
+                )
+            if self._trial_running:
+                raise GrocyUnavailable("Grocy indisponible, appel d'essai en cours")
+            self._trial_running = True
+
+    def release_trial(self):
+        """Appel interrompu sans verdict (exception inattendue) : un autre essai pourra partir"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning("🔌 Disjoncteur Grocy ouvert après %d échecs", self.failures)
+                self.opened_at = time.time()
+
+
+# Un disjoncteur par instance Grocy, partagé par tous les clients du processus
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if breaker is None:
+            breaker = _breakers[base_url] = CircuitBreaker()
+        return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """Délai avant la tentative attempt (1, 2...) : full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+class GrocyHttp:
+    """Session HTTP vers une instance Grocy, avec retries et disjoncteur"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str], max_retries: int = None):
+        """
+        Args:
+            base_url: URL de base de Grocy
+            headers: En-têtes envoyés à chaque appel (clé API)
+            max_retries: Nouvelles tentatives des requêtes idempotentes (None = GROCY_RETRIES)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self.breaker = get_breaker(self.base_url)
+        self.write_limiter = get_write_limiter(self.base_url)
+        self.health = get_health(self.base_url, headers)
+        # Connexions réutilisées entre appels (keep-alive)
+        self.session = requests.Session()
+        # Requêtes envoyées par ce client, tentatives comprises (métriques par import)
+        self.request_count = 0
+
+    def request(self, method: str, path: str, retry: bool = None, **kwargs) -> requests.Response:
+        """
+        Appelle Grocy
+
+        Args:
+            method: Méthode HTTP
+            path: Chemin depuis la racine (ex: "/api/objects/products")
+            retry: Réessayer en cas d'échec (None = seulement si idempotente)
+            **kwargs: params, json, timeout... (voir requests)
+
+        Returns:
+            La réponse, y compris 4xx/5xx : le code est vérifié par l'appelant
+
+        Raises:
+            GrocyUnavailable si Grocy ne répond pas (ou disjoncteur ouvert)
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.max_retries if retry else 0)
+        kwargs.setdefault('timeout', 10)
+
+        for attempt in range(1, attempts + 1):
+            self.breaker.before_call()
+            try:
+                response = self._send(method, path, kwargs)
+            except requests.RequestException as e:
+                # Réseau, timeout, mais aussi réponse tronquée ou illisible
+                # (ChunkedEncodingError, ContentDecodingError...) et URL invalide
+                self.breaker.record_failure()
+                self.health.record_failure(str(e))
+                if attempt == attempts:
+                    raise GrocyUnavailable(f"Grocy injoignable ({method} {path}): {e}") from e
+            except BaseException:
+                # Sinon un appel d'essai laisserait le disjoncteur ouvert jusqu'au redémarrage
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                self.health.record_response(response.status_code)
+                if response.status_code not in RETRY_STATUS or attempt == attempts:
+                    return response
+
+            time.sleep(backoff_delay(attempt))
+
+    def _send(self, method: str, path: str, kwargs: Dict) -> requests.Response:
+        """Un envoi ; les écritures attendent une place du limiteur adaptatif"""
+        if method not in WRITE_METHODS:
+            return self._timed(method, path, kwargs)
+
+        self.write_limiter.acquire()
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self._timed(method, path, kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.write_limiter.release(time.perf_counter() - start, failed)
+
+    def _timed(self, method: str, path: str, kwargs: Dict) -> requests.Response:
+        """Requête HTTP, comptée et chronométrée pour /metrics"""
+        self.request_count += 1
+        start = time.perf_counter()
+        status = None
+        with span(f"{method} {path}") as current:
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", headers=self.headers, **kwargs)
+                status = response.status_code
+                if current is not None:
+                    current.set(status=status)
+                return response
+            finally:
+                observe_grocy_request(method, status, time.perf_counter() - start)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', path, **kwargs)
@@ -0,0 +1,241 @@
+"""
+Miroir SQLite local des données de référence Grocy
+(produits, unités de quantité, recettes)
+
+- Synchronisation incrémentale : rien n'est téléchargé si db-changed-time
+  n'a pas bougé, sinon seules les lignes créées depuis la dernière
+  synchronisation (row_created_timestamp) sont récupérées
+- Resynchronisation complète périodique pour prendre en compte les
+  modifications et suppressions (Grocy n'horodate pas les mises à jour)
+- Fichier partagé par la CLI et les workers de l'API (un fichier par instance Grocy)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from metrics import cache_access
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.getenv(
+    'GROCY_MIRROR_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'grocy-recipe-importer')
+)
+
+# Intervalle minimal entre deux vérifications de db-changed-time (secondes)
+CHECK_INTERVAL = float(os.getenv('GROCY_MIRROR_CHECK_INTERVAL', '5'))
+
+# Intervalle entre deux resynchronisations complètes (secondes)
+FULL_SYNC_INTERVAL = float(os.getenv('GROCY_MIRROR_FULL_SYNC_INTERVAL', '3600'))
+
+# Entités miroir et colonnes indexées pour les recherches par nom
+ENTITIES = {
+    'products': ['name'],
+    'quantity_units': ['name', 'name_plural'],
+    'recipes': ['name'],
+}
+
+
+class GrocyMirror:
+    """Copie locale indexée des tables Grocy utilisées par l'import"""
+
+    def __init__(self, client, path: str = None):
+        """
+        Args:
+            client: GrocyClient utilisé pour les appels HTTP (_fetch_objects)
+            path: Fichier SQLite (None = un fichier par URL Grocy dans GROCY_MIRROR_DIR)
+        """
+        self.client = client
+        if path is None:
+            digest = hashlib.sha1(client.base_url.encode('utf-8')).hexdigest()[:12]
+            path = os.path.join(DEFAULT_DIR, f"mirror-{digest}.sqlite3")
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._last_check = 0.0
+
+        db = self._connect()
+        for entity, columns in ENTITIES.items():
+            extra = "".join(f", {c}_lower TEXT" for c in columns)
+            db.execute(f"""
+                CREATE TABLE IF NOT EXISTS {entity} (
+                    id INTEGER PRIMARY KEY,
+                    row_created_timestamp TEXT,
+                    data TEXT NOT NULL{extra}
+                )
+            """)
+            for c in columns:
+                db.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{entity}_{c} ON {entity} ({c}_lower)"
+                )
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                entity TEXT PRIMARY KEY,
+                last_created TEXT,
+                db_changed_time TEXT,
+                last_full_sync REAL
+            )
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (sqlite3 n'autorise pas le partage)"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            # isolation_level=None : transactions gérées explicitement (BEGIN IMMEDIATE)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def sync(self, force: bool = False):
+        """
+        Met le miroir à jour si Grocy a changé depuis la dernière synchronisation
+
+        Args:
+            force: Ignorer l'intervalle minimal entre deux vérifications
+        """
+        with self._sync_lock:
+            now = time.time()
+            if not force and now - self._last_check < CHECK_INTERVAL:
+                cache_access('grocy_mirror', True)
+                return
+            self._last_check = now
+
+            changed_time = self.client.get_db_changed_time()
+
+            fetched = [self._sync_entity(entity, changed_time, now) for entity in ENTITIES]
+            cache_access('grocy_mirror', not any(fetched))
+
+    def _sync_entity(self, entity: str, changed_time: Optional[str], now: float) -> bool:
+        """
+        Returns:
+            True si des lignes ont été téléchargées (False : déjà à jour)
+        """
+        db = self._connect()
+        state = db.execute(
+            "SELECT last_created, db_changed_time, last_full_sync FROM sync_state WHERE entity = ?",
+            (entity,)
+        ).fetchone()
+
+        last_created, last_changed, last_full = state if state else (None, None, 0.0)
+
+        if changed_time is not None and changed_time == last_changed:
+            return False
+
+        full = not last_created or now - (last_full or 0.0) > FULL_SYNC_INTERVAL
+
+        if full:
+            rows = self.client._fetch_objects(entity)
+        else:
+            # >= : plusieurs lignes peuvent partager la même seconde, l'upsert dédoublonne
+            rows = self.client._fetch_objects(
+                entity, query=[f"row_created_timestamp>={last_created}"]
+            )
+
+        # BEGIN IMMEDIATE : une seule écriture à la fois entre processus
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if full:
+                db.execute(f"DELETE FROM {entity}")
+            self._upsert_rows(db, entity, rows)
+
+            newest = db.execute(f"SELECT MAX(row_created_timestamp) FROM {entity}").fetchone()[0]
+            db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (entity, newest or last_created or '', changed_time,
+                 now if full else last_full)
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+        if full:
+            logger.info("🔄 Miroir Grocy : %s resynchronisé (%d lignes)", entity, len(rows))
+        return True
+
+    def _upsert_rows(self, db: sqlite3.Connection, entity: str, rows: List[Dict]):
+        columns = ENTITIES[entity]
+        placeholders = ", ".join("?" for _ in range(3 + len(columns)))
+        names = ", ".join(['id', 'row_created_timestamp', 'data'] + [f"{c}_lower" for c in columns])
+        db.executemany(
+            f"INSERT OR REPLACE INTO {entity} ({names}) VALUES ({placeholders})",
+            [
+                [row['id'], row.get('row_created_timestamp'), json.dumps(row)]
+                + [(row.get(c) or '').lower() for c in columns]
+                for row in rows
+            ]
+        )
+
+    def snapshot(self, entity: str) -> Optional[tuple]:
+        """
+        Identifiant de l'état d'une entité, tiré de sa propre table : ne
+        change pas quand Grocy est modifié ailleurs (recettes écrites par
+        les imports), None si jamais synchronisée
+
+        Returns:
+            Tuple (dernière synchronisation complète, nombre de lignes,
+            plus grand id, plus récent row_created_timestamp) : entre deux
+            synchronisations complètes, seuls des ajouts sont possibles
+        """
+        db = self._connect()
+        state = db.execute(
+            "SELECT last_full_sync FROM sync_state WHERE entity = ?", (entity,)
+        ).fetchone()
+        if state is None:
+            return None
+        count, max_id, newest = db.execute(
+            f"SELECT COUNT(*), MAX(id), MAX(row_created_timestamp) FROM {entity}"
+        ).fetchone()
+        return (state[0], count, max_id or 0, newest)
+
+    def upsert(self, entity: str, row: Dict):
+        """Ajoute une ligne créée localement (évite une resynchronisation)"""
+        self._upsert_rows(self._connect(), entity, [row])
+
+    def all(self, entity: str) -> List[Dict]:
+        """Toutes les lignes d'une entité"""
+        rows = self._connect().execute(f"SELECT data FROM {entity} ORDER BY id").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def get(self, entity: str, object_id: int) -> Optional[Dict]:
+        row = self._connect().execute(
+            f"SELECT data FROM {entity} WHERE id = ?", (object_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def newer_than(self, entity: str, object_id: int) -> List[Dict]:
+        """
+        Lignes d'id supérieur à object_id (y compris celles ajoutées par
+        upsert dans un autre processus, sans attendre une synchronisation)
+        """
+        rows = self._connect().execute(
+            f"SELECT data FROM {entity} WHERE id > ? ORDER BY id", (object_id,)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def find_by_name(self, entity: str, names: List[str]) -> Optional[Dict]:
+        """
+        Première ligne dont un champ nom (insensible à la casse) est dans names
+
+        Utilise les index sur les colonnes *_lower.
+        """
+        names = [n.lower() for n in names]
+        if not names:
+            return None
+        placeholders = ", ".join("?" for _ in names)
+        where = " OR ".join(f"{c}_lower IN ({placeholders})" for c in ENTITIES[entity])
+        row = self._connect().execute(
+            f"SELECT data FROM {entity} WHERE {where} ORDER BY id LIMIT 1",
+            names * len(ENTITIES[entity])
+        ).fetchone()
+        return json.loads(row[0]) if row else None
@@ -0,0 +1,388 @@
+"""
+Pipeline d'import commun à l'API, à main.py et aux scripts de debug
+
+    lookup → extract → connect → write
+
+- lookup : la source a-t-elle déjà été importée ? (recette existante retournée)
+- extract : recette depuis une page web, du HTML ou un Reel (voir RecipeSource)
+- connect : Grocy est-il joignable ? (état de santé en cache, sans appel réseau)
+- write : création (ou mise à jour) de la recette dans Grocy
+
+Chaque étape est chronométrée (ImportResult.timings et span de la trace).
+Pour chaque étape, ImportPipeline accepte :
+- un exécuteur (executors) : thread ou processus dédié au lieu du thread
+  appelant, ex: l'extraction dans un pool de processus pour ne pas
+  disputer le GIL aux autres requêtes
+- un cache (caches) : résultat réutilisé pour la même clé, ex: la
+  prévisualisation puis l'import d'une même URL n'extraient qu'une fois
+- un hook (hooks) appelé après extract, connect ou write avec
+  l'ImportResult ; s'il retourne False, l'import s'arrête là
+  (result.cancelled), ex: confirmation de l'utilisateur dans main.py
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from grocy_client import GrocyClient
+from metrics import cache_access, track_import
+from singleflight import canonical_url
+from tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+
+class GrocyConnectionError(Exception):
+    """Grocy ne répond pas au test de connexion"""
+
+
+class RecipeSource:
+    """
+    Origine d'une recette
+
+    Attributes:
+        kind: Label de la source dans les métriques (url, file, html, instagram)
+        url: URL identifiant la source dans Grocy (None = pas de recherche de doublon)
+        cache_key: Clé de l'extraction en cache (None = jamais en cache)
+        local_only: Extraction liée aux ressources du processus (jamais
+            envoyée à un pool de processus)
+    """
+
+    kind = ''
+    url: Optional[str] = None
+    cache_key: Optional[str] = None
+    local_only = False
+
+    def extract(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns:
+            Tuple (recette, détails propres à la source)
+        """
+        raise NotImplementedError
+
+
+class WebSource(RecipeSource):
+    """Page de recette (URL) ou fichier HTML local"""
+
+    def __init__(self, location: str):
+        self.location = location
+        if os.path.exists(location):
+            self.kind = 'file'
+        else:
+            self.kind = 'url'
+            self.url = location
+            self.cache_key = f"url:{canonical_url(location)}"
+
+    def extract(self):
+        from recipe_extractor import RecipeExtractor
+        return RecipeExtractor().extract(self.location), {}
+
+
+class HtmlSource(RecipeSource):
+    """HTML d'une page de recette envoyé tel quel (extension navigateur)"""
+
+    kind = 'html'
+
+    def __init__(self, html: str):
+        self.html = html
+        self.cache_key = "html:" + hashlib.sha1(html.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def extract(self):
+        from recipe_extractor import RecipeExtractor
+
+        logger.info("📥 Extraction depuis HTML (%d caractères)", len(self.html))
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
+            f.write(self.html)
+            temp_file = f.name
+        try:
+            return RecipeExtractor().extract(temp_file), {}
+        finally:
+            os.unlink(temp_file)
+
+
+class InstagramSource(RecipeSource):
+    """
+    Reel Instagram : description d'abord, audio transcrit seulement si elle
+    ne suffit pas (parsing incrémental, arrêt dès que la recette est complète)
+    """
+
+    kind = 'instagram'
+    # Scraper et modèle Whisper du worker
+    local_only = True
+
+    def __init__(self, url: str, scraper, force_transcription: bool = False, model_name: str = "medium"):
+        """
+        Args:
+            url: URL du Reel
+            scraper: InstagramScraper (partagé par le worker)
+            force_transcription: Transcrire même si la description suffit
+            model_name: Modèle Whisper
+        """
+        self.url = url
+        self.scraper = scraper
+        self.force_transcription = force_transcription
+        self.model_name = model_name
+        self.cache_key = f"{canonical_url(url)}:{int(force_transcription)}:{model_name}"
+
+    def extract(self):
+        from audio_transcriber import AudioTranscriber
+        from recipe_parser import RecipeParser, IncrementalRecipeParser
+
+        parser = RecipeParser()
+        video_downloaded = False
+
+        # Les médias téléchargés sont libérés à la sortie du bloc, même en cas d'erreur
+        with self.scraper.fetch_metadata(self.url) as metadata:
+            if parser.is_caption_sufficient(metadata.description) and not self.force_transcription:
+                logger.info("✓ Recette complète dans la description, vidéo non téléchargée")
+                transcription_text = ""
+            else:
+                logger.info("🎙️ Transcription audio...")
+                audio = metadata.fetch_audio()
+                transcriber = AudioTranscriber(model_name=self.model_name)
+                incremental = IncrementalRecipeParser(description=metadata.description)
+                for segment in transcriber.iter_segments(audio.path, language="fr"):
+                    incremental.feed(segment['text'])
+                    if incremental.is_complete():
+                        logger.info("✓ Recette complète à %.0fs, arrêt de la transcription", segment['end'])
+                        break
+                transcription_text = incremental.transcription
+                video_downloaded = True
+
+        recipe = parser.parse_recipe(description=metadata.description, transcription=transcription_text)
+        recipe['image_url'] = metadata.thumbnail
+        recipe['source_url'] = self.url
+
+        return recipe, {
+            'uploader': metadata.uploader,
+            'duration': metadata.duration,
+            'transcription_length': len(transcription_text),
+            'video_downloaded': video_downloaded,
+        }
+
+
+class ImportResult:
+    """État d'un passage dans le pipeline"""
+
+    def __init__(self, source: RecipeSource):
+        self.source = source
+        self.recipe: Optional[Dict[str, Any]] = None
+        self.details: Dict[str, Any] = {}
+        self.recipe_id: Optional[int] = None
+        # Recette déjà importée depuis cette source (dict de find_recipe_by_source)
+        self.existing: Optional[Dict] = None
+        # lookup fait : existing est à jour (pas de seconde recherche à l'écriture)
+        self.looked_up = False
+        self.cancelled = False
+        self.trace_id = None
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def already_imported(self) -> bool:
+        return self.existing is not None
+
+
+class TTLCache:
+    """Cache LRU borné dont les entrées expirent (partageable entre threads)"""
+
+    def __init__(self, maxsize: int = 64, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def make_executor(kind: str, workers: int = 2) -> Optional[Executor]:
+    """
+    Args:
+        kind: inline (None : thread appelant), thread ou process
+    """
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline')
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind != 'inline':
+        raise ValueError(f"Exécuteur inconnu : {kind} (inline, thread ou process)")
+    return None
+
+
+class ImportPipeline:
+    """Import d'une source dans un Grocy, étape par étape"""
+
+    def __init__(self, grocy_url: str, grocy_api_key: str,
+                 executors: Dict[str, Executor] = None,
+                 caches: Dict[str, TTLCache] = None,
+                 hooks: Dict[str, Callable[[ImportResult], Optional[bool]]] = None,
+                 grocy: GrocyClient = None):
+        """
+        Args:
+            grocy_url: URL de Grocy
+            grocy_api_key: Clé API Grocy
+            executors: Exécuteur par étape (défaut : thread appelant)
+            caches: Cache par étape (seule l'extraction, sans effet de bord, s'y prête)
+            hooks: Fonction appelée après extract, connect, write ; False arrête l'import
+            grocy: Client existant (défaut : créé au premier besoin)
+        """
+        self.grocy_url = grocy_url
+        self.grocy_api_key = grocy_api_key
+        self.executors = executors or {}
+        self.caches = caches or {}
+        self.hooks = hooks or {}
+        self._grocy = grocy
+
+    @property
+    def grocy(self) -> GrocyClient:
+        if self._grocy is None:
+            self._grocy = GrocyClient(self.grocy_url, self.grocy_api_key)
+        return self._grocy
+
+    def run(self, source: RecipeSource, reimport: bool = False, **attributes) -> ImportResult:
+        """
+        Import complet, mesuré et tracé (track_import)
+
+        Args:
+            source: Origine de la recette
+            reimport: Mettre à jour une recette déjà importée (et ré-extraire la source)
+            attributes: Attributs de la trace (ex: request_id)
+
+        Raises:
+            GrocyConnectionError: Grocy ne répond pas
+        """
+        result = ImportResult(source)
+        if source.url:
+            attributes.setdefault('url', source.url)
+
+        with track_import(source.kind, **attributes) as tracker:
+            tracker.grocy = self.grocy
+            result.trace_id = tracker.trace_id
+
+            if not reimport and self.lookup(result) is not None:
+                tracker.outcome = 'already_imported'
+            elif not (self.extract(result, use_cache=not reimport)
+                      and self.connect(result)
+                      and self.write(result, reimport)):
+                tracker.outcome = 'cancelled'
+        return result
+
+    def lookup(self, result: ImportResult) -> Optional[Dict]:
+        """Recette déjà importée depuis cette source, ou None"""
+        if not result.source.url:
+            return None
+        result.existing = self._stage(result, 'lookup', self.grocy.find_recipe_by_source, result.source.url)
+        result.looked_up = True
+        if result.existing:
+            logger.info("♻️ Déjà importée : recette %s", result.existing['recipe_id'])
+            result.recipe_id = result.existing['recipe_id']
+        return result.existing
+
+    def extract(self, source_or_result, use_cache: bool = True) -> Optional[ImportResult]:
+        """
+        Extrait la recette (cache et exécuteur de l'étape 'extract')
+
+        Args:
+            source_or_result: RecipeSource (prévisualisation) ou ImportResult en cours
+
+        Returns:
+            L'ImportResult, ou None si le hook a arrêté l'import
+        """
+        result = source_or_result
+        if isinstance(result, RecipeSource):
+            result = ImportResult(result)
+
+        key = result.source.cache_key if use_cache else None
+        recipe, details = self._stage(result, 'extract', result.source.extract,
+                                      cache_key=key, local=result.source.local_only)
+        # Copie : l'appelant peut modifier la recette sans toucher au cache
+        result.recipe, result.details = dict(recipe), dict(details)
+        logger.info("✓ Recette extraite: %s", result.recipe['title'])
+        return result if self._continue(result, 'extract') else None
+
+    def connect(self, result: ImportResult) -> bool:
+        """
+        Raises:
+            GrocyConnectionError: Grocy ne répond pas
+        """
+        if not self._stage(result, 'connect', self.grocy.is_available):
+            raise GrocyConnectionError("Impossible de se connecter à Grocy")
+        return self._continue(result, 'connect')
+
+    def write(self, result: ImportResult, reimport: bool = False) -> bool:
+        kwargs = {'existing': result.existing} if result.looked_up else {}
+        result.recipe_id = self._stage(
+            result, 'write', self.grocy.import_recipe, result.recipe, update_existing=reimport, **kwargs
+        )
+        logger.info("✓ Recette importée: ID %s", result.recipe_id)
+        return self._continue(result, 'write')
+
+    def _stage(self, result: ImportResult, name: str, func: Callable, *args,
+               cache_key: str = None, local: bool = False, **kwargs):
+        """
+        Exécute une étape : cache, exécuteur, chronométrage et span
+
+        Args:
+            cache_key: Clé dans le cache de l'étape (None = pas de cache)
+            local: Ne pas utiliser un pool de processus (thread appelant à la place)
+        """
+        cache = self.caches.get(name) if cache_key else None
+        start = time.perf_counter()
+        try:
+            with span(f"pipeline:{name}") as current:
+                if cache is not None:
+                    value = cache.get(cache_key)
+                    cache_access(f"pipeline_{name}", value is not None)
+                    if value is not None:
+                        if current is not None:
+                            current.set(cached=True)
+                        return value
+
+                executor = self.executors.get(name)
+                if local and isinstance(executor, ProcessPoolExecutor):
+                    executor = None
+                if executor is None:
+                    value = func(*args, **kwargs)
+                elif isinstance(executor, ProcessPoolExecutor):
+                    # Pas de contexte (trace, import en cours) dans un autre processus
+                    value = executor.submit(func, *args, **kwargs).result()
+                else:
+                    context = contextvars.copy_context()
+                    value = executor.submit(context.run, func, *args, **kwargs).result()
+
+                if cache is not None:
+                    cache.set(cache_key, value)
+                return value
+        finally:
+            result.timings[name] = result.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def _continue(self, result: ImportResult, name: str) -> bool:
+        hook = self.hooks.get(name)
+        if hook is not None and hook(result) is False:
+            result.cancelled = True
+            return False
+        return True
@@ -4,26 +4,69 @@ Module de scraping Instagram Reels
 Utilise yt-dlp pour télécharger les vidéos et extraire les métadonnées
 """
 
+import logging
 import os
-import json
+import re
 import subprocess
-import tempfile
+import threading
 from typing import Dict, Optional
-from pathlib import Path
+
+from media_workspace import MediaWorkspace, ENTRY_PREFIX
+from metrics import cache_access, stage
+from tracing import span
+
+
+logger = logging.getLogger(__name__)
 
 
 class InstagramScraper:
-    def __init__(self, download_dir: str = None, cookies_file: str = None):
+    def __init__(self, download_dir: str = None, cookies_file: str = None,
+                 workspace: MediaWorkspace = None):
         """
         Initialise le scraper Instagram
         
         Args:
-            download_dir: Dossier pour télécharger les vidéos (None = temp)
+            download_dir: Racine de l'espace média (None = MEDIA_WORKSPACE_DIR ou temp)
             cookies_file: Chemin vers le fichier cookies Instagram (optionnel)
+            workspace: Espace média déjà configuré (prioritaire sur download_dir)
         """
-        self.download_dir = download_dir or tempfile.gettempdir()
+        self.workspace = workspace or MediaWorkspace(root=download_dir)
+        self.download_dir = self.workspace.root
         self.cookies_file = cookies_file
         
+        # Dossiers laissés par des jobs interrompus (crash, timeout worker)
+        self.workspace.sweep_orphans()
+        
+        # Instance yt-dlp réutilisée d'un appel à l'autre (cookies parsés une fois)
+        self._ydl = None
+        self._ydl_lock = threading.Lock()
+        
+    def fetch_metadata(self, url: str) -> 'ReelMetadata':
+        """
+        Récupère les métadonnées d'un Reel sans rien télécharger
+        
+        Args:
+            url: URL du Reel Instagram
+            
+        Returns:
+            ReelMetadata (description, durée, miniature...) dont
+            fetch_audio() donne accès à l'audio à la demande
+        """
+        import yt_dlp
+        
+        logger.info("📥 Extraction des métadonnées Instagram...")
+        
+        with self._ydl_lock, stage('fetch', tool='yt-dlp'):
+            try:
+                info = self._get_ydl().extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                raise Exception(f"Erreur yt-dlp : {e}")
+        
+        if info is None:
+            raise Exception("yt-dlp n'a retourné aucune information")
+        
+        return ReelMetadata(self, url, info)
+    
     def download_reel(self, url: str) -> Dict:
         """
         Télécharge un Reel Instagram et extrait les métadonnées
@@ -40,123 +83,115 @@ class InstagramScraper:
                 - uploader: Créateur
                 - duration: Durée en secondes
         """
-        # Créer un dossier unique pour ce téléchargement
-        temp_id = os.urandom(8).hex()
-        output_dir = os.path.join(self.download_dir, f"instagram_{temp_id}")
-        os.makedirs(output_dir, exist_ok=True)
+        metadata = self.fetch_metadata(url)
+        audio = metadata.fetch_audio()
+        
+        result = metadata.to_dict()
+        result['audio_path'] = audio.path
+        result['video_path'] = audio.video_path
+        
+        logger.info("✓ Téléchargement terminé (vidéo : %s, audio : %s)", result['video_path'], result['audio_path'])
+        logger.debug("Description : %s...", result['description'][:100])
+        
+        return result
+    
+    def _download_media(self, key: str, info: Dict) -> tuple:
+        """
+        Télécharge la vidéo d'un Reel déjà extrait et en tire l'audio,
+        dans le dossier de l'espace média réservé pour ce Reel
+        
+        Si l'audio de ce Reel est encore en cache, rien n'est téléchargé.
+        
+        Returns:
+            Tuple (chemin vidéo ou None si audio en cache, chemin audio)
+        """
+        output_dir = self.workspace.acquire(key)
+        
+        cached_audio = self.workspace.find(key, '.mp3')
+        cache_access('audio', cached_audio is not None)
+        if cached_audio:
+            logger.info("♻️ Audio en cache : %s", cached_audio)
+            return None, cached_audio
         
         output_template = os.path.join(output_dir, "%(id)s.%(ext)s")
         
         try:
-            # Étape 1 : Extraire les métadonnées
-            print("📥 Extraction des métadonnées Instagram...")
-            metadata = self._extract_metadata(url)
-            
-            # Étape 2 : Télécharger la vidéo
-            print("🎥 Téléchargement de la vidéo...")
-            video_path = self._download_video(url, output_template)
+            logger.info("🎥 Téléchargement de la vidéo...")
+            with stage('download', tool='yt-dlp'):
+                video_path = self._download(info, output_template)
             
-            # Étape 3 : Extraire l'audio
-            print("🎵 Extraction de l'audio...")
-            audio_path = self._extract_audio(video_path)
-            
-            result = {
-                'video_path': video_path,
-                'audio_path': audio_path,
-                'description': metadata.get('description', ''),
-                'title': metadata.get('title', ''),
-                'uploader': metadata.get('uploader', ''),
-                'duration': metadata.get('duration', 0),
-                'thumbnail': metadata.get('thumbnail', ''),
-                'upload_date': metadata.get('upload_date', ''),
-                'view_count': metadata.get('view_count', 0),
-                'like_count': metadata.get('like_count', 0),
-            }
+            logger.info("🎵 Extraction de l'audio...")
+            with stage('audio_extract'):
+                audio_path = self._extract_audio(video_path)
             
-            print(f"✓ Téléchargement terminé")
-            print(f"  Vidéo : {video_path}")
-            print(f"  Audio : {audio_path}")
-            print(f"  Description : {result['description'][:100]}...")
-            
-            return result
+            return video_path, audio_path
             
         except Exception as e:
             # Nettoyer en cas d'erreur
-            self._cleanup(output_dir)
+            self.workspace.discard(key)
             raise Exception(f"Erreur lors du téléchargement : {e}")
     
-    def _extract_metadata(self, url: str) -> Dict:
-        """Extrait les métadonnées sans télécharger"""
-        cmd = [
-            'yt-dlp',
-            '--dump-json',
-            '--no-playlist',
-        ]
-        
-        # Ajouter les cookies si disponibles
-        if self.cookies_file and os.path.exists(self.cookies_file):
-            cmd.extend(['--cookies', self.cookies_file])
-        
-        cmd.append(url)
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30
-            )
+    def _get_ydl(self):
+        """Crée (une seule fois) l'instance YoutubeDL partagée par les appels"""
+        if self._ydl is None:
+            import yt_dlp
             
-            return json.loads(result.stdout)
+            options = {
+                'format': 'best',  # Meilleure qualité
+                'noplaylist': True,
+                'quiet': True,
+                'no_warnings': True,
+                'noprogress': True,
+                'socket_timeout': 30,
+            }
             
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Erreur yt-dlp : {e.stderr}")
-        except subprocess.TimeoutExpired:
-            raise Exception("Timeout lors de l'extraction des métadonnées")
-    
-    def _download_video(self, url: str, output_template: str) -> str:
-        """Télécharge la vidéo"""
-        cmd = [
-            'yt-dlp',
-            '-f', 'best',  # Meilleure qualité
-            '--no-playlist',
-            '-o', output_template,
-        ]
+            # Ajouter les cookies si disponibles
+            if self.cookies_file and os.path.exists(self.cookies_file):
+                options['cookiefile'] = self.cookies_file
+            
+            self._ydl = yt_dlp.YoutubeDL(options)
         
-        # Ajouter les cookies si disponibles
-        if self.cookies_file and os.path.exists(self.cookies_file):
-            cmd.extend(['--cookies', self.cookies_file])
+        return self._ydl
+    
+    def _download(self, info: Dict, output_template: str) -> str:
+        """
+        Télécharge la vidéo à partir d'un info dict déjà extrait
+        (pas de nouvelle requête sur la page Instagram)
         
-        cmd.append(url)
+        Returns:
+            Chemin de la vidéo
+        """
+        import yt_dlp
         
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=120
-            )
+        # Le modèle de sortie change à chaque appel : l'instance partagée
+        # ne doit servir qu'à un téléchargement à la fois
+        with self._ydl_lock:
+            ydl = self._get_ydl()
+            ydl.params['outtmpl'] = {'default': output_template}
             
-            # Trouver le fichier téléchargé
-            output_dir = os.path.dirname(output_template)
-            video_files = list(Path(output_dir).glob('*.*'))
-            video_files = [f for f in video_files if f.suffix not in ['.json', '.mp3', '.wav']]
+            try:
+                result = ydl.process_ie_result(dict(info), download=True)
+            except yt_dlp.utils.DownloadError as e:
+                raise Exception(f"Erreur yt-dlp : {e}")
             
-            if not video_files:
-                raise Exception("Aucun fichier vidéo trouvé après téléchargement")
-            
-            return str(video_files[0])
-            
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Erreur lors du téléchargement : {e.stderr}")
-        except subprocess.TimeoutExpired:
-            raise Exception("Timeout lors du téléchargement (vidéo trop longue ?)")
+            # Chemin réel du fichier (yt-dlp >= 2022) ou reconstruit depuis le modèle
+            downloads = result.get('requested_downloads') or []
+            if downloads and downloads[0].get('filepath'):
+                video_path = downloads[0]['filepath']
+            else:
+                video_path = ydl.prepare_filename(result)
+        
+        if not os.path.exists(video_path):
+            raise Exception("Aucun fichier vidéo trouvé après téléchargement")
+        
+        return video_path
     
     def _extract_audio(self, video_path: str) -> str:
         """Extrait l'audio de la vidéo"""
         audio_path = os.path.splitext(video_path)[0] + '.mp3'
+        # Fichier partiel propre à ce job : un autre job (ou worker) ne prend
+        # pour de l'audio en cache qu'un .mp3 complet, mis en place par os.replace
+        partial_path = f"{audio_path}.{os.getpid()}-{threading.get_ident()}.part"
         
         cmd = [
             'ffmpeg',
@@ -166,17 +201,20 @@ class InstagramScraper:
             '-ar', '16000',  # 16kHz pour Whisper
             '-ac', '1',  # Mono
             '-b:a', '64k',  # Bitrate réduit
+            '-f', 'mp3',  # Format explicite : l'extension .part ne le dit pas
             '-y',  # Overwrite
-            audio_path
+            partial_path
         ]
         
         try:
-            subprocess.run(
-                cmd,
-                capture_output=True,
-                check=True,
-                timeout=60
-            )
+            with span('subprocess', cmd='ffmpeg'):
+                subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    check=True,
+                    timeout=60
+                )
+            os.replace(partial_path, audio_path)
             
             return audio_path
             
@@ -184,6 +222,10 @@ class InstagramScraper:
             raise Exception(f"Erreur ffmpeg : {e.stderr.decode()}")
         except subprocess.TimeoutExpired:
             raise Exception("Timeout lors de l'extraction audio")
+        finally:
+            # Audio tronqué (erreur, timeout) : jamais réutilisé
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
     
     def _cleanup(self, directory: str):
         """Nettoie le dossier de téléchargement"""
@@ -192,22 +234,143 @@ class InstagramScraper:
             if os.path.exists(directory):
                 shutil.rmtree(directory)
         except Exception as e:
-            print(f"⚠️ Impossible de nettoyer {directory}: {e}")
+            logger.warning("⚠️ Impossible de nettoyer %s: %s", directory, e)
+    
+    def close(self):
+        """Ferme l'instance yt-dlp (et sauvegarde les cookies rafraîchis)"""
+        with self._ydl_lock:
+            if self._ydl is not None:
+                self._ydl.close()
+                self._ydl = None
     
     def cleanup_files(self, video_path: str = None, audio_path: str = None):
-        """Nettoie les fichiers téléchargés"""
+        """Nettoie les fichiers téléchargés (tout le dossier du Reel)"""
         try:
-            if video_path and os.path.exists(video_path):
-                # Nettoyer tout le dossier parent
-                parent_dir = os.path.dirname(video_path)
+            path = video_path or audio_path
+            if not path:
+                return
+            parent_dir = os.path.dirname(path)
+            name = os.path.basename(parent_dir)
+            if os.path.dirname(parent_dir) == self.workspace.root and name.startswith(ENTRY_PREFIX):
+                self.workspace.discard(name[len(ENTRY_PREFIX):])
+            elif os.path.exists(path):
                 self._cleanup(parent_dir)
         except Exception as e:
-            print(f"⚠️ Erreur de nettoyage : {e}")
+            logger.warning("⚠️ Erreur de nettoyage : %s", e)
+
+
+class ReelMetadata:
+    """
+    Métadonnées d'un Reel, obtenues sans télécharger la vidéo
+    
+    Utilisable comme context manager : les médias téléchargés pendant le
+    bloc sont libérés à la sortie, y compris en cas d'exception.
+    """
+    
+    def __init__(self, scraper: InstagramScraper, url: str, info: Dict):
+        self.url = url
+        self.description = info.get('description') or ''
+        self.title = info.get('title', '')
+        self.uploader = info.get('uploader', '')
+        self.duration = info.get('duration', 0)
+        self.thumbnail = info.get('thumbnail', '')
+        self.upload_date = info.get('upload_date', '')
+        self.view_count = info.get('view_count', 0)
+        self.like_count = info.get('like_count', 0)
+        
+        self._scraper = scraper
+        self._info = info
+        self._audio = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._audio is not None:
+            self._audio.cleanup(failed=exc_type is not None)
+        return False
+    
+    def fetch_audio(self) -> 'LazyAudio':
+        """Retourne l'audio du Reel, téléchargé seulement à la première lecture"""
+        if self._audio is None:
+            self._audio = LazyAudio(self._scraper, self._info)
+        return self._audio
+    
+    def to_dict(self) -> Dict:
+        """Mêmes clés que download_reel, sans les chemins de fichiers"""
+        return {
+            'description': self.description,
+            'title': self.title,
+            'uploader': self.uploader,
+            'duration': self.duration,
+            'thumbnail': self.thumbnail,
+            'upload_date': self.upload_date,
+            'view_count': self.view_count,
+            'like_count': self.like_count,
+        }
+
+
+class LazyAudio:
+    """
+    Audio d'un Reel téléchargé à la demande
+    
+    Rien n'est téléchargé tant que path ou video_path n'est pas lu.
+    """
+    
+    def __init__(self, scraper: InstagramScraper, info: Dict):
+        self._scraper = scraper
+        self._info = info
+        # Clé de l'entrée dans l'espace média : l'identifiant du Reel
+        self._key = re.sub(r'[^\w-]', '_', str(info.get('id') or os.urandom(8).hex()))
+        self._acquired = False
+        self._video_path = None
+        self._audio_path = None
+    
+    @property
+    def downloaded(self) -> bool:
+        return self._audio_path is not None
+    
+    @property
+    def path(self) -> str:
+        """Chemin du fichier audio (déclenche le téléchargement)"""
+        self._ensure_downloaded()
+        return self._audio_path
+    
+    @property
+    def video_path(self) -> Optional[str]:
+        """Chemin du fichier vidéo (None si l'audio venait du cache)"""
+        self._ensure_downloaded()
+        return self._video_path
+    
+    def cleanup(self, failed: bool = False):
+        """
+        Libère les fichiers du job (sans effet si rien n'a été téléchargé)
+        
+        La vidéo est supprimée, l'audio reste en cache sous quota.
+        Après un échec, tout le dossier est supprimé.
+        """
+        if not self._acquired:
+            return
+        if failed:
+            self._scraper.workspace.discard(self._key)
+        else:
+            self._scraper.workspace.release(self._key)
+        self._acquired = False
+        self._video_path = None
+        self._audio_path = None
+    
+    def _ensure_downloaded(self):
+        if self._audio_path is None:
+            self._video_path, self._audio_path = self._scraper._download_media(self._key, self._info)
+            self._acquired = True
 
 
 # Test du module
 if __name__ == '__main__':
     import sys
+    from log_config import setup_logging
+    
+    setup_logging()
     
     if len(sys.argv) < 2:
         print("Usage: python instagram_scraper.py <URL_INSTAGRAM_REEL>")
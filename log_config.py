@@ -0,0 +1,150 @@
+"""
+Configuration des logs : niveaux, format texte ou JSON, identifiant de
+corrélation (requête ou job) et écriture dans un thread dédié
+
+Les modules se contentent de logging.getLogger(__name__) et de messages
+formatés paresseusement (logger.debug("... %s", valeur)). Les points
+d'entrée (api.py, main.py, scripts) appellent setup_logging() une fois.
+
+Variables d'environnement :
+- LOG_LEVEL : DEBUG, INFO (défaut), WARNING...
+- LOG_FORMAT : text (défaut) ou json (une ligne JSON par message)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from tracing import current_trace_id
+
+
+# Identifiant de la requête HTTP ou du job en cours (thread / tâche asyncio)
+correlation_id: ContextVar = ContextVar('correlation_id', default=None)
+
+# Attributs standard d'un LogRecord : tout le reste vient de extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'context', 'correlation_id', 'trace_id'}
+
+_NOISY_LOGGERS = ('urllib3', 'httpx', 'httpcore')
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def new_correlation_id() -> str:
+    return os.urandom(6).hex()
+
+
+@contextmanager
+def correlation(value: str = None):
+    """Associe un identifiant (nouveau si None) aux logs émis dans le bloc"""
+    token = correlation_id.set(value or new_correlation_id())
+    try:
+        yield correlation_id.get()
+    finally:
+        correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Ajoute correlation_id et trace_id au message, dans le thread émetteur"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        record.trace_id = current_trace_id()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message, avec les champs passés dans extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key in ('correlation_id', 'trace_id'):
+            if getattr(record, key, None):
+                entry[key] = getattr(record, key)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible : heure, niveau, [corrélation], message"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(context)s%(message)s', '%H:%M:%S')
+
+    def format(self, record: logging.LogRecord) -> str:
+        cid = getattr(record, 'correlation_id', None)
+        record.context = f"[{cid}] " if cid else ''
+        return super().format(record)
+
+
+def setup_logging(level: str = None, json_format: bool = None, stream=None):
+    """
+    Configure le logger racine (idempotent)
+
+    Les messages passent par une file : l'écriture sur le flux se fait dans
+    le thread du QueueListener, pas dans le thread de la requête.
+
+    Args:
+        level: Niveau minimal (None = LOG_LEVEL, INFO par défaut)
+        json_format: Une ligne JSON par message (None = LOG_FORMAT=json)
+        stream: Flux de sortie (défaut : stderr)
+    """
+    global _listener
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+
+    with _setup_lock:
+        root = logging.getLogger()
+        root.setLevel(level)
+        # Une ligne par requête HTTP en DEBUG : déjà couvert par les traces
+        for noisy in _NOISY_LOGGERS:
+            logging.getLogger(noisy).setLevel(logging.WARNING)
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if json_format else TextFormatter())
+
+        log_queue = queue.SimpleQueue()
+        handler = logging.handlers.QueueHandler(log_queue)
+        handler.addFilter(CorrelationFilter())
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+        if hasattr(os, 'register_at_fork'):
+            # Le thread du listener ne survit pas à un fork (gunicorn --preload)
+            os.register_at_fork(after_in_child=_restart_listener)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener():
+    if _listener is not None:
+        _listener.start()
@@ -5,9 +5,8 @@ Grocy Recipe Importer - Outil d'import automatique de recettes web vers Grocy
 
 import argparse
 import sys
-from pathlib import Path
-from recipe_extractor import RecipeExtractor
-from grocy_client import GrocyClient
+from import_pipeline import GrocyConnectionError, ImportPipeline, WebSource
+from log_config import setup_logging
 from rich.console import Console
 from rich.prompt import Confirm
 
@@ -32,6 +31,11 @@ def main():
         required=True,
         help="Clé API Grocy"
     )
+    parser.add_argument(
+        "--reimport",
+        action="store_true",
+        help="Met à jour la recette si cette URL a déjà été importée"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -39,14 +43,12 @@ def main():
     )
     
     args = parser.parse_args()
+    setup_logging()
     
-    try:
-        # Étape 1 : Extraction de la recette
-        console.print("[bold blue]🔍 Extraction de la recette...[/bold blue]")
-        extractor = RecipeExtractor()
-        recipe_data = extractor.extract(args.source)
-        
-        # Affichage de la recette extraite
+    source = WebSource(args.source)
+    
+    def show_recipe(result):
+        recipe_data = result.recipe
         console.print(f"\n[bold green]✓ Recette extraite :[/bold green] {recipe_data['title']}")
         console.print(f"[dim]Portions:[/dim] {recipe_data.get('yields', 'N/A')}")
         console.print(f"[dim]Temps total:[/dim] {recipe_data.get('total_time', 'N/A')} min")
@@ -55,41 +57,53 @@ def main():
             console.print(f"  • {ing}")
         if len(recipe_data['ingredients']) > 5:
             console.print(f"  ... et {len(recipe_data['ingredients']) - 5} autres")
-        
-        if args.dry_run:
-            console.print("\n[yellow]Mode dry-run activé - Import annulé[/yellow]")
-            return
-        
-        # Étape 2 : Connexion à Grocy
-        console.print("\n[bold blue]🔗 Connexion à Grocy...[/bold blue]")
-        grocy = GrocyClient(args.grocy_url, args.api_key)
-        
-        # Vérification de la connexion
-        if not grocy.test_connection():
-            console.print("[bold red]✗ Impossible de se connecter à Grocy[/bold red]")
-            sys.exit(1)
-        
+        if not args.dry_run:
+            console.print("\n[bold blue]🔗 Connexion à Grocy...[/bold blue]")
+    
+    def confirm_import(result):
         console.print("[green]✓ Connecté à Grocy[/green]")
         
         # Vérifier les unités disponibles
-        units = grocy.get_quantity_units()
+        units = pipeline.grocy.get_quantity_units()
         if units:
             console.print(f"[dim]Unités disponibles: {len(units)} (utilisation de '{units[0]['name']}' par défaut)[/dim]")
         
         # Confirmation avant import
-        if not Confirm.ask(f"\n[yellow]Importer '{recipe_data['title']}' dans Grocy ?[/yellow]"):
-            console.print("[dim]Import annulé[/dim]")
+        if not Confirm.ask(f"\n[yellow]Importer '{result.recipe['title']}' dans Grocy ?[/yellow]"):
+            return False
+        console.print("\n[bold blue]📤 Import de la recette dans Grocy...[/bold blue]")
+    
+    pipeline = ImportPipeline(args.grocy_url, args.api_key,
+                              hooks={'extract': show_recipe, 'connect': confirm_import})
+    
+    try:
+        console.print("[bold blue]🔍 Extraction de la recette...[/bold blue]")
+        if args.dry_run:
+            pipeline.extract(source)
+            console.print("\n[yellow]Mode dry-run activé - Import annulé[/yellow]")
             return
         
-        # Étape 3 : Import dans Grocy
-        console.print("\n[bold blue]📤 Import de la recette dans Grocy...[/bold blue]")
-        recipe_id = grocy.import_recipe(recipe_data)
+        result = pipeline.run(source, reimport=args.reimport)
+        
+        # Source déjà importée : ni extraction, ni écriture
+        if result.already_imported:
+            console.print(f"[yellow]♻️ Déjà importée :[/yellow] {result.existing['title']}")
+            console.print(f"[dim]Accès: {args.grocy_url}/#recipe/{result.recipe_id}[/dim]")
+            console.print("[dim]Utilisez --reimport pour la mettre à jour[/dim]")
+            return
+        
+        if result.cancelled:
+            console.print("[dim]Import annulé[/dim]")
+            return
         
         console.print(f"[bold green]✓ Recette importée avec succès ![/bold green]")
-        console.print(f"[dim]ID Grocy: {recipe_id}[/dim]")
-        console.print(f"[dim]{len(recipe_data['ingredients'])} ingrédients ajoutés[/dim]")
-        console.print(f"[dim]Accès: {args.grocy_url}/#recipe/{recipe_id}[/dim]")
+        console.print(f"[dim]ID Grocy: {result.recipe_id}[/dim]")
+        console.print(f"[dim]{len(result.recipe['ingredients'])} ingrédients ajoutés[/dim]")
+        console.print(f"[dim]Accès: {args.grocy_url}/#recipe/{result.recipe_id}[/dim]")
         
+    except GrocyConnectionError:
+        console.print("[bold red]✗ Impossible de se connecter à Grocy[/bold red]")
+        sys.exit(1)
     except Exception as e:
         console.print(f"[bold red]✗ Erreur : {str(e)}[/bold red]")
         sys.exit(1)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Espace de travail pour les médias téléchargés (vidéos, audio)
+
+- Racine configurable (ex: un tmpfs comme /dev/shm pour la vitesse)
+- Quota de taille total avec éviction LRU des audios gardés en cache
+- Nettoyage lié à la durée de vie du job (la vidéo ne survit pas au job)
+- Balayage au démarrage des dossiers orphelins (jobs interrompus)
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+# Racine par défaut : MEDIA_WORKSPACE_DIR, sinon un sous-dossier du temp système
+DEFAULT_ROOT = os.getenv(
+    'MEDIA_WORKSPACE_DIR',
+    os.path.join(tempfile.gettempdir(), 'grocy-recipe-media')
+)
+
+# Quota total des médias conservés (Mo)
+DEFAULT_QUOTA_MB = int(os.getenv('MEDIA_WORKSPACE_QUOTA_MB', '512'))
+
+# Un dossier plus récent que ça peut appartenir à un job en cours dans un
+# autre worker : il n'est ni évincé ni balayé (> timeout gunicorn de 300s)
+IN_USE_GRACE_SECONDS = 600
+
+ENTRY_PREFIX = 'instagram_'
+
+# Extensions conservées en cache après la fin d'un job
+CACHED_EXTENSIONS = ('.mp3',)
+
+
+class MediaWorkspace:
+    """Dossiers de médias par Reel, sous quota, partagés par les jobs"""
+
+    def __init__(self, root: str = None, quota_mb: int = None):
+        """
+        Args:
+            root: Dossier racine (None = MEDIA_WORKSPACE_DIR ou temp système)
+            quota_mb: Taille maximale des médias conservés (None = MEDIA_WORKSPACE_QUOTA_MB)
+        """
+        self.root = root or DEFAULT_ROOT
+        self.quota_bytes = (quota_mb if quota_mb is not None else DEFAULT_QUOTA_MB) * 1024 * 1024
+
+        os.makedirs(self.root, exist_ok=True)
+
+        # Compteur d'utilisation des entrées par les jobs de ce processus
+        self._in_use: Dict[str, int] = {}
+        # Entrées abandonnées en erreur alors que d'autres jobs les utilisaient
+        self._discarded: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def entry_dir(self, key: str) -> str:
+        """Chemin du dossier d'une entrée (un Reel)"""
+        return os.path.join(self.root, f"{ENTRY_PREFIX}{key}")
+
+    def acquire(self, key: str) -> str:
+        """
+        Réserve le dossier d'une entrée pour un job et le crée si besoin
+
+        Returns:
+            Chemin du dossier
+        """
+        path = self.entry_dir(key)
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+            os.makedirs(path, exist_ok=True)
+            # mtime = dernier accès, utilisé pour l'ordre LRU
+            os.utime(path)
+        return path
+
+    def find(self, key: str, extension: str) -> Optional[str]:
+        """Retourne un fichier déjà présent dans l'entrée, s'il existe"""
+        path = self.entry_dir(key)
+        if not os.path.isdir(path):
+            return None
+        for name in os.listdir(path):
+            if name.endswith(extension):
+                return os.path.join(path, name)
+        return None
+
+    def release(self, key: str):
+        """
+        Fin du job : supprime tout sauf les fichiers mis en cache (audio),
+        puis applique le quota
+
+        Rien n'est supprimé tant qu'un autre job utilise la même entrée ;
+        le dernier à la libérer fait le ménage.
+        """
+        path = self.entry_dir(key)
+        with self._lock:
+            if self._decrement(key):
+                return
+            if key in self._discarded:
+                self._discarded.discard(key)
+                _remove(path)
+            elif os.path.isdir(path):
+                for name in os.listdir(path):
+                    if not name.endswith(CACHED_EXTENSIONS):
+                        _remove(os.path.join(path, name))
+                if not os.listdir(path):
+                    _remove(path)
+        self.evict()
+
+    def discard(self, key: str):
+        """
+        Fin du job en erreur : supprime toute l'entrée, à la libération
+        par le dernier job si d'autres l'utilisent encore
+        """
+        with self._lock:
+            if self._decrement(key):
+                self._discarded.add(key)
+                return
+            self._discarded.discard(key)
+            _remove(self.entry_dir(key))
+
+    def evict(self) -> int:
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à
+        repasser sous le quota
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+
+        now = time.time()
+        # Les plus anciennes d'abord
+        for path, mtime, size in sorted(entries, key=lambda e: e[1]):
+            if total <= self.quota_bytes:
+                break
+            key = os.path.basename(path)[len(ENTRY_PREFIX):]
+            with self._lock:
+                if self._in_use.get(key) or now - mtime < IN_USE_GRACE_SECONDS:
+                    continue
+                _remove(path)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def sweep_orphans(self) -> int:
+        """
+        Supprime les dossiers laissés par des jobs interrompus : entrées sans
+        audio dans la racine, et anciens dossiers instagram_* du temp système
+
+        Returns:
+            Nombre de dossiers supprimés
+        """
+        now = time.time()
+        candidates = [(path, mtime) for path, mtime, _ in self._entries()
+                      if not self._has_cached_media(path)]
+
+        legacy_root = tempfile.gettempdir()
+        if os.path.abspath(legacy_root) != os.path.abspath(self.root):
+            for name in _listdir(legacy_root):
+                path = os.path.join(legacy_root, name)
+                if name.startswith(ENTRY_PREFIX) and os.path.isdir(path):
+                    candidates.append((path, os.path.getmtime(path)))
+
+        removed = 0
+        for path, mtime in candidates:
+            if now - mtime < IN_USE_GRACE_SECONDS:
+                continue
+            _remove(path)
+            removed += 1
+
+        if removed:
+            logger.info("🧹 %d dossier(s) média orphelin(s) supprimé(s)", removed)
+        return removed
+
+    def usage(self) -> Dict:
+        """Occupation disque de l'espace de travail"""
+        entries = self._entries()
+        with self._lock:
+            active = sum(1 for count in self._in_use.values() if count)
+        return {
+            'root': self.root,
+            'bytes': sum(size for _, _, size in entries),
+            'quota_bytes': self.quota_bytes,
+            'entries': len(entries),
+            'active_jobs': active,
+        }
+
+    def _decrement(self, key: str) -> int:
+        """Retourne le nombre de jobs qui utilisent encore l'entrée"""
+        count = self._in_use.get(key, 0) - 1
+        if count > 0:
+            self._in_use[key] = count
+            return count
+        self._in_use.pop(key, None)
+        return 0
+
+    def _entries(self) -> list:
+        """Liste (chemin, mtime, taille) des entrées de la racine"""
+        entries = []
+        for name in _listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not name.startswith(ENTRY_PREFIX) or not os.path.isdir(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                size = sum(
+                    os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+                )
+            except OSError:
+                # Entrée supprimée entre-temps par un autre worker
+                continue
+            entries.append((path, mtime, size))
+        return entries
+
+    def _has_cached_media(self, path: str) -> bool:
+        return any(name.endswith(CACHED_EXTENSIONS) for name in _listdir(path))
+
+
+def _listdir(path: str) -> list:
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _remove(path: str):
+    """Supprime un fichier ou un dossier, sans erreur s'il a déjà disparu"""
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        logger.warning("⚠️ Impossible de nettoyer %s: %s", path, e)
@@ -0,0 +1,103 @@
+"""
+Pic de mémoire Python par étape de l'import (tracemalloc)
+
+Désactivé par défaut : tracemalloc ralentit les allocations. MEMORY_TRACKING=1
+le démarre au chargement du module (ou enable() depuis un script).
+
+tracemalloc ne connaît qu'un pic pour tout le processus. Chaque fenêtre
+ouverte (une étape, un import) note la mémoire tracée à son ouverture ; à
+chaque ouverture ou fermeture d'une fenêtre, le pic courant est reporté sur
+toutes les fenêtres ouvertes avant d'être remis à zéro. Les fenêtres
+imbriquées ou simultanées (autres threads) restent donc exactes, mais le pic
+d'une fenêtre inclut les allocations des autres threads pendant qu'elle
+était ouverte.
+
+Seules les allocations faites via l'allocateur Python sont vues (objets
+Python, tableaux numpy) : pas les tenseurs torch ni ffmpeg, couverts par le
+RSS du worker (worker_memory_bytes dans metrics.py).
+"""
+
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+
+MEMORY_TRACKING = os.getenv('MEMORY_TRACKING', '0') == '1'
+
+# Une frame par allocation suffit pour les totaux (plus = plus lent)
+TRACEMALLOC_FRAMES = 1
+
+_lock = threading.Lock()
+_open_windows = set()
+
+
+class MemoryWindow:
+    """Mémoire tracée à l'ouverture et pic atteint pendant la fenêtre"""
+
+    __slots__ = ('baseline', 'peak')
+
+    def __init__(self, baseline: int):
+        self.baseline = baseline
+        self.peak = baseline
+
+    @property
+    def peak_bytes(self) -> int:
+        """Pic au-dessus de la mémoire déjà allouée à l'ouverture"""
+        return max(0, self.peak - self.baseline)
+
+
+def enable():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+def enabled() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def traced_bytes() -> int:
+    """Mémoire actuellement allouée et tracée (0 si désactivé)"""
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def _report_peak():
+    """Reporte le pic courant sur les fenêtres ouvertes (sous _lock)"""
+    peak = tracemalloc.get_traced_memory()[1]
+    for window in _open_windows:
+        if peak > window.peak:
+            window.peak = peak
+
+
+@contextmanager
+def memory_window():
+    """
+    Mesure le pic de mémoire tracée pendant le bloc
+
+    Yields:
+        MemoryWindow (lire peak_bytes après le bloc), ou None si désactivé
+    """
+    if not tracemalloc.is_tracing():
+        yield None
+        return
+
+    with _lock:
+        _report_peak()
+        tracemalloc.reset_peak()
+        window = MemoryWindow(tracemalloc.get_traced_memory()[0])
+        _open_windows.add(window)
+    try:
+        yield window
+    finally:
+        with _lock:
+            _report_peak()
+            _open_windows.discard(window)
+
+
+def peak_mb(window: Optional[MemoryWindow]) -> Optional[float]:
+    return round(window.peak_bytes / (1024 * 1024), 1) if window is not None else None
+
+
+if MEMORY_TRACKING:
+    enable()
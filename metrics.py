@@ -0,0 +1,426 @@
+"""
+Métriques de l'import au format texte Prometheus (sans dépendance)
+
+- Durée de chaque étape : fetch, extract, download, audio_extract,
+  transcribe, parse, master_data, product_resolution, grocy_write
+- Imports par source et par issue, requêtes Grocy (total et par import)
+- Accès aux caches (index de produits, miroir, audio) et taux de succès
+- Facteur temps réel de Whisper (durée de calcul / durée d'audio)
+- Mémoire de chaque worker (RSS, PSS) et, avec MEMORY_TRACKING=1, pic de
+  mémoire Python par étape et par import (voir memory_tracking.py)
+
+Avec plusieurs workers gunicorn, définir METRICS_DIR : chaque processus y
+écrit ses valeurs (un fichier JSON par pid) et /metrics les additionne.
+Sans METRICS_DIR, /metrics n'expose que le worker qui répond.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from memory_tracking import memory_window, peak_mb, traced_bytes
+from tracing import span, trace
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+# Intervalle minimal entre deux écritures du fichier du processus (secondes)
+FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+
+# Secondes : de l'appel HTTP local (ms) à la transcription d'un long Reel (min)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Octets : du parsing d'une description (Ko) à l'audio décodé d'un long Reel (Go)
+_MB = 1024 * 1024
+MEMORY_BUCKETS = tuple(size * _MB for size in (1, 4, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096))
+
+
+class Metric:
+    """Valeurs d'une métrique, par combinaison de labels"""
+
+    kind = ''
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with REGISTRY.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        REGISTRY.changed()
+
+
+class Gauge(Metric):
+    """Valeur instantanée ; avec METRICS_DIR, seuls les workers vivants sont exposés"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with REGISTRY.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labels)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with REGISTRY.lock:
+            # [compte par intervalle (non cumulé) ..., +Inf, somme]
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            state[index] += 1
+            state[-1] += value
+        REGISTRY.changed()
+
+
+class Registry:
+    """Métriques du processus, avec partage optionnel entre workers via METRICS_DIR"""
+
+    def __init__(self, directory: str = ''):
+        self.directory = directory
+        self.metrics: Dict[str, Metric] = {}
+        # Appelées avant chaque lecture des valeurs (jauges échantillonnées)
+        self.collectors: List[Callable[[], None]] = []
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def register(self, metric: Metric):
+        self.metrics[metric.name] = metric
+
+    def changed(self):
+        """Écrit le fichier du processus, au plus une fois par FLUSH_INTERVAL"""
+        if self.directory and time.time() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def _state(self) -> Dict[str, List]:
+        for collect in self.collectors:
+            collect()
+        with self.lock:
+            return {
+                name: [[list(key), value if isinstance(value, (int, float)) else list(value)]
+                       for key, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            }
+
+    def flush(self):
+        """Écrit les valeurs du processus dans METRICS_DIR (écriture atomique)"""
+        # Un autre thread est déjà en train d'écrire des valeurs aussi récentes
+        if not self.directory or not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.time()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{os.getpid()}.json")
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(self._state(), f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning("⚠️ Impossible d'écrire les métriques : %s", e)
+        finally:
+            self._flush_lock.release()
+
+    def _collect(self) -> Dict[str, Dict[Tuple[str, ...], object]]:
+        """Valeurs additionnées de tous les processus (ou du seul processus courant)"""
+        if not self.directory:
+            states = [self._state()]
+        else:
+            # Les fichiers des workers arrêtés restent comptés : les compteurs ne reculent pas
+            # (mais leurs jauges, figées, sont ignorées)
+            self.flush()
+            states = []
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.json'):
+                    try:
+                        with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                            state = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    if not _alive(filename[:-len('.json')]):
+                        state = {name: entries for name, entries in state.items()
+                                 if not isinstance(self.metrics.get(name), Gauge)}
+                    states.append(state)
+
+        merged: Dict[str, Dict[Tuple[str, ...], object]] = {name: {} for name in self.metrics}
+        for state in states:
+            for name, entries in state.items():
+                if name not in merged:
+                    continue
+                values = merged[name]
+                for key, value in entries:
+                    key = tuple(key)
+                    if isinstance(value, list):
+                        current = values.get(key)
+                        values[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        values[key] = values.get(key, 0) + value
+        return merged
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus 0.0.4"""
+        values = self._collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(values[name].items()):
+                labels = list(zip(metric.labels, key))
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float('inf'),), value[:-1]):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        lines.extend(_cache_ratios(values.get(CACHE_REQUESTS.name, {})))
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        pass
+    return True
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    escaped = (
+        f'{label}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for label, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _cache_ratios(values: Dict[Tuple[str, ...], float]) -> Iterator[str]:
+    """Taux de succès par cache, calculé depuis cache_requests_total"""
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), count in values.items():
+        hits_total = totals.setdefault(cache, [0, 0])
+        hits_total[1] += count
+        if result == 'hit':
+            hits_total[0] += count
+    yield "# HELP cache_hit_ratio Part des accès servis par le cache depuis le démarrage"
+    yield "# TYPE cache_hit_ratio gauge"
+    for cache, (hits, total) in sorted(totals.items()):
+        yield f"cache_hit_ratio{_labels([('cache', cache)])} {hits / total if total else 0.0}"
+
+
+REGISTRY = Registry(METRICS_DIR)
+
+IMPORTS = Counter('recipe_imports_total', "Imports de recettes par source et par issue", ('source', 'outcome'))
+IMPORT_SECONDS = Histogram('recipe_import_seconds', "Durée totale d'un import", ('source',))
+STAGE_SECONDS = Histogram('recipe_import_stage_seconds', "Durée d'une étape de l'import", ('stage',))
+STAGE_FAILURES = Counter('recipe_import_stage_failures_total', "Étapes terminées par une exception", ('stage',))
+
+GROCY_REQUESTS = Counter('grocy_requests_total', "Requêtes envoyées à Grocy (tentatives comprises)", ('method', 'status'))
+GROCY_REQUEST_SECONDS = Histogram('grocy_request_seconds', "Durée d'une requête Grocy", ('method',))
+GROCY_REQUESTS_PER_IMPORT = Histogram(
+    'grocy_requests_per_import', "Requêtes Grocy envoyées pendant un import", ('source',),
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500),
+)
+
+STAGE_PEAK_BYTES = Histogram(
+    'recipe_import_stage_peak_bytes', "Pic de mémoire Python d'une étape (MEMORY_TRACKING=1)", ('stage',),
+    buckets=MEMORY_BUCKETS,
+)
+IMPORT_PEAK_BYTES = Histogram(
+    'recipe_import_peak_bytes', "Pic de mémoire Python d'un import complet (MEMORY_TRACKING=1)", ('source',),
+    buckets=MEMORY_BUCKETS,
+)
+WORKER_MEMORY = Gauge(
+    'worker_memory_bytes', "Mémoire du worker : rss, rss_anon, rss_file (poids mmap partagés), pss, traced",
+    ('pid', 'kind'),
+)
+
+CACHE_REQUESTS = Counter('cache_requests_total', "Accès aux caches locaux", ('cache', 'result'))
+
+WHISPER_RTF = Histogram(
+    'whisper_real_time_factor', "Durée de calcul / durée d'audio, par fenêtre transcrite", ('backend', 'model'),
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 4, 8),
+)
+WHISPER_AUDIO_SECONDS = Counter('whisper_audio_seconds_total', "Secondes d'audio transcrites", ('backend', 'model'))
+WHISPER_PROCESSING_SECONDS = Counter(
+    'whisper_processing_seconds_total', "Secondes de calcul passées à transcrire", ('backend', 'model')
+)
+
+
+def _sample_worker_memory():
+    """RSS du processus (et mémoire tracée), relevé à chaque écriture ou lecture des métriques"""
+    from shared_weights import memory_report
+
+    report = memory_report()
+    pid = str(report['pid'])
+    for kind in ('rss', 'rss_anon', 'rss_file', 'pss'):
+        WORKER_MEMORY.set(report[f"{kind}_mb"] * _MB, pid=pid, kind=kind)
+    traced = traced_bytes()
+    if traced:
+        WORKER_MEMORY.set(traced, pid=pid, kind='traced')
+
+
+REGISTRY.collectors.append(_sample_worker_memory)
+
+
+# Import en cours dans ce thread / cette tâche asyncio (voir track_import)
+_current_import: ContextVar = ContextVar('current_import', default=None)
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """
+    Chronomètre une étape de l'import (et compte ses échecs)
+
+    Pendant un track_import, les durées d'une même étape sont cumulées
+    (ex: résolution de chaque ingrédient) et observées une fois à la fin.
+    Chaque passage est aussi un span de la trace (avec attributes).
+    Avec MEMORY_TRACKING=1, le pic de mémoire de l'étape est aussi mesuré
+    (le plus haut des passages pendant un track_import).
+    """
+    start = time.perf_counter()
+    current = window = None
+    try:
+        with span(name, **attributes) as current, memory_window() as window:
+            yield
+    except BaseException:
+        STAGE_FAILURES.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if window is not None and current is not None:
+            current.set(peak_mb=peak_mb(window))
+        tracker = _current_import.get()
+        if tracker is not None:
+            tracker.stages[name] = tracker.stages.get(name, 0.0) + elapsed
+            if window is not None:
+                tracker.stage_peaks[name] = max(tracker.stage_peaks.get(name, 0), window.peak_bytes)
+        else:
+            STAGE_SECONDS.observe(elapsed, stage=name)
+            if window is not None:
+                STAGE_PEAK_BYTES.observe(window.peak_bytes, stage=name)
+
+
+def cache_access(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def observe_grocy_request(method: str, status, seconds: float):
+    """
+    Args:
+        status: Code HTTP, ou None pour une erreur réseau
+    """
+    GROCY_REQUESTS.inc(method=method, status=f"{status // 100}xx" if status else 'error')
+    GROCY_REQUEST_SECONDS.observe(seconds, method=method)
+
+
+def observe_transcription(backend: str, model: str, audio_seconds: float, seconds: float):
+    """Une fenêtre (ou un fichier) transcrite : facteur temps réel et cumuls"""
+    if audio_seconds > 0:
+        WHISPER_RTF.observe(seconds / audio_seconds, backend=backend, model=model)
+    WHISPER_AUDIO_SECONDS.inc(audio_seconds, backend=backend, model=model)
+    WHISPER_PROCESSING_SECONDS.inc(seconds, backend=backend, model=model)
+
+
+class ImportTracker:
+    """Issue d'un import et client Grocy utilisé (pour compter ses requêtes)"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.outcome = 'imported'
+        self.grocy = None
+        self.trace_id = None
+        self.stages: Dict[str, float] = {}
+        # Pics de mémoire (octets), si MEMORY_TRACKING=1
+        self.stage_peaks: Dict[str, int] = {}
+        self.peak_bytes = None
+
+
+@contextmanager
+def track_import(source: str, **attributes):
+    """
+    Mesure un import complet : durée, issue et requêtes Grocy, et le trace
+    (span racine "import:<source>" avec attributes)
+
+    Usage :
+        with track_import('url') as tracker:
+            tracker.grocy = GrocyClient(...)
+            ...
+            tracker.outcome = 'already_imported'
+    """
+    tracker = ImportTracker(source)
+    with trace(f"import:{source}", **attributes) as root:
+        if root is not None:
+            tracker.trace_id = root.trace.trace_id
+        token = _current_import.set(tracker)
+        start = time.perf_counter()
+        window = None
+        try:
+            with memory_window() as window:
+                yield tracker
+        except BaseException:
+            tracker.outcome = 'error'
+            raise
+        finally:
+            _current_import.reset(token)
+            if window is not None:
+                tracker.peak_bytes = window.peak_bytes
+            if root is not None:
+                root.set(outcome=tracker.outcome)
+                if window is not None:
+                    root.set(peak_mb=peak_mb(window))
+            _observe_import(tracker, time.perf_counter() - start)
+
+
+def _observe_import(tracker: ImportTracker, seconds: float):
+    for name, stage_seconds in tracker.stages.items():
+        STAGE_SECONDS.observe(stage_seconds, stage=name)
+    for name, peak_bytes in tracker.stage_peaks.items():
+        STAGE_PEAK_BYTES.observe(peak_bytes, stage=name)
+    if tracker.peak_bytes is not None:
+        IMPORT_PEAK_BYTES.observe(tracker.peak_bytes, source=tracker.source)
+    IMPORTS.inc(source=tracker.source, outcome=tracker.outcome)
+    IMPORT_SECONDS.observe(seconds, source=tracker.source)
+    if tracker.grocy is not None:
+        GROCY_REQUESTS_PER_IMPORT.observe(tracker.grocy.http.request_count, source=tracker.source)
+    REGISTRY.flush()
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,212 @@
+"""
+Index des produits Grocy par nom normalisé
+
+"Œufs", "oeuf", "Oeufs" et "des œufs" désignent le même produit : les noms
+sont ramenés à une forme commune (accents, ligatures, casse, pluriels,
+articles) avant la recherche, pour ne pas créer de doublons dans Grocy.
+
+- Index construit une fois par état du catalogue, recherche en O(1)
+- Cache des noms absents récemment (évite de revérifier Grocy pour
+  chaque occurrence d'un nom inconnu)
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Durée pendant laquelle un nom absent n'est pas recherché à nouveau (secondes)
+MISS_TTL = float(os.getenv('PRODUCT_MISS_TTL', '60'))
+
+# Nombre maximal de noms absents gardés en mémoire
+MISS_CACHE_SIZE = 1024
+
+# Ligatures non décomposées par NFKD
+LIGATURES = {'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss'}
+
+# Articles retirés en début de nom ("de la farine", "l'huile", "des œufs")
+LEADING_ARTICLES = re.compile(r"^(?:(?:de|du|des|la|le|les|un|une|l|d)\s+)+")
+
+# Marque du pluriel (s, x) sur les mots d'au moins 4 lettres
+PLURAL_SUFFIX = re.compile(r"(?<=\w{3})[sx]\b")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Forme canonique d'un nom de produit
+
+    Exemple: "Des Œufs" -> "oeuf", "Crème fraîche" -> "creme fraiche"
+    """
+    text = ''.join(LIGATURES.get(c, c) for c in name)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+    # Ponctuation et apostrophes -> espaces ("l'huile" -> "l huile")
+    text = re.sub(r"[^\w]+", ' ', text).strip()
+
+    stripped = LEADING_ARTICLES.sub('', text)
+    # Un nom réduit à un article ("des") reste tel quel
+    text = stripped or text
+
+    return PLURAL_SUFFIX.sub('', text)
+
+
+def catalog_digest(products: Iterable[Dict]) -> str:
+    """Empreinte d'un catalogue (ids et noms), indépendante de l'ordre"""
+    rows = sorted((p['id'], p['name']) for p in products)
+    return hashlib.sha1("\n".join(f"{i}\t{name}" for i, name in rows).encode('utf-8')).hexdigest()
+
+
+class ProductNameIndex:
+    """Produits indexés par nom normalisé, avec cache des absents"""
+
+    def __init__(self, miss_ttl: float = None):
+        """
+        Args:
+            miss_ttl: Durée de vie d'un nom absent en cache (None = PRODUCT_MISS_TTL)
+        """
+        self.miss_ttl = MISS_TTL if miss_ttl is None else miss_ttl
+        self.snapshot = None
+        # Plus grand id connu : les produits plus récents sont à rattraper
+        self.max_id = 0
+
+        self._index: Dict[str, Dict] = {}
+        self._products: List[Dict] = []
+        self._ids: Set[int] = set()
+        self._matcher = None
+        self._misses: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rebuild(self, products: Iterable[Dict], snapshot=None):
+        """
+        Reconstruit l'index depuis le catalogue complet
+
+        Args:
+            products: Produits Grocy
+            snapshot: Identifiant de l'état du catalogue (None = toujours à reconstruire)
+        """
+        products = list(products)
+        index = {}
+        for product in products:
+            # Le premier produit créé l'emporte en cas de doublon existant
+            index.setdefault(normalize_name(product['name']), product)
+
+        with self._lock:
+            self._index = index
+            self._products = products
+            self._ids = {p['id'] for p in products}
+            self._matcher = None
+            self._misses.clear()
+            self.snapshot = snapshot
+            self.max_id = max((p['id'] for p in products), default=0)
+
+    def refresh(self, products: Iterable[Dict]):
+        """
+        Catalogue complet téléchargé (sans miroir) : reconstruit l'index
+        seulement s'il diffère de ce que l'index contient déjà (produits
+        ajoutés par add compris)
+        """
+        products = list(products)
+        digest = catalog_digest(products)
+        if digest == self.snapshot:
+            return
+        with self._lock:
+            current = catalog_digest(self._products) if len(self._ids) == len(products) else None
+            if current == digest:
+                self.snapshot = digest
+                return
+        self.rebuild(products, digest)
+
+    def is_current(self, snapshot) -> bool:
+        return snapshot is not None and snapshot == self.snapshot
+
+    def extend(self, products: Iterable[Dict], snapshot):
+        """
+        Ajoute les produits apparus depuis le dernier état, sans reconstruire,
+        et adopte le nouvel état du catalogue
+        """
+        for product in products:
+            self.add(product)
+        with self._lock:
+            self.snapshot = snapshot
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Produit correspondant au nom, ou None"""
+        return self._index.get(normalize_name(name))
+
+    def add(self, product: Dict):
+        """Ajoute un produit créé localement"""
+        key = normalize_name(product['name'])
+        with self._lock:
+            if product['id'] in self._ids:
+                return
+            self._index.setdefault(key, product)
+            self.max_id = max(self.max_id, product['id'])
+            self._products.append(product)
+            self._ids.add(product['id'])
+            # Le matcher déjà construit est complété, pas reconstruit
+            if self._matcher is not None:
+                self._matcher.add([product])
+            self._misses.pop(key, None)
+
+    def fuzzy_match(self, names: List[str], k: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Candidats approchés pour plusieurs noms (voir NgramMatcher.match_many)
+
+        Le matcher n-grammes est construit au premier appel pour cet état du
+        catalogue (rebuild), puis complété par les produits ajoutés (add).
+        """
+        from fuzzy_matcher import NgramMatcher
+
+        with self._lock:
+            if self._matcher is None:
+                self._matcher = NgramMatcher(self._products)
+            # Sous le verrou : add peut compléter le matcher depuis un autre thread
+            return self._matcher.match_many(names, k)
+
+    def remember_miss(self, name: str):
+        key = normalize_name(name)
+        with self._lock:
+            self._misses[key] = time.time()
+            self._misses.move_to_end(key)
+            while len(self._misses) > MISS_CACHE_SIZE:
+                self._misses.popitem(last=False)
+
+    def is_recent_miss(self, name: str) -> bool:
+        """True si le nom a été cherché sans succès il y a moins de miss_ttl"""
+        key = normalize_name(name)
+        with self._lock:
+            missed_at = self._misses.get(key)
+            if missed_at is None:
+                return False
+            if time.time() - missed_at > self.miss_ttl:
+                del self._misses[key]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def product_count(self) -> int:
+        """Nombre de produits distincts (doublons de nom compris)"""
+        return len(self._ids)
+
+
+# Un index par instance Grocy et par processus, partagé par les clients
+# (l'API crée un GrocyClient par requête)
+_indexes: Dict[str, ProductNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_product_index(grocy_url: str) -> ProductNameIndex:
+    with _indexes_lock:
+        index = _indexes.get(grocy_url)
+        if index is None:
+            index = _indexes[grocy_url] = ProductNameIndex()
+        return index
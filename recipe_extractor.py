@@ -3,10 +3,19 @@ Module d'extraction de recettes depuis des pages web
 Utilise recipe-scrapers pour supporter 250+ sites de recettes
 """
 
-from recipe_scrapers import scrape_me, scrape_html
+import requests
+from recipe_scrapers import scrape_html
 from pathlib import Path
 from typing import Dict, Any
 
+from metrics import stage
+
+
+# En-tête de navigateur : certains sites refusent les clients HTTP par défaut
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0',
+}
+
 
 class RecipeExtractor:
     """Extrait les données de recettes depuis URLs ou fichiers HTML"""
@@ -22,23 +31,40 @@ class RecipeExtractor:
             Dict contenant les données de la recette
         """
         if self._is_file(source):
-            return self._extract_from_file(source)
+            with stage('extract'):
+                return self._extract_from_file(source)
         else:
-            return self._extract_from_url(source)
+            # Téléchargement et extraction chronométrés séparément (réseau / parsing)
+            with stage('fetch', tool='requests'):
+                html_content = self._fetch_html(source)
+            with stage('extract'):
+                recipe_data = self._extract_from_html(html_content, source)
+            # Identifie la source pour éviter les doublons à la ré-importation
+            recipe_data['source_url'] = source
+            return recipe_data
     
     def _is_file(self, source: str) -> bool:
         """Vérifie si la source est un fichier local"""
         return Path(source).exists()
     
-    def _extract_from_url(self, url: str) -> Dict[str, Any]:
-        """Extrait une recette depuis une URL"""
+    def _fetch_html(self, url: str) -> str:
+        """Télécharge la page de la recette"""
+        try:
+            response = requests.get(url, headers=HEADERS, timeout=10)
+            response.raise_for_status()
+            return response.text
+        except requests.RequestException as e:
+            raise Exception(f"Erreur lors du téléchargement de la page : {e}")
+    
+    def _extract_from_html(self, html_content: str, url: str) -> Dict[str, Any]:
+        """Extrait une recette depuis le HTML d'une page téléchargée"""
         try:
             # Essayer avec wild_mode (versions récentes)
             try:
-                scraper = scrape_me(url, wild_mode=True)
+                scraper = scrape_html(html_content, org_url=url, wild_mode=True)
             except TypeError:
                 # Fallback sans wild_mode (versions anciennes)
-                scraper = scrape_me(url)
+                scraper = scrape_html(html_content, org_url=url)
             return self._format_recipe(scraper)
         except Exception as e:
             raise Exception(f"Erreur lors de l'extraction depuis l'URL : {e}")
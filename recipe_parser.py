@@ -4,9 +4,15 @@ Module de parsing de recettes depuis texte brut
 Extrait ingrédients et étapes depuis description + transcription
 """
 
+import logging
 import re
 from typing import Dict, List, Optional
 
+from metrics import stage
+
+
+logger = logging.getLogger(__name__)
+
 
 class RecipeParser:
     def __init__(self):
@@ -45,16 +51,48 @@ class RecipeParser:
                 - yields: Portions
                 - total_time: Temps total (si trouvé)
         """
+        logger.debug("📝 Parsing de la recette...")
+        
+        result = self._parse(description, transcription)
+        
+        logger.info(
+            "✓ Recette parsée : %s (%d ingrédients, %d lignes d'instructions)",
+            result['title'], len(result['ingredients']),
+            len(result['instructions'].split(chr(10))) if result['instructions'] else 0
+        )
+        
+        return result
+    
+    def is_caption_sufficient(self, description: str, min_ingredients: int = 3) -> bool:
+        """
+        Indique si la description seule contient une recette exploitable
+        (sections ingrédients et étapes explicites), auquel cas la
+        transcription de la vidéo n'est pas nécessaire
+        """
+        text_lower = description.lower()
+        has_ingredient_section = any(kw in text_lower for kw in self.ingredient_keywords)
+        has_step_section = any(kw in text_lower for kw in self.step_keywords)
+        
+        if not (has_ingredient_section and has_step_section):
+            return False
+        
+        recipe = self._parse(description, "", verbose=False)
+        return len(recipe['ingredients']) >= min_ingredients and len(recipe['instructions']) > 50
+    
+    def _parse(self, description: str, transcription: str = "", verbose: bool = True) -> Dict:
+        """Parse sans affichage de résumé (voir parse_recipe)"""
+        with stage('parse'):
+            return self._parse_text(description, transcription, verbose)
+    
+    def _parse_text(self, description: str, transcription: str, verbose: bool) -> Dict:
         # Combiner description et transcription
         full_text = f"{description}\n\n{transcription}".strip()
         
-        print("📝 Parsing de la recette...")
-        
         # Extraire le titre
         title = self._extract_title(description, transcription)
         
         # Extraire les ingrédients
-        ingredients = self._extract_ingredients(full_text)
+        ingredients = self._extract_ingredients(full_text, verbose=verbose)
         
         # Extraire les instructions
         instructions = self._extract_instructions(full_text)
@@ -75,11 +113,6 @@ class RecipeParser:
             'description': description[:500]  # Garder un extrait
         }
         
-        print(f"✓ Recette parsée")
-        print(f"  Titre : {title}")
-        print(f"  Ingrédients : {len(ingredients)}")
-        print(f"  Instructions : {len(instructions.split(chr(10))) if instructions else 0} lignes")
-        
         return result
     
     def _extract_title(self, description: str, transcription: str) -> str:
@@ -109,7 +142,7 @@ class RecipeParser:
         
         return "Recette Instagram"
     
-    def _extract_ingredients(self, text: str) -> List[str]:
+    def _extract_ingredients(self, text: str, verbose: bool = True) -> List[str]:
         """Extrait la liste des ingrédients"""
         ingredients = []
         
@@ -171,7 +204,8 @@ class RecipeParser:
         
         # Si pas d'ingrédients trouvés, essayer de détecter automatiquement
         if not ingredients:
-            print("  ⚠️ Section 'Ingrédients' non trouvée, détection automatique...")
+            if verbose:
+                logger.debug("⚠️ Section 'Ingrédients' non trouvée, détection automatique...")
             ingredients = self._detect_ingredients_auto(text)
         
         # Nettoyer chaque ingrédient
@@ -461,8 +495,108 @@ class RecipeParser:
         return text.strip()
 
 
+# Début des étapes dans une transcription : actions de cuisine dites à
+# l'oral ("on ajoute", "je mets") ou à l'impératif, titre de section
+STEP_START = re.compile(
+    r"\b(?:(?:on|je|tu|vous)\s+(?:va\s+|vais\s+|allez\s+)?"
+    r"(?:ajout|mélang|vers|coup|met|épluch|éminc|hach|mix|incorpor|enfourn|préchauff|"
+    r"fai[st]\s+(?:cuire|fondre|revenir|chauffer|bouillir))"
+    r"|(?:ajoutez|mélangez|versez|coupez|mettez|épluchez|émincez|hachez|mixez|incorporez|"
+    r"enfournez|préchauffez|faites\s+(?:cuire|fondre|revenir|chauffer|bouillir))\b"
+    r"|(?:préparation|étapes?|instructions)\s*:)",
+    re.IGNORECASE
+)
+
+
+class IncrementalRecipeParser(RecipeParser):
+    """
+    Parser alimenté segment par segment pendant la transcription
+    
+    is_complete() indique quand la recette ne bouge plus, ce qui permet
+    d'arrêter la transcription avant la fin de l'audio. La stabilité ne
+    compte qu'une fois les étapes commencées (STEP_START) : une longue
+    introduction ("aujourd'hui je vous montre...") ne l'arrête pas avant
+    la liste des ingrédients. Tant qu'elles n'ont pas commencé, les
+    segments ne sont pas re-parsés.
+    """
+    
+    def __init__(self, description: str = "", stability_window: int = 3):
+        """
+        Args:
+            description: Description du post (connue avant la transcription)
+            stability_window: Nombre de segments consécutifs sans changement,
+                étapes commencées, avant de considérer la recette comme complète
+        """
+        super().__init__()
+        self.description = description
+        self.stability_window = stability_window
+        self._segments: List[str] = []
+        self._snapshot: Optional[Dict] = None
+        self._stale = True
+        self._steps_started = False
+        self._stable_count = 0
+    
+    @property
+    def transcription(self) -> str:
+        """Transcription accumulée jusqu'ici"""
+        return " ".join(self._segments)
+    
+    def feed(self, text: str):
+        """
+        Ajoute un segment de transcription ; la recette n'est re-parsée
+        qu'une fois les étapes commencées (sinon à la demande, snapshot)
+        """
+        text = text.strip()
+        if text:
+            self._segments.append(text)
+            self._stale = True
+            if not self._steps_started and STEP_START.search(text):
+                self._steps_started = True
+        
+        if not self._steps_started:
+            return
+        
+        previous = self._snapshot
+        snapshot = self.snapshot()
+        if not snapshot['ingredients'] or not snapshot['instructions']:
+            self._stable_count = 0
+        elif previous is not None and self._key(snapshot) == self._key(previous):
+            self._stable_count += 1
+        else:
+            self._stable_count = 0
+    
+    def snapshot(self) -> Dict:
+        """
+        État courant de la recette (même format que parse_recipe), re-parsé
+        seulement si du texte a été ajouté depuis le dernier appel
+        """
+        if self._stale:
+            self._snapshot = self._parse(self.description, self.transcription, verbose=False)
+            self._stale = False
+        return self._snapshot
+    
+    def is_complete(self) -> bool:
+        """
+        True si les étapes ont commencé, ingrédients et instructions sont
+        présents et n'ont pas changé depuis stability_window segments
+        """
+        return self._steps_started and self._stable_count >= self.stability_window
+    
+    def _key(self, result: Dict) -> tuple:
+        """Champs dont la stabilité détermine la complétude"""
+        return (
+            tuple(result['ingredients']),
+            result['instructions'],
+            result['yields'],
+            result['total_time'],
+        )
+
+
 # Test du module
 if __name__ == '__main__':
+    from log_config import setup_logging
+    setup_logging()
+    
     # Exemple de description Instagram
     description = """
     🍰 Gâteau au chocolat facile
@@ -0,0 +1,210 @@
+"""
+Profileur par échantillonnage, en Python pur, pour l'API en production
+
+Un thread relève à fréquence fixe la pile de tous les autres threads
+(sys._current_frames()) pendant N secondes. Le temps compté est le temps
+réel (« wall clock ») : un thread bloqué sur une réponse de Grocy ou sur un
+verrou apparaît autant qu'un thread qui calcule.
+
+Sous gunicorn (workers synchrones), le profil tourne en arrière-plan
+(start) : la requête qui le lance rend la main et le worker traite les
+requêtes suivantes pendant l'échantillonnage. Le rapport est écrit dans
+PROFILER_DIR, où n'importe quel worker le relit (latest).
+
+Résultat :
+- piles repliées (« collapsed stacks ») : une ligne par pile distincte,
+  "thread;f1;f2;...;fN nombre", lisible par flamegraph.pl ou speedscope
+- fonctions les plus coûteuses en temps propre (fonction en haut de pile)
+"""
+
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+DEFAULT_HZ = 100
+MAX_HZ = 1000
+MAX_SECONDS = 120
+
+# Profils en cours et terminés, un fichier par worker, partagés entre workers
+PROFILER_DIR = os.getenv(
+    'PROFILER_DIR',
+    os.path.join(tempfile.gettempdir(), 'grocy-recipe-profiles')
+)
+
+# Un seul profil à la fois par processus : deux échantillonneurs se verraient l'un l'autre
+_busy = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Un profil est déjà en cours dans ce processus"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> List[str]:
+    """Noms des fonctions de la pile, de la plus externe à la plus interne"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Échantillonne les piles de tous les threads (sauf le sien) à fréquence fixe"""
+
+    def __init__(self, hz: int = DEFAULT_HZ):
+        self.interval = 1.0 / max(1, min(hz, MAX_HZ))
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+
+    def run(self, seconds: float):
+        """Échantillonne pendant seconds secondes, dans le thread appelant"""
+        own = threading.get_ident()
+        names = {}
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_tick:
+                time.sleep(next_tick - now)
+            next_tick += self.interval
+
+            frames = sys._current_frames()
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                thread = names.get(ident, f"thread-{ident}").replace(';', '_')
+                # Le ';' sépare les frames dans le format replié
+                key = ";".join([thread] + _stack(frame))
+                self.stacks[key] += 1
+            self.samples += 1
+            del frames
+
+        self.duration = time.perf_counter() - start
+
+    def collapsed(self) -> str:
+        """Format flamegraph : "thread;f1;...;fN nombre" par ligne"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_self(self, limit: int = 30) -> List[Dict]:
+        """Fonctions en haut de pile le plus souvent (temps propre estimé)"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {
+                'function': function,
+                'samples': count,
+                'seconds': round(count * self.interval, 3),
+                'percent': round(100.0 * count / total, 1),
+            }
+            for function, count in leaves.most_common(limit)
+        ]
+
+    def report(self, limit: int = 30) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'seconds': round(self.duration, 3),
+            'hz': round(1.0 / self.interval),
+            'samples': self.samples,
+            'threads': len({stack.split(';', 1)[0] for stack in self.stacks}),
+            'top_self': self.top_self(limit),
+            'collapsed': self.collapsed(),
+        }
+
+
+def start(seconds: float, hz: int = DEFAULT_HZ, limit: int = 30, directory: str = None) -> Dict:
+    """
+    Lance un profil du processus courant dans un thread d'arrière-plan
+
+    Le rapport remplace l'état "running" dans le fichier du worker à la fin
+    du profil (voir latest).
+
+    Returns:
+        État du profil lancé ('status': 'running')
+
+    Raises:
+        ProfilerBusy: Si un profil est déjà en cours dans ce processus
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("Un profil est déjà en cours dans ce worker")
+    try:
+        directory = directory or PROFILER_DIR
+        state = {
+            'status': 'running',
+            'pid': os.getpid(),
+            'started': time.time(),
+            'seconds': max(0.0, min(seconds, MAX_SECONDS)),
+            'hz': max(1, min(hz, MAX_HZ)),
+        }
+        _write_state(directory, state)
+        thread = threading.Thread(
+            target=_run_background, args=(state, limit, directory),
+            name='sampling-profiler', daemon=True,
+        )
+        thread.start()
+    except BaseException:
+        _busy.release()
+        raise
+    return state
+
+
+def _run_background(state: Dict, limit: int, directory: str):
+    try:
+        profiler = SamplingProfiler(state['hz'])
+        profiler.run(state['seconds'])
+        result = dict(profiler.report(limit), status='done', started=state['started'])
+    except Exception as e:
+        result = dict(state, status='failed', error=str(e))
+    try:
+        _write_state(directory, result)
+    finally:
+        _busy.release()
+
+
+def _write_state(directory: str, state: Dict):
+    """Écriture atomique du fichier du worker"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"profile-{state['pid']}.json")
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+
+def latest(pid: int = None, directory: str = None) -> Optional[Dict]:
+    """
+    Dernier profil lancé, en cours ou terminé, quel que soit le worker
+
+    Args:
+        pid: Limiter aux profils de ce worker
+        directory: Dossier des profils (None = PROFILER_DIR)
+    """
+    pattern = f"profile-{pid}.json" if pid is not None else "profile-*.json"
+    states = []
+    for path in glob.glob(os.path.join(directory or PROFILER_DIR, pattern)):
+        try:
+            with open(path, encoding='utf-8') as f:
+                states.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return max(states, key=lambda state: state.get('started', 0), default=None)
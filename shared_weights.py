@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Chargement des poids Whisper partagés entre processus via mmap
+
+Au premier chargement, le state dict du modèle est réécrit une fois pour
+toutes dans un fichier torch non compressé. Les workers suivants
+l'ouvrent avec torch.load(mmap=True) : les tenseurs pointent directement
+dans le fichier, en lecture seule, et les pages sont partagées par tous
+les processus via le page cache de l'OS au lieu d'être copiées par worker.
+
+Chaque transcripteur reçoit son propre module Whisper : transcribe()
+installe des hooks de kv-cache sur le module, deux transcriptions
+simultanées sur la même instance se corrompraient. Seuls les tenseurs
+mmap sont partagés.
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import asdict
+from typing import Dict
+
+
+logger = logging.getLogger(__name__)
+
+# Dossier des fichiers mmap (un par modèle)
+MMAP_DIR = os.getenv(
+    'WHISPER_MMAP_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'whisper', 'mmap')
+)
+
+# Checkpoints mmap déjà ouverts dans ce processus
+_checkpoints = {}
+_lock = threading.Lock()
+
+
+def mmap_supported() -> bool:
+    """torch.load(mmap=True) et load_state_dict(assign=True) demandent torch >= 2.1"""
+    import torch
+
+    match = re.match(r"(\d+)\.(\d+)", torch.__version__)
+    return match is not None and tuple(int(n) for n in match.groups()) >= (2, 1)
+
+
+def load_whisper_shared(model_name: str):
+    """
+    Charge un modèle openai-whisper avec des poids mmap en lecture seule
+
+    Le fichier n'est ouvert qu'une fois par processus ; chaque appel
+    retourne un nouveau module, branché sur les mêmes tenseurs.
+    """
+    with _lock:
+        checkpoint = _checkpoints.get(model_name)
+        if checkpoint is None:
+            import torch
+
+            path = _mmap_path(model_name)
+            if not os.path.exists(path):
+                _export_state_dict(model_name, path)
+            checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+            _checkpoints[model_name] = checkpoint
+            report = memory_report()
+            logger.info("ℹ️ Poids mmap : %s (RSS %.0f MB, dont %.0f MB partagés)",
+                        path, report['rss_mb'], report['rss_file_mb'])
+    return _build_model(model_name, checkpoint)
+
+
+def _mmap_path(model_name: str) -> str:
+    return os.path.join(MMAP_DIR, f"{model_name}.pt")
+
+
+def _export_state_dict(model_name: str, path: str):
+    """Convertit le checkpoint Whisper en fichier mmappable (une seule fois)"""
+    import torch
+    import whisper
+
+    logger.info("📦 Conversion du modèle '%s' au format mmap (premier lancement)...", model_name)
+    model = whisper.load_model(model_name, device="cpu")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Écriture atomique : plusieurs workers peuvent faire la conversion
+    # en même temps, le dernier os.replace gagne sans fichier corrompu
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save({
+        'dims': asdict(model.dims),
+        'model_state_dict': model.state_dict(),
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+    del model
+
+
+def _build_model(model_name: str, checkpoint: Dict):
+    """Construit le modèle sans allouer ses poids puis les branche sur le fichier"""
+    import numpy as np
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(**checkpoint['dims'])
+
+    # Construction sur le device "meta" : aucune mémoire allouée pour les poids
+    with torch.device("meta"):
+        model = Whisper(dims)
+
+    # assign=True : les paramètres deviennent les tenseurs mmap eux-mêmes
+    model.load_state_dict(checkpoint['model_state_dict'], assign=True)
+    model.requires_grad_(False)
+
+    # Les buffers non persistants ne sont pas dans le state dict :
+    # on les recrée sur CPU comme le fait Whisper.__init__
+    mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1)
+    model.decoder.register_buffer("mask", mask, persistent=False)
+
+    all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    all_heads[dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+    if model_name in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+
+    return model.eval()
+
+
+def memory_report() -> Dict[str, float]:
+    """
+    Mémoire du processus courant (Linux)
+
+    rss_file correspond aux pages adossées à un fichier (dont les poids mmap),
+    partagées entre workers. pss répartit ces pages partagées entre les
+    processus qui les utilisent : la somme des PSS est la vraie empreinte.
+    """
+    report = {'pid': os.getpid(), 'rss_mb': 0.0, 'rss_anon_mb': 0.0,
+              'rss_file_mb': 0.0, 'pss_mb': 0.0}
+
+    fields = {
+        'VmRSS:': 'rss_mb',
+        'RssAnon:': 'rss_anon_mb',
+        'RssFile:': 'rss_file_mb',
+    }
+
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    report[fields[parts[0]]] = int(parts[1]) / 1024
+    except OSError:
+        return report
+
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0] == 'Pss:':
+                    report['pss_mb'] = int(parts[1]) / 1024
+                    break
+    except OSError:
+        pass
+
+    return report
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Regroupement des requêtes identiques en cours (singleflight)
+
+Quand plusieurs requêtes arrivent pour la même clé pendant qu'un job
+tourne déjà, elles attendent ce job et reçoivent son résultat au lieu
+d'en lancer un nouveau.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Paramètres de suivi ajoutés par les partages (réseaux sociaux, newsletters...)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'igsh', 'si',
+    'mc_cid', 'mc_eid', 'ref', 'ref_src', 'utm_id',
+}
+
+INSTAGRAM_SHORTCODE = re.compile(
+    r'instagram\.com/(?:[\w.]+/)?(?:reel|reels|p|tv)/([\w-]+)', re.IGNORECASE
+)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalise une URL pour que les variantes d'un même contenu aient la même clé
+
+    - Instagram : "instagram:<shortcode>" (reel/, reels/, p/, tv/, avec ou sans compte)
+    - Autres : schéma et hôte en minuscules, sans www, sans fragment,
+      sans paramètres de suivi (utm_*, fbclid...), sans / final
+    """
+    url = url.strip()
+
+    match = INSTAGRAM_SHORTCODE.search(url)
+    if match:
+        return f"instagram:{match.group(1)}"
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(query), ''))
+
+
+class _Call:
+    """Un job en cours et les requêtes qui l'attendent"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Exécute au plus un job par clé à la fois, partagé par tous les appelants"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Exécute func, ou attend le job déjà en cours pour la même clé
+
+        Returns:
+            Tuple (résultat, shared) : shared vaut True si le résultat vient
+            d'un job lancé par une autre requête
+
+        Raises:
+            L'exception levée par le job, pour tous les appelants
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            # Y compris SystemExit (timeout gunicorn) : les requêtes en
+            # attente ne doivent jamais recevoir un résultat vide
+            call.error = e
+            raise
+        finally:
+            # Les requêtes suivantes relanceront un job : seul le job
+            # en cours est partagé, pas son résultat une fois terminé
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Nombre de jobs en cours"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,119 @@
+"""
+Index local des recettes déjà importées : empreinte de la source → recette Grocy
+Partagé par la CLI et l'API (fichier SQLite)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from file_lock import file_lock
+from singleflight import canonical_url
+
+
+DEFAULT_PATH = os.getenv(
+    'RECIPE_INDEX_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'grocy-recipe-importer', 'index.sqlite3')
+)
+
+# Marqueur invisible ajouté à la description des recettes importées, pour
+# pouvoir reconstruire l'index depuis Grocy
+FINGERPRINT_MARKER = re.compile(r'<!-- source-fingerprint: ([0-9a-f]{16,64}) -->')
+
+
+def source_fingerprint(source_url: str) -> str:
+    """Empreinte stable d'une source (même recette = même empreinte)"""
+    return hashlib.sha256(canonical_url(source_url).encode('utf-8')).hexdigest()[:32]
+
+
+def import_lock(grocy_url: str, source_url: str):
+    """
+    Verrou entre processus des imports d'une même source dans un Grocy
+    (workers de l'API, batch_importer) : la recherche de la recette déjà
+    importée et son écriture se font sous ce verrou
+    """
+    return file_lock(f"{grocy_url.rstrip('/')}:import:{source_fingerprint(source_url)}")
+
+
+def fingerprint_marker(fingerprint: str) -> str:
+    return f"<!-- source-fingerprint: {fingerprint} -->"
+
+
+class SourceIndex:
+    """Table SQLite (grocy_url, empreinte) → id de recette"""
+
+    def __init__(self, path: str = None):
+        self.path = path or DEFAULT_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS recipe_sources (
+                    grocy_url TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    recipe_id INTEGER NOT NULL,
+                    title TEXT,
+                    source_url TEXT,
+                    imported_at REAL,
+                    PRIMARY KEY (grocy_url, fingerprint)
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS index_state (
+                    grocy_url TEXT PRIMARY KEY,
+                    bootstrapped_at REAL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Une connexion par thread (sqlite3 n'autorise pas le partage)"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            # timeout : attendre le verrou d'un autre processus plutôt qu'échouer
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def lookup(self, grocy_url: str, fingerprint: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT recipe_id, title, source_url FROM recipe_sources "
+            "WHERE grocy_url = ? AND fingerprint = ?",
+            (grocy_url, fingerprint)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'recipe_id': row[0], 'title': row[1], 'source_url': row[2]}
+
+    def store(self, grocy_url: str, fingerprint: str, recipe_id: int,
+              title: str = None, source_url: str = None):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO recipe_sources VALUES (?, ?, ?, ?, ?, ?)",
+                (grocy_url, fingerprint, recipe_id, title, source_url, time.time())
+            )
+
+    def forget(self, grocy_url: str, fingerprint: str):
+        with self._connect() as db:
+            db.execute(
+                "DELETE FROM recipe_sources WHERE grocy_url = ? AND fingerprint = ?",
+                (grocy_url, fingerprint)
+            )
+
+    def is_bootstrapped(self, grocy_url: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM index_state WHERE grocy_url = ?", (grocy_url,)
+        ).fetchone()
+        return row is not None
+
+    def mark_bootstrapped(self, grocy_url: str):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO index_state VALUES (?, ?)",
+                (grocy_url, time.time())
+            )
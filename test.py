@@ -107,4 +107,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    from log_config import setup_logging
+    setup_logging()
     main()
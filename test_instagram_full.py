@@ -10,6 +10,7 @@ from audio_transcriber import AudioTranscriber
 from recipe_parser import RecipeParser
 from grocy_client import GrocyClient
 import os
+from log_config import setup_logging
 
 def test_instagram_import(url: str, grocy_url: str, grocy_api_key: str):
     """
@@ -168,6 +169,8 @@ def test_instagram_import(url: str, grocy_url: str, grocy_api_key: str):
 
 
 if __name__ == '__main__':
+    setup_logging()
+
     # Vérifier les arguments
     if len(sys.argv) < 2:
         print("Usage: python3 test_instagram_full.py <URL_INSTAGRAM_REEL>")
@@ -0,0 +1,126 @@
+"""Limiteur AIMD des écritures Grocy (threads et asyncio)"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from adaptive_limiter import AdaptiveLimiter
+
+
+def _limiter(**kwargs):
+    options = dict(initial=2, min_limit=1, max_limit=8, tolerance=2.0, backoff=0.5)
+    options.update(kwargs)
+    return AdaptiveLimiter('test', **options)
+
+
+def _complete(limiter, latency, failed=False):
+    limiter.acquire()
+    limiter.release(latency, failed)
+
+
+def test_additive_increase_under_stable_latency():
+    limiter = _limiter()
+    for _ in range(20):
+        _complete(limiter, 0.01)
+
+    assert 4 < limiter.limit <= 8
+    assert limiter.decreases == 0
+    assert limiter.snapshot()['peak_limit'] == pytest.approx(limiter.limit, abs=0.01)
+
+
+def test_limit_never_exceeds_max():
+    limiter = _limiter(max_limit=3)
+    for _ in range(100):
+        _complete(limiter, 0.01)
+    assert limiter.limit == 3
+
+
+def test_failure_halves_the_limit_down_to_min():
+    limiter = _limiter(initial=8)
+    _complete(limiter, 0.0, failed=True)
+    assert limiter.limit == 4
+
+    # Latence nulle : chaque échec est un nouvel aller-retour
+    for _ in range(3):
+        _complete(limiter, 0.0, failed=True)
+    assert limiter.limit == 1
+
+
+def test_latency_spike_counts_as_congestion():
+    limiter = _limiter(initial=4)
+    _complete(limiter, 0.01)
+    before = limiter.limit
+
+    _complete(limiter, 0.05)
+
+    assert limiter.limit == pytest.approx(before * 0.5)
+    assert limiter.decreases == 1
+
+
+def test_single_decrease_per_round_trip():
+    # Les réponses lancées avec l'ancienne limite ne la divisent pas une seconde fois
+    limiter = _limiter(initial=8)
+    _complete(limiter, 10.0, failed=True)
+    _complete(limiter, 10.0, failed=True)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_acquire_blocks_at_limit_until_release():
+    limiter = _limiter(initial=1, max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def second():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.1)
+    assert limiter.snapshot()['queued'] == 1
+
+    limiter.release(0.01)
+    assert acquired.wait(1)
+    thread.join(1)
+    assert limiter.in_flight == 1
+
+
+def test_async_waiter_is_woken_by_thread_release():
+    limiter = _limiter(initial=1, max_limit=1)
+
+    async def scenario():
+        limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        threading.Timer(0.05, limiter.release, args=(0.01,)).start()
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 1
+
+
+def test_cancelled_async_waiter_does_not_leak_a_slot():
+    limiter = _limiter(initial=1, max_limit=1)
+
+    async def scenario():
+        limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(0.01)
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.snapshot()['queued'] == 0
+    # La place est de nouveau disponible
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.5
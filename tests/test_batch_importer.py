@@ -0,0 +1,124 @@
+"""Pipeline de batch_importer, sans réseau ni Whisper (étapes remplacées)"""
+
+import threading
+import time
+
+import pytest
+
+from batch_importer import BatchReelImporter
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    monkeypatch.setattr('media_workspace.DEFAULT_ROOT', str(tmp_path))
+    return BatchReelImporter('http://grocy.invalid', 'key', download_workers=2,
+                             transcribe_workers=2, write_workers=1, queue_size=1)
+
+
+def test_results_keep_input_order_and_carry_recipe(importer):
+    def download(job):
+        # Les derniers téléchargements finissent les premiers
+        time.sleep(0.01 * (5 - int(job['url'][-1])))
+
+    importer._download = download
+    importer._transcribe = lambda job: job.update(recipe={'title': job['url'].upper()})
+    importer._write = lambda job: job.update(recipe_id=int(job['url'][-1]))
+
+    urls = [f"https://www.instagram.com/reel/r{i}" for i in range(5)]
+    results = importer.run(urls)
+
+    assert [r['url'] for r in results] == urls
+    assert [r['recipe_id'] for r in results] == list(range(5))
+    assert results[2]['title'] == urls[2].upper()
+    assert all(r['error'] is None for r in results)
+
+
+def test_error_skips_later_stages_and_is_counted(importer):
+    written = []
+
+    def transcribe(job):
+        if job['url'].endswith('bad'):
+            raise RuntimeError("audio illisible")
+        job['recipe'] = {'title': 'ok'}
+
+    importer._download = lambda job: None
+    importer._transcribe = transcribe
+    importer._write = lambda job: written.append(job['url'])
+
+    results = importer.run(['https://a/ok', 'https://a/bad'])
+
+    assert written == ['https://a/ok']
+    assert results[1]['error'] == "transcribe : audio illisible"
+    report = importer.report()
+    assert report['transcribe']['failed'] == 1
+    assert report['write']['processed'] == 1
+
+
+def test_skipped_job_is_not_transcribed(importer):
+    transcribed = []
+
+    def download(job):
+        job['recipe'] = {'title': 'déjà là'}
+        job['recipe_id'] = 42
+        job['skip'] = True
+
+    importer._download = download
+    importer._transcribe = lambda job: transcribed.append(job)
+    importer._write = lambda job: transcribed.append(job)
+
+    results = importer.run(['https://a/dup'])
+
+    assert transcribed == []
+    assert results[0]['recipe_id'] == 42
+    assert results[0]['title'] == 'déjà là'
+
+
+def test_stages_overlap(importer):
+    # Pendant qu'un Reel est transcrit, le suivant se télécharge
+    active = set()
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def busy(name):
+        def run(job):
+            with lock:
+                active.add(name)
+                if {'download', 'transcribe'} <= active:
+                    overlap.set()
+            time.sleep(0.02)
+            with lock:
+                active.discard(name)
+        return run
+
+    importer._download = busy('download')
+    importer._transcribe = busy('transcribe')
+    importer._write = lambda job: None
+
+    importer.run([f"https://a/{i}" for i in range(6)])
+
+    assert overlap.is_set()
+
+
+def test_same_reel_twice_is_written_once(tmp_path, monkeypatch):
+    from fake_grocy import FakeGrocy
+
+    monkeypatch.setattr('media_workspace.DEFAULT_ROOT', str(tmp_path / 'media'))
+    monkeypatch.setattr('source_index.DEFAULT_PATH', str(tmp_path / 'index.sqlite3'))
+    monkeypatch.setattr('file_lock.DEFAULT_DIR', str(tmp_path / 'locks'))
+    monkeypatch.setenv('GROCY_MIRROR', '0')
+
+    with FakeGrocy(catalog_size=10) as grocy:
+        importer = BatchReelImporter(grocy.url, 'key', write_workers=2)
+
+        def transcribe(job):
+            job['recipe'] = {'title': 'Gratin', 'ingredients': ["3 oeufs"], 'instructions': "Cuire.",
+                             'yields': "4 portions", 'source_url': job['url']}
+
+        # Deux variantes du même Reel, toutes deux absentes au téléchargement
+        importer._download = lambda job: None
+        importer._transcribe = transcribe
+        results = importer.run(["https://www.instagram.com/reel/Cx1/",
+                                "https://instagram.com/reels/Cx1?igsh=abc"])
+
+        assert len(grocy.tables['recipes']) == 1
+        assert results[0]['recipe_id'] == results[1]['recipe_id']
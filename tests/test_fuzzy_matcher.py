@@ -0,0 +1,118 @@
+"""Rapprochement n-grammes (NumPy et Python pur) et ajout incrémental"""
+
+import pytest
+
+import fuzzy_matcher
+from fuzzy_matcher import NgramMatcher, char_ngrams
+from product_index import ProductNameIndex
+
+
+CATALOG = [
+    {'id': 1, 'name': "Farine de blé"},
+    {'id': 2, 'name': "Beurre doux"},
+    {'id': 3, 'name': "Crème fraîche épaisse"},
+    {'id': 4, 'name': "Sucre en poudre"},
+    {'id': 5, 'name': "Lait entier"},
+    {'id': 6, 'name': "Pommes de terre"},
+]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(fuzzy_matcher, 'np', None)
+    elif fuzzy_matcher.np is None:
+        pytest.skip("NumPy non installé")
+    return request.param
+
+
+def _best(matcher, name):
+    candidates = matcher.match_many([name], k=3)[name]
+    return candidates[0] if candidates else None
+
+
+def test_char_ngrams_use_normalized_name():
+    assert char_ngrams("Œufs") == char_ngrams("oeuf")
+    assert " oe" in char_ngrams("oeuf")
+
+
+def test_close_names_match_the_right_product(backend):
+    matcher = NgramMatcher(CATALOG)
+
+    assert _best(matcher, "farine de ble T55")['product']['id'] == 1
+    assert _best(matcher, "creme fraiche")['product']['id'] == 3
+    assert _best(matcher, "pomme de terre")['product']['id'] == 6
+
+
+def test_scores_are_cosine_similarities(backend):
+    matcher = NgramMatcher(CATALOG)
+
+    exact = _best(matcher, "Beurre doux")
+    assert exact['score'] == pytest.approx(1.0, abs=1e-5)
+
+    candidates = matcher.match_many(["sucre"], k=3)["sucre"]
+    scores = [c['score'] for c in candidates]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < s < 1 for s in scores)
+
+
+def test_unrelated_name_has_no_candidate(backend):
+    matcher = NgramMatcher(CATALOG)
+    assert matcher.match_many(["xyz"], k=3) == {"xyz": []}
+
+
+def test_empty_catalog_or_query(backend):
+    assert NgramMatcher([]).match_many(["beurre"]) == {"beurre": []}
+    assert NgramMatcher(CATALOG).match_many([]) == {}
+
+
+def test_added_products_are_matched_without_rebuild(backend):
+    matcher = NgramMatcher(CATALOG)
+    # N-grammes absents du catalogue d'origine ("feuilletée") et connus ("pâte")
+    matcher.add([{'id': 7, 'name': "Pâte feuilletée"}, {'id': 8, 'name': "Sucre glace"}])
+
+    assert len(matcher) == 8
+    best = _best(matcher, "pate feuilletee")
+    assert best['product']['id'] == 7
+    assert best['score'] == pytest.approx(1.0, abs=1e-5)
+    assert _best(matcher, "sucre glace")['product']['id'] == 8
+    # Les produits d'origine sont toujours trouvés
+    assert _best(matcher, "lait")['product']['id'] == 5
+
+
+def test_product_index_keeps_matcher_across_additions(backend):
+    index = ProductNameIndex()
+    index.rebuild(CATALOG, snapshot='s1')
+    index.fuzzy_match(["beurre"])
+    matcher = index._matcher
+
+    index.add({'id': 7, 'name': "Pâte feuilletée"})
+    result = index.fuzzy_match(["pate feuilletee"])
+
+    assert index._matcher is matcher
+    assert result["pate feuilletee"][0]['product']['id'] == 7
+
+    # Nouvel état du catalogue : matcher reconstruit
+    index.rebuild(CATALOG, snapshot='s2')
+    index.fuzzy_match(["beurre"])
+    assert index._matcher is not matcher
+
+
+def test_refresh_rebuilds_only_when_catalog_changes():
+    index = ProductNameIndex()
+    index.refresh(CATALOG)
+    index.fuzzy_match(["beurre"])
+    matcher = index._matcher
+
+    # Même catalogue, puis catalogue contenant le produit ajouté localement
+    index.refresh(list(reversed(CATALOG)))
+    new_product = {'id': 7, 'name': "Pâte feuilletée"}
+    index.add(new_product)
+    index.refresh(CATALOG + [new_product])
+    assert index._matcher is matcher
+
+    # Produit renommé dans Grocy
+    renamed = [dict(p, name="Beurre salé") if p['id'] == 2 else p for p in CATALOG]
+    index.refresh(renamed + [new_product])
+    assert index._matcher is None
+    assert index.get("beurre salé")['id'] == 2
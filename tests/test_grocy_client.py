@@ -0,0 +1,52 @@
+"""GrocyClient.import_recipe contre un Grocy simulé (fake_grocy)"""
+
+import pytest
+
+from fake_grocy import FakeGrocy
+from grocy_client import GrocyClient
+from grocy_http import GrocyUnavailable
+from source_index import SourceIndex
+
+
+RECIPE = {
+    'title': "Gratin",
+    'ingredients': ["200g de farine", "3 oeufs"],
+    'instructions': "Mélanger.",
+    'yields': "4 portions",
+    'source_url': "https://site.fr/gratin",
+}
+
+
+@pytest.fixture
+def grocy():
+    with FakeGrocy(catalog_size=20) as grocy:
+        yield grocy
+
+
+@pytest.fixture
+def client(grocy, tmp_path):
+    return GrocyClient(grocy.url, 'fake', use_mirror=False,
+                       source_index=SourceIndex(str(tmp_path / 'index.sqlite3')))
+
+
+def test_import_indexes_complete_recipe(grocy, client):
+    recipe_id = client.import_recipe(dict(RECIPE))
+    assert client.find_recipe_by_source(RECIPE['source_url'])['recipe_id'] == recipe_id
+    assert client.import_recipe(dict(RECIPE)) == recipe_id
+    assert len(grocy.tables['recipes']) == 1
+
+
+def test_failed_ingredients_leave_no_half_imported_recipe(grocy, client, monkeypatch):
+    def unavailable(recipe_id, ingredients):
+        raise GrocyUnavailable("Grocy injoignable")
+
+    monkeypatch.setattr(client, '_add_recipe_ingredients', unavailable)
+    with pytest.raises(GrocyUnavailable):
+        client.import_recipe(dict(RECIPE))
+
+    assert grocy.tables['recipes'] == []
+    assert client.find_recipe_by_source(RECIPE['source_url']) is None
+
+    monkeypatch.undo()
+    recipe_id = client.import_recipe(dict(RECIPE))
+    assert [r['id'] for r in grocy.tables['recipes']] == [recipe_id]
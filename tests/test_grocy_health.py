@@ -0,0 +1,59 @@
+"""État de santé Grocy : réponses des vrais appels et séparation par clé API"""
+
+import pytest
+
+import grocy_health
+from grocy_health import GrocyHealth, get_health
+
+
+@pytest.fixture(autouse=True)
+def _isolated_states(monkeypatch):
+    monkeypatch.setattr(grocy_health, '_health', {})
+
+
+def _headers(key):
+    return {'GROCY-API-KEY': key, 'Content-Type': 'application/json'}
+
+
+@pytest.mark.parametrize('status', [401, 403])
+def test_refused_api_key_is_not_available(status):
+    health = GrocyHealth('http://grocy', ttl=60)
+    health.record_response(status)
+    assert health.is_healthy() is False
+    assert 'clé API' in health.last_error
+
+
+@pytest.mark.parametrize('status', [200, 400, 404])
+def test_answered_calls_are_healthy(status):
+    health = GrocyHealth('http://grocy', ttl=60)
+    health.record_response(502)
+    health.record_response(status)
+    assert health.is_healthy() is True
+
+
+def test_isolated_500_does_not_change_state():
+    health = GrocyHealth('http://grocy', ttl=60)
+    health.record_response(200)
+    health.record_response(500)
+    assert health.is_healthy() is True
+
+
+def test_bad_key_does_not_poison_good_key():
+    good = get_health('http://grocy', _headers('bonne'))
+    bad = get_health('http://grocy', _headers('mauvaise'))
+    assert good is not bad
+    assert get_health('http://grocy', _headers('bonne')) is good
+
+    bad.record_response(401)
+    good.record_response(200)
+    assert bad.is_healthy() is False
+    assert good.is_healthy() is True
+    # La sonde garde la clé de son état
+    assert bad.headers['GROCY-API-KEY'] == 'mauvaise'
+
+
+def test_report_does_not_expose_api_key():
+    get_health('http://grocy', _headers('secret'))
+    report = grocy_health.health_report()
+    assert len(report) == 1
+    assert 'secret' not in repr(report)
@@ -0,0 +1,117 @@
+"""Disjoncteur Grocy et sa gestion par GrocyHttp.request"""
+
+import time
+
+import pytest
+import requests
+
+from grocy_http import CircuitBreaker, GrocyHttp, GrocyUnavailable
+
+
+def _open(breaker):
+    for _ in range(breaker.threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(GrocyUnavailable):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.state == 'half-open'
+
+    breaker.before_call()
+    with pytest.raises(GrocyUnavailable, match="essai"):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.before_call()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    _open(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+class _FailingSession:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def request(self, *args, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.fixture
+def http(request):
+    # URL propre au test : disjoncteur, limiteur et santé sont partagés par URL
+    client = GrocyHttp(f"http://grocy-{request.node.name}.invalid", {'GROCY-API-KEY': 'k'}, max_retries=0)
+    client.breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    return client
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ChunkedEncodingError("réponse tronquée"),
+    requests.exceptions.ContentDecodingError("gzip illisible"),
+    requests.exceptions.InvalidURL("url"),
+])
+def test_any_requests_error_during_trial_releases_it(http, error):
+    _open(http.breaker)
+    time.sleep(0.06)
+    http.session = _FailingSession(error)
+
+    with pytest.raises(GrocyUnavailable):
+        http.get('/api/system/info')
+    assert not http.breaker._trial_running
+
+    # Le délai écoulé, un nouvel essai peut partir
+    time.sleep(0.06)
+    http.breaker.before_call()
+
+
+def test_unexpected_exception_during_trial_releases_it(http):
+    _open(http.breaker)
+    time.sleep(0.06)
+    http.session = _FailingSession(KeyboardInterrupt())
+
+    with pytest.raises(KeyboardInterrupt):
+        http.get('/api/system/info')
+    assert not http.breaker._trial_running
+    http.breaker.before_call()
+
+
+def test_open_breaker_fails_fast_without_request(http):
+    _open(http.breaker)
+    http.session = _FailingSession(requests.ConnectionError("refusé"))
+
+    with pytest.raises(GrocyUnavailable):
+        http.get('/api/system/info')
+    assert http.session.calls == 0
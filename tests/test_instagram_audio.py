@@ -0,0 +1,51 @@
+"""Extraction audio : seul un .mp3 complet est visible comme audio en cache"""
+
+import os
+import subprocess
+
+import pytest
+
+from instagram_scraper import InstagramScraper
+from media_workspace import MediaWorkspace
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    return InstagramScraper(workspace=MediaWorkspace(root=str(tmp_path)))
+
+
+def _video(scraper):
+    path = os.path.join(scraper.workspace.acquire('Cx1'), 'Cx1.mp4')
+    open(path, 'wb').close()
+    return path
+
+
+def test_audio_appears_only_when_complete(scraper, monkeypatch):
+    seen_during_encoding = []
+
+    def ffmpeg(cmd, **kwargs):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'ID3')
+        seen_during_encoding.append(scraper.workspace.find('Cx1', '.mp3'))
+
+    monkeypatch.setattr(subprocess, 'run', ffmpeg)
+    audio_path = scraper._extract_audio(_video(scraper))
+
+    assert seen_during_encoding == [None]
+    assert scraper.workspace.find('Cx1', '.mp3') == audio_path
+    assert sorted(os.listdir(os.path.dirname(audio_path))) == ['Cx1.mp3', 'Cx1.mp4']
+
+
+def test_failed_encoding_leaves_no_audio(scraper, monkeypatch):
+    def ffmpeg(cmd, **kwargs):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'ID3')
+        raise subprocess.TimeoutExpired(cmd, 60)
+
+    monkeypatch.setattr(subprocess, 'run', ffmpeg)
+    video_path = _video(scraper)
+    with pytest.raises(Exception, match="Timeout"):
+        scraper._extract_audio(video_path)
+
+    assert scraper.workspace.find('Cx1', '.mp3') is None
+    assert os.listdir(os.path.dirname(video_path)) == ['Cx1.mp4']
@@ -0,0 +1,75 @@
+"""Noms de produits normalisés et index par nom"""
+
+import pytest
+
+from product_index import ProductNameIndex, normalize_name
+
+
+@pytest.mark.parametrize('variants', [
+    ["Œufs", "oeuf", "Oeufs", "des œufs", "ŒUFS"],
+    ["Crème fraîche", "creme fraiche", "crèmes fraîches"],
+    ["de la farine", "Farine", "la farine"],
+    ["l'huile d'olive", "huile d'olive", "Huile  d’olive"],
+    ["Pommes de terre", "pomme de terre"],
+])
+def test_variants_share_normalized_name(variants):
+    assert len({normalize_name(v) for v in variants}) == 1
+
+
+def test_short_words_keep_final_letter():
+    # Pas de marque du pluriel retirée sur les mots de moins de 4 lettres
+    assert normalize_name("riz") == "riz"
+    assert normalize_name("jus") == "jus"
+    assert normalize_name("Noix") == normalize_name("noi")
+
+
+def test_name_reduced_to_article_is_kept():
+    assert normalize_name("des") == "des"
+
+
+def _product(id, name):
+    return {'id': id, 'name': name, 'qu_id_stock': 1}
+
+
+def test_index_finds_product_by_any_variant():
+    index = ProductNameIndex()
+    index.rebuild([_product(1, "Œufs"), _product(2, "Crème fraîche")], snapshot='s1')
+
+    assert index.get("des oeufs")['id'] == 1
+    assert index.get("crèmes fraîches")['id'] == 2
+    assert index.get("beurre") is None
+    assert index.is_current('s1') and not index.is_current('s2')
+
+
+def test_first_product_wins_on_duplicate_names():
+    index = ProductNameIndex()
+    index.rebuild([_product(1, "Oeuf"), _product(2, "Œufs")])
+
+    assert index.get("oeufs")['id'] == 1
+    assert index.product_count == 2
+
+
+def test_add_and_extend_catch_up_without_duplicates():
+    index = ProductNameIndex()
+    index.rebuild([_product(1, "Beurre")], snapshot=(1.0, 1, 1, None))
+
+    index.add(_product(2, "Sucre"))
+    index.extend([_product(2, "Sucre"), _product(3, "Sel")], snapshot=(1.0, 3, 3, None))
+
+    assert index.get("sucres")['id'] == 2
+    assert index.product_count == 3
+    assert index.max_id == 3
+    assert index.is_current((1.0, 3, 3, None))
+
+
+def test_miss_cache_expires():
+    index = ProductNameIndex(miss_ttl=0)
+    index.remember_miss("Truffe")
+    assert not index.is_recent_miss("truffes")
+
+    index = ProductNameIndex(miss_ttl=60)
+    index.remember_miss("Truffe")
+    assert index.is_recent_miss("truffes")
+    # Le produit créé efface le nom absent
+    index.add(_product(9, "Truffe"))
+    assert not index.is_recent_miss("truffe")
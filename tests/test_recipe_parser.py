@@ -0,0 +1,68 @@
+"""Parser incrémental : arrêt de la transcription une fois la recette stable"""
+
+from recipe_parser import IncrementalRecipeParser
+
+# Longue introduction parlée, sans étape ni liste d'ingrédients
+INTRO = [
+    "Salut tout le monde, aujourd'hui je vous montre le gratin de ma grand-mère.",
+    "C'est un plat que je mangeais tous les dimanches quand j'étais petit, avec du fromage râpé sur le dessus.",
+    "Franchement c'est le plat réconfortant par excellence, parfait pour l'hiver.",
+    "Ma grand-mère le préparait toujours la veille, elle disait que c'était meilleur réchauffé.",
+    "Elle habitait dans un petit village de Savoie, au pied des montagnes, avec son jardin.",
+    "Je me souviens de l'odeur qui remplissait toute la maison le dimanche matin.",
+    "Bref, je vous ai assez raconté ma vie, c'est parti.",
+    "Abonnez-vous si ce n'est pas déjà fait, ça m'aide beaucoup pour la chaîne.",
+    "Et n'hésitez pas à partager la vidéo avec vos amis qui aiment cuisiner.",
+    "Dites-moi en commentaire si vous aussi vous avez un plat de famille comme ça.",
+    "Il existe plein de versions différentes selon les régions, chacun a la sienne.",
+    "Moi je vous donne la version de ma famille, transmise depuis plusieurs générations.",
+    "Certains le font avec du lait, d'autres avec des oignons, chez nous jamais.",
+    "On le servait avec une salade verte et un bon morceau de pain de campagne.",
+    "Mon grand-père en reprenait toujours deux fois, même quand il n'avait plus faim.",
+    "C'est vraiment un plat simple mais qui fait plaisir à tout le monde à table.",
+]
+INGREDIENTS = "Il vous faut 1kg de pommes de terre, 50cl de crème liquide, 1 gousse d'ail et 100g de gruyère."
+STEPS = [
+    "On épluche les pommes de terre et on les coupe en fines rondelles.",
+    "On frotte le plat avec la gousse d'ail puis on met les rondelles en couches.",
+    "On verse la crème par-dessus, on ajoute le gruyère.",
+    "On enfourne 1 heure à 180 degrés.",
+]
+OUTRO = [
+    "Et voilà, bon appétit à tous.",
+    "Merci d'avoir regardé jusqu'au bout.",
+    "Ciao ciao.",
+    "À bientôt.",
+    "Bisous.",
+]
+
+
+def _transcribe(segments):
+    """Comme batch_importer : arrêt dès que la recette est complète"""
+    parser = IncrementalRecipeParser(description="Gratin dauphinois")
+    for segment in segments:
+        parser.feed(segment)
+        if parser.is_complete():
+            break
+    return parser
+
+
+def test_long_intro_does_not_stop_before_ingredients():
+    parser = _transcribe(INTRO + [INGREDIENTS] + STEPS + OUTRO)
+
+    assert INGREDIENTS in parser.transcription
+    assert all(step in parser.transcription for step in STEPS)
+    assert "pommes de terre" in parser.snapshot()['ingredients']
+    # La fin de la vidéo n'a pas été attendue
+    assert parser.is_complete()
+    assert OUTRO[-1] not in parser.transcription
+
+
+def test_intro_alone_is_never_complete():
+    parser = IncrementalRecipeParser(description="Gratin dauphinois")
+    for segment in INTRO:
+        parser.feed(segment)
+        assert not parser.is_complete()
+    # Snapshot parsé à la demande pendant l'introduction
+    assert parser.snapshot()['title'] == "Gratin dauphinois"
+
@@ -0,0 +1,59 @@
+"""Profil en arrière-plan : le thread appelant reste libre pendant l'échantillonnage"""
+
+import threading
+import time
+
+import pytest
+
+import sampling_profiler
+from sampling_profiler import ProfilerBusy, latest, start
+
+
+def _wait_done(directory, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        report = latest(directory=directory)
+        if report and report['status'] != 'running':
+            return report
+        time.sleep(0.02)
+    raise AssertionError("profil non terminé")
+
+
+def _busy_work(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_start_returns_immediately_and_sees_later_work(tmp_path):
+    state = start(0.3, hz=200, directory=str(tmp_path))
+    assert state['status'] == 'running'
+    assert latest(directory=str(tmp_path))['status'] == 'running'
+
+    # Travail lancé après le début du profil, comme une requête suivante
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_work, args=(stop,), name='import')
+    worker.start()
+    try:
+        report = _wait_done(str(tmp_path))
+    finally:
+        stop.set()
+        worker.join()
+
+    assert report['status'] == 'done'
+    assert report['samples'] > 0
+    assert any(line.startswith('import;') for line in report['collapsed'].splitlines())
+    assert latest(pid=report['pid'], directory=str(tmp_path))['started'] == state['started']
+
+
+def test_one_profile_at_a_time(tmp_path):
+    start(0.2, directory=str(tmp_path))
+    with pytest.raises(ProfilerBusy):
+        start(0.2, directory=str(tmp_path))
+    _wait_done(str(tmp_path))
+    # Le verrou est rendu à la fin du profil
+    assert sampling_profiler._busy.acquire(blocking=False)
+    sampling_profiler._busy.release()
+
+
+def test_latest_without_profile(tmp_path):
+    assert latest(directory=str(tmp_path)) is None
@@ -0,0 +1,107 @@
+"""Regroupement des imports identiques : canonical_url et SingleFlight"""
+
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, canonical_url
+
+
+@pytest.mark.parametrize('variant', [
+    "https://www.instagram.com/reel/Cx1_ab-9/",
+    "https://instagram.com/reels/Cx1_ab-9?igsh=abc",
+    "https://www.instagram.com/chef.maison/reel/Cx1_ab-9/",
+    "https://www.instagram.com/p/Cx1_ab-9/#comments",
+])
+def test_instagram_variants_share_shortcode(variant):
+    assert canonical_url(variant) == "instagram:Cx1_ab-9"
+
+
+def test_web_url_drops_tracking_and_cosmetics():
+    assert canonical_url(
+        "  HTTPS://WWW.Marmiton.org/recettes/gratin.aspx/?utm_source=fb&fbclid=x&b=2&a=1#top "
+    ) == "https://marmiton.org/recettes/gratin.aspx?a=1&b=2"
+
+
+def test_web_url_keeps_meaningful_params_and_scheme():
+    assert canonical_url("https://site.fr/r?id=3") != canonical_url("https://site.fr/r?id=4")
+    assert canonical_url("http://site.fr/") == "http://site.fr/"
+
+
+def _run_concurrently(flight, key, func, callers):
+    """Lance callers appels de flight.do pendant que le premier est en cours"""
+    started = threading.Event()
+    release = threading.Event()
+    results = [None] * callers
+
+    def leader_func():
+        started.set()
+        release.wait(5)
+        return func()
+
+    def call(i):
+        try:
+            results[i] = ('ok', flight.do(key, leader_func if i == 0 else func))
+        except BaseException as e:
+            results[i] = ('error', e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Laisse aux suiveurs le temps de rejoindre le job en cours
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_calls_share_one_job():
+    flight = SingleFlight()
+    calls = []
+
+    def job():
+        calls.append(1)
+        return 'recette'
+
+    results = _run_concurrently(flight, 'k', job, callers=4)
+
+    assert len(calls) == 1
+    assert results[0] == ('ok', ('recette', False))
+    assert all(r == ('ok', ('recette', True)) for r in results[1:])
+    assert flight.in_flight() == 0
+
+
+def test_job_error_is_raised_for_every_caller():
+    flight = SingleFlight()
+
+    def job():
+        raise ValueError("Grocy a refusé")
+
+    results = _run_concurrently(flight, 'k', job, callers=3)
+
+    assert all(kind == 'error' and isinstance(e, ValueError) for kind, e in results)
+
+
+def test_base_exception_reaches_waiters():
+    # SystemExit (timeout gunicorn) : les suiveurs ne doivent pas recevoir None
+    flight = SingleFlight()
+
+    def job():
+        raise SystemExit(1)
+
+    results = _run_concurrently(flight, 'k', job, callers=3)
+
+    assert all(kind == 'error' and isinstance(e, SystemExit) for kind, e in results)
+    assert flight.in_flight() == 0
+
+
+def test_finished_job_is_not_cached():
+    flight = SingleFlight()
+    counter = iter(range(10))
+
+    assert flight.do('k', lambda: next(counter)) == (0, False)
+    assert flight.do('k', lambda: next(counter)) == (1, False)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Affiche les traces d'import écrites par tracing.py, en cascade
+
+Usage:
+    python trace_view.py                 # dernière trace
+    python trace_view.py --list          # traces récentes (durée, nom)
+    python trace_view.py 3f2a            # trace dont l'id commence par 3f2a
+    python trace_view.py --slowest       # trace la plus longue
+    python trace_view.py --min-ms 5      # masque les spans de moins de 5 ms
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+from tracing import TRACE_FILE, load_traces
+
+
+BAR_WIDTH = 40
+
+
+def _root(spans: List[Dict]) -> Dict:
+    return next((s for s in spans if s['parent_id'] is None), spans[0])
+
+
+def _duration(span: Dict) -> float:
+    return span['duration'] or 0.0
+
+
+def print_list(traces: Dict[str, List[Dict]], limit: int):
+    for trace_id, spans in list(traces.items())[-limit:]:
+        root = _root(spans)
+        started = datetime.fromtimestamp(root['start']).strftime('%Y-%m-%d %H:%M:%S')
+        status = '✗' if any(s['error'] for s in spans) else '✓'
+        label = root['attributes'].get('url') or ''
+        print(f"{trace_id}  {started}  {_duration(root):8.2f}s  {len(spans):4} spans  {status} {root['name']} {label}")
+
+
+def print_waterfall(trace_id: str, spans: List[Dict], min_ms: float):
+    """Une ligne par span : décalage, barre proportionnelle, nom, durée"""
+    root = _root(spans)
+    origin = root['start']
+    total = max(_duration(root), 1e-9)
+
+    children: Dict[str, List[Dict]] = {}
+    for s in spans:
+        children.setdefault(s['parent_id'], []).append(s)
+    for group in children.values():
+        group.sort(key=lambda s: s['start'])
+
+    started = datetime.fromtimestamp(origin).strftime('%Y-%m-%d %H:%M:%S')
+    print(f"trace {trace_id}  {root['name']}  {total:.3f}s  ({started})")
+    for key, value in root['attributes'].items():
+        print(f"  {key}: {value}")
+    print()
+
+    hidden = 0
+
+    def walk(span: Dict, depth: int):
+        nonlocal hidden
+        if depth and _duration(span) * 1000 < min_ms:
+            hidden += 1
+            return
+        offset = span['start'] - origin
+        begin = int(offset / total * BAR_WIDTH)
+        width = max(1, int(round(_duration(span) / total * BAR_WIDTH)))
+        bar = (' ' * begin + '█' * width)[:BAR_WIDTH].ljust(BAR_WIDTH)
+        attributes = " ".join(f"{k}={v}" for k, v in span['attributes'].items() if k != 'url')
+        error = f"  ✗ {span['error']}" if span['error'] else ''
+        name = ('  ' * depth + span['name'])[:48]
+        print(f"{offset:8.3f}s |{bar}| {name:<48} {_duration(span) * 1000:9.1f} ms  {attributes}{error}")
+        for child in children.get(span['span_id'], []):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    if hidden:
+        print(f"\n({hidden} spans de moins de {min_ms:g} ms masqués)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Affiche les traces d'import en cascade")
+    parser.add_argument('trace_id', nargs='?', help="Début de l'identifiant de la trace (défaut : la dernière)")
+    parser.add_argument('--file', default=TRACE_FILE, help=f"Fichier de traces (défaut : {TRACE_FILE})")
+    parser.add_argument('--list', action='store_true', help="Liste les traces récentes")
+    parser.add_argument('--limit', type=int, default=20, help="Nombre de traces listées")
+    parser.add_argument('--slowest', action='store_true', help="Affiche la trace la plus longue")
+    parser.add_argument('--min-ms', type=float, default=0.0, help="Masque les spans plus courts")
+    args = parser.parse_args()
+
+    traces = load_traces(args.file)
+    if not traces:
+        print(f"Aucune trace dans {args.file}")
+        sys.exit(1)
+
+    if args.list:
+        print_list(traces, args.limit)
+        return
+
+    if args.trace_id:
+        matches = [trace_id for trace_id in traces if trace_id.startswith(args.trace_id)]
+        if not matches:
+            print(f"❌ Aucune trace ne commence par {args.trace_id}")
+            sys.exit(1)
+        trace_id = matches[-1]
+    elif args.slowest:
+        trace_id = max(traces, key=lambda t: _duration(_root(traces[t])))
+    else:
+        trace_id = list(traces)[-1]
+
+    print_waterfall(trace_id, traces[trace_id], args.min_ms)
+
+
+if __name__ == '__main__':
+    main()
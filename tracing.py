@@ -0,0 +1,179 @@
+"""
+Traces locales des imports : une trace par import, un span par étape,
+appel Grocy, fenêtre transcrite ou commande externe
+
+Les spans d'une trace sont écrits ensemble à la fin de l'import dans un
+fichier JSON lines (TRACE_FILE), sans collecteur externe. Pour les lire :
+
+    python trace_view.py            # dernière trace, en cascade
+    python trace_view.py --list     # traces récentes
+
+Hors d'une trace (ex: module utilisé seul), span() ne fait rien.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+TRACING = os.getenv('TRACING', '1') != '0'
+
+TRACE_FILE = os.getenv(
+    'TRACE_FILE',
+    os.path.join(
+        os.getenv('GROCY_MIRROR_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'grocy-recipe-importer')),
+        'traces.jsonl'
+    )
+)
+
+# Au-delà, le fichier est renommé en .1 (une seule archive conservée)
+TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Garde-fou mémoire pour une trace anormalement longue
+MAX_SPANS_PER_TRACE = 5000
+
+
+class Span:
+    """Intervalle de temps nommé, rattaché à une trace et à un span parent"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'start', 'duration', 'attributes', 'error')
+
+    def __init__(self, trace: 'Trace', name: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.span_id = os.urandom(4).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        """Ajoute des attributs (ex: code HTTP connu après l'appel)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': round(self.start, 6),
+            'duration': round(self.duration, 6) if self.duration is not None else None,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(8).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+
+
+# Span courant du thread / de la tâche asyncio
+_current_span: ContextVar = ContextVar('current_span', default=None)
+_export_lock = threading.Lock()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None else None
+
+
+@contextmanager
+def _open_span(trace: Trace, name: str, parent_id: Optional[str], attributes: Dict):
+    span = Span(trace, name, parent_id, attributes)
+    trace.add(span)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        span.duration = time.perf_counter() - start
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Span enfant du span courant ; sans trace en cours, ne fait rien
+
+    Yields:
+        Le Span (pour span.set(...)), ou None hors trace
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with _open_span(parent.trace, name, parent.span_id, attributes) as child:
+        yield child
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    """
+    Démarre une trace (span racine) et l'exporte à la sortie du bloc
+
+    Imbriqué dans une trace existante, se comporte comme span().
+    """
+    if not TRACING or _current_span.get() is not None:
+        with span(name, **attributes) as current:
+            yield current
+        return
+
+    new_trace = Trace()
+    try:
+        with _open_span(new_trace, name, None, attributes) as root:
+            yield root
+    finally:
+        export(new_trace)
+
+
+def export(finished: Trace):
+    """Ajoute les spans de la trace au fichier TRACE_FILE (une ligne par span)"""
+    with finished._lock:
+        lines = "".join(json.dumps(s.to_dict(), ensure_ascii=False) + "\n" for s in finished.spans)
+    try:
+        with _export_lock:
+            os.makedirs(os.path.dirname(TRACE_FILE) or '.', exist_ok=True)
+            if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) > TRACE_MAX_BYTES:
+                os.replace(TRACE_FILE, TRACE_FILE + '.1')
+            # Une seule écriture en mode append : les traces des autres workers ne s'entremêlent pas
+            with open(TRACE_FILE, 'a', encoding='utf-8') as f:
+                f.write(lines)
+    except OSError as e:
+        logger.warning("⚠️ Impossible d'écrire la trace : %s", e)
+
+
+def load_traces(path: str = None) -> Dict[str, List[Dict]]:
+    """Spans du fichier regroupés par trace, dans l'ordre d'écriture"""
+    path = path or TRACE_FILE
+    traces: Dict[str, List[Dict]] = {}
+    for filename in (path + '.1', path):
+        if not os.path.exists(filename):
+            continue
+        with open(filename, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                traces.setdefault(record['trace_id'], []).append(record)
+    return traces
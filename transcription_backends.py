@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Backends d'inférence pour AudioTranscriber
+Chaque backend respecte le même contrat : {'text', 'segments', 'language'}
+"""
+
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Fréquence d'échantillonnage attendue par tous les modèles Whisper
+SAMPLE_RATE = 16000
+
+
+class TranscriptionBackend(ABC):
+    """Interface commune aux backends de transcription"""
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @abstractmethod
+    def load(self):
+        """Charge le modèle (appelé une seule fois, en lazy loading)"""
+
+    @abstractmethod
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        """Décode un fichier audio en float32 mono 16kHz"""
+
+    @abstractmethod
+    def transcribe(self, audio: Union[str, np.ndarray], language: str = "fr",
+                   initial_prompt: Optional[str] = None) -> Dict:
+        """
+        Transcrit un fichier ou un tableau audio
+
+        Returns:
+            Dict avec:
+                - text: Transcription complète
+                - segments: Liste de dicts {start, end, text}
+                - language: Langue détectée
+        """
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper en fp32 (comportement historique)"""
+
+    name = "whisper"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = None
+
+    def load(self):
+        # Poids partagés entre workers via mmap (WHISPER_SHARED_WEIGHTS=0 pour désactiver)
+        if os.getenv('WHISPER_SHARED_WEIGHTS', '1') != '0':
+            from shared_weights import load_whisper_shared, mmap_supported
+            if mmap_supported():
+                self.model = load_whisper_shared(self.model_name)
+                return
+            logger.warning("⚠️ torch < 2.1 : poids Whisper non partagés (chargement classique)")
+        import whisper
+        self.model = whisper.load_model(self.model_name)
+
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        import whisper
+        return whisper.load_audio(audio_path)
+
+    def transcribe(self, audio, language="fr", initial_prompt=None) -> Dict:
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            fp16=False,  # Pas de FP16 sur CPU
+            verbose=None,
+            initial_prompt=initial_prompt
+        )
+
+        return {
+            'text': result['text'].strip(),
+            'segments': result.get('segments', []),
+            'language': result.get('language', language)
+        }
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """
+    openai-whisper avec quantification dynamique int8 des couches Linear
+
+    Les poids des couches Linear (l'essentiel du calcul sur CPU) passent
+    en int8, les activations restent en fp32. Pas de modèle à convertir.
+    Les poids quantifiés sont privés au processus (pas de partage mmap),
+    ils sont donc gardés en cache pour ne quantifier qu'une fois par worker.
+    Ce module unique est partagé par les transcripteurs du processus : les
+    transcriptions sont sérialisées (hooks de kv-cache posés sur le module).
+    """
+
+    name = "whisper-int8"
+
+    _quantized = {}
+    _locks = {}
+    _quantize_lock = threading.Lock()
+
+    def load(self):
+        with self._quantize_lock:
+            if self.model_name not in self._quantized:
+                self._quantized[self.model_name] = self._quantize(self.model_name)
+                self._locks[self.model_name] = threading.Lock()
+        self.model = self._quantized[self.model_name]
+
+    def transcribe(self, audio, language="fr", initial_prompt=None) -> Dict:
+        with self._locks[self.model_name]:
+            return super().transcribe(audio, language=language, initial_prompt=initial_prompt)
+
+    @staticmethod
+    def _quantize(model_name: str):
+        import torch
+        import whisper
+
+        # Copie fp32 privée : le modèle partagé (mmap) ne doit pas être modifié
+        model = whisper.load_model(model_name, device="cpu")
+
+        # quantize_dynamic ne reconnaît que le type exact torch.nn.Linear, or
+        # whisper utilise sa sous-classe whisper.model.Linear : les couches
+        # sont remplacées par des nn.Linear qui partagent les mêmes poids
+        for parent in list(model.modules()):
+            for child_name, child in parent.named_children():
+                if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                    linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                    linear.weight = child.weight
+                    linear.bias = child.bias
+                    setattr(parent, child_name, linear)
+
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+        quantized = sum(
+            1 for module in model.modules()
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)
+        )
+        if not quantized:
+            raise RuntimeError(f"Aucune couche quantifiée en int8 dans le modèle Whisper '{model_name}'")
+        return model
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    faster-whisper (CTranslate2) en int8 sur CPU
+
+    Nécessite : pip install faster-whisper
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str, compute_type: str = "int8"):
+        super().__init__(model_name)
+        self.compute_type = compute_type
+        self.model = None
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=os.cpu_count() or 4
+        )
+
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        from faster_whisper import decode_audio
+        return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+    def transcribe(self, audio, language="fr", initial_prompt=None) -> Dict:
+        segments_iter, info = self.model.transcribe(
+            audio,
+            language=language,
+            task="transcribe",
+            initial_prompt=initial_prompt,
+            beam_size=5
+        )
+
+        segments = [
+            {'start': seg.start, 'end': seg.end, 'text': seg.text}
+            for seg in segments_iter
+        ]
+
+        return {
+            'text': "".join(seg['text'] for seg in segments).strip(),
+            'segments': segments,
+            'language': info.language or language
+        }
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    QuantizedWhisperBackend.name: QuantizedWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def get_backend(name: Optional[str], model_name: str) -> TranscriptionBackend:
+    """
+    Instancie un backend par son nom
+
+    Args:
+        name: Nom du backend (None = variable WHISPER_BACKEND, puis "whisper")
+        model_name: Modèle Whisper à utiliser
+    """
+    name = name or os.getenv('WHISPER_BACKEND', WhisperBackend.name)
+
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Backend de transcription inconnu : {name} "
+            f"(disponibles : {', '.join(BACKENDS)})"
+        )
+
+    return BACKENDS[name](model_name)